@@ -1,9 +1,23 @@
 import os
-from dotenv import load_dotenv
-from typing import Dict, Union
+from typing import Dict, List, Union
 
-# Load environment variables file
-load_dotenv('source.env')
+ENV_FILE = 'source.env'
+_env_loaded = False
+
+
+def load_env(path: str = ENV_FILE):
+    """
+    Load the environment variables file once
+
+    Deferred until configuration is first needed, so that `--help`, `--version`
+    and plain imports do not pay for python-dotenv and the file read.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    from dotenv import load_dotenv
+    load_dotenv(path)
 
 
 def get_llm_config() -> Dict[str, Union[str, int, float]]:
@@ -13,6 +27,7 @@ def get_llm_config() -> Dict[str, Union[str, int, float]]:
     Returns:
         LLM configuration dictionary
     """
+    load_env()
     return {
         "base_url": os.getenv("LLM_BASE_URL", "https://api.openai.com/v1"),
         "api_key": os.getenv("LLM_API_KEY"),
@@ -22,6 +37,77 @@ def get_llm_config() -> Dict[str, Union[str, int, float]]:
     }
 
 
+# Pipeline stages that call the LLM, by model tier: high-volume stages run on the
+# fast model, the stages that shape the final result on the premium model
+FAST_STAGES = ["descriptions", "dependencies", "overview"]
+PREMIUM_STAGES = ["readme", "logo"]
+
+
+def get_stage_model_config() -> Dict[str, Dict[str, Union[str, int, float, None]]]:
+    """
+    Get the model, max_tokens and temperature for each pipeline stage
+    
+    LLM_FAST_MODEL_NAME and LLM_PREMIUM_MODEL_NAME set the model per tier and
+    fall back to LLM_MODEL_NAME. A single stage can be overridden with
+    LLM_MODEL_NAME_<STAGE>, MAX_TOKENS_<STAGE> and TEMPERATURE_<STAGE>
+    (e.g. MAX_TOKENS_DESCRIPTIONS=300). None means the client default.
+    
+    Returns:
+        Settings by stage name
+    """
+    llm_config = get_llm_config()
+    tiers = {
+        "fast": os.getenv("LLM_FAST_MODEL_NAME") or llm_config["model_name"],
+        "premium": os.getenv("LLM_PREMIUM_MODEL_NAME") or llm_config["model_name"],
+    }
+    # The README is long; README_MAX_TOKENS predates the per-stage settings
+    default_max_tokens = {"readme": os.getenv("README_MAX_TOKENS", "4000")}
+    stages = {}
+    for stage in FAST_STAGES + PREMIUM_STAGES:
+        suffix = stage.upper()
+        max_tokens = os.getenv(f"MAX_TOKENS_{suffix}") or default_max_tokens.get(stage)
+        temperature = os.getenv(f"TEMPERATURE_{suffix}")
+        stages[stage] = {
+            "model": os.getenv(f"LLM_MODEL_NAME_{suffix}") or tiers["fast" if stage in FAST_STAGES else "premium"],
+            "max_tokens": int(max_tokens) if max_tokens else None,
+            "temperature": float(temperature) if temperature else None,
+        }
+    return stages
+
+
+def get_endpoint_config() -> Dict[str, Union[str, List[Dict[str, Union[str, float, None]]]]]:
+    """
+    Get the LLM endpoint pool
+    
+    LLM_ENDPOINTS lists several deployments or keys, separated by commas or
+    newlines, each as "base_url|api_key|weight" where the key and weight are
+    optional (the key defaults to LLM_API_KEY, the weight to 1; weight 0 marks
+    a standby endpoint). Without LLM_ENDPOINTS the pool is the single
+    LLM_BASE_URL/LLM_API_KEY pair.
+    
+    Returns:
+        Endpoint configuration dictionary
+    """
+    llm_config = get_llm_config()
+    endpoints = []
+    for entry in os.getenv("LLM_ENDPOINTS", "").replace("\n", ",").split(","):
+        if not entry.strip():
+            continue
+        fields = [field.strip() for field in entry.split("|")]
+        endpoints.append({
+            "base_url": fields[0],
+            "api_key": fields[1] if len(fields) > 1 and fields[1] else llm_config["api_key"],
+            "weight": float(fields[2]) if len(fields) > 2 and fields[2] else 1.0,
+        })
+    if not endpoints:
+        endpoints.append({"base_url": llm_config["base_url"], "api_key": llm_config["api_key"], "weight": 1.0})
+    return {
+        "endpoints": endpoints,
+        # "least_outstanding" or "weighted"
+        "routing": os.getenv("LLM_ROUTING", "least_outstanding"),
+    }
+
+
 def get_t2i_config() -> Dict[str, Union[str, int, float]]:
     """
     Get text-to-image configuration
@@ -29,6 +115,7 @@ def get_t2i_config() -> Dict[str, Union[str, int, float]]:
     Returns:
         Text-to-image configuration dictionary
     """
+    load_env()
     return {
         "base_url": os.getenv("T2I_BASE_URL", "https://api.openai.com/v1"),
         "api_key": os.getenv("T2I_API_KEY"),
@@ -38,17 +125,281 @@ def get_t2i_config() -> Dict[str, Union[str, int, float]]:
     }
 
 
-def validate_config():
+def get_scan_config() -> Dict[str, Union[str, int]]:
     """
-    Validate if configuration is complete
+    Get project scanning configuration
+
+    Returns:
+        Scanning configuration dictionary
     """
-    llm_config = get_llm_config()
-    t2i_config = get_t2i_config()
+    load_env()
+    return {
+        # "serial" or "parallel"; parallel helps on network file systems
+        "walker": os.getenv("SCAN_WALKER", "serial"),
+        "max_workers": int(os.getenv("SCAN_WORKERS", "16"))
+    }
+
+
+def get_structure_config() -> Dict[str, int]:
+    """
+    Get limits for the project structure embedded in the README prompt
+
+    Returns:
+        Structure prompt view configuration dictionary
+    """
+    load_env()
+    return {
+        "max_depth": int(os.getenv("STRUCTURE_MAX_DEPTH", "4")),
+        "max_entries": int(os.getenv("STRUCTURE_MAX_ENTRIES", "25")),
+        "max_lines": int(os.getenv("STRUCTURE_MAX_LINES", "300"))
+    }
+
+
+def get_file_read_config() -> Dict[str, int]:
+    """
+    Get limits for file content sent to the LLM
+
+    Returns:
+        File reading configuration dictionary
+    """
+    load_env()
+    return {
+        "max_bytes": int(os.getenv("FILE_MAX_BYTES", "65536")),
+        # 0 disables the token cap; otherwise the smaller of the two caps wins
+        "max_tokens": int(os.getenv("FILE_MAX_TOKENS", "0")),
+        "samples": int(os.getenv("FILE_SAMPLES", "3"))
+    }
+
+
+def get_chunking_config() -> Dict[str, Union[int, bool]]:
+    """
+    Get map-reduce summarization settings for files larger than the read budget
+
+    Returns:
+        Chunking configuration dictionary
+    """
+    load_env()
+    return {
+        # When disabled, large files are sampled instead of summarized chunk by chunk
+        "enabled": os.getenv("FILE_CHUNKING", "1") == "1",
+        "chunk_tokens": int(os.getenv("CHUNK_MAX_TOKENS", "6000")),
+        # Files above this size are sampled down to it before chunking
+        "max_file_bytes": int(os.getenv("CHUNK_MAX_FILE_BYTES", str(2 * 1024 * 1024))),
+        # Parallel chunk requests per file in the thread pool pipeline
+        "max_workers": int(os.getenv("CHUNK_MAX_WORKERS", "8"))
+    }
+
+
+def get_overview_config() -> Dict[str, Union[int, bool]]:
+    """
+    Get settings for rolling file descriptions up into directory summaries
+
+    Returns:
+        Overview configuration dictionary
+    """
+    load_env()
+    return {
+        "enabled": os.getenv("DIRECTORY_SUMMARIES", "1") == "1",
+        # Below this size the file descriptions go into the README prompt as they are
+        "threshold_tokens": int(os.getenv("OVERVIEW_THRESHOLD_TOKENS", "8000")),
+        # Upper bound for the overview that replaces them
+        "max_tokens": int(os.getenv("OVERVIEW_MAX_TOKENS", "3000")),
+        # Entries per directory prompt; larger directories are summarized in parts
+        "group_tokens": int(os.getenv("DIRECTORY_GROUP_TOKENS", "6000"))
+    }
+
+
+def get_batching_config() -> Dict[str, Union[int, bool]]:
+    """
+    Get settings for packing small files into one description request
+
+    Returns:
+        Batching configuration dictionary
+    """
+    load_env()
+    return {
+        "enabled": os.getenv("LLM_BATCH", "1") == "1",
+        "max_tokens": int(os.getenv("BATCH_MAX_TOKENS", "6000")),
+        "max_files": int(os.getenv("BATCH_MAX_FILES", "16")),
+        # Only files up to this size are batched
+        "small_file_bytes": int(os.getenv("BATCH_FILE_MAX_BYTES", "4096")),
+        # Answer length reserved per file in a batch
+        "answer_tokens_per_file": int(os.getenv("BATCH_ANSWER_TOKENS", "200"))
+    }
+
+
+def get_readme_config() -> Dict[str, Union[int, bool]]:
+    """
+    Get settings for generating the final README
+
+    Returns:
+        README generation configuration dictionary
+    """
+    load_env()
+    return {
+        # Stream the README to disk and the terminal as it is generated
+        "stream": os.getenv("README_STREAM", "1") == "1",
+        "echo": os.getenv("README_STREAM_ECHO", "1") == "1",
+        # Follow-up requests when the answer stops on the token limit
+        "max_continuations": int(os.getenv("README_MAX_CONTINUATIONS", "3"))
+    }
+
+
+def get_cache_config() -> Dict[str, Union[str, int, float, bool]]:
+    """
+    Get LLM response cache configuration (disabled unless LLM_CACHE=1)
+
+    Returns:
+        Response cache configuration dictionary
+    """
+    load_env()
+    default_path = os.path.join(os.path.expanduser("~"), ".cache", "aireadme", "llm_cache.sqlite3")
+    return {
+        "enabled": os.getenv("LLM_CACHE", "0").lower() in ("1", "true", "yes"),
+        "path": os.getenv("LLM_CACHE_PATH", default_path),
+        "max_bytes": int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+        # Entry lifetime in seconds, 0 keeps entries until evicted
+        "ttl_seconds": float(os.getenv("LLM_CACHE_TTL", "0"))
+    }
+
+
+def get_concurrency_config() -> Dict[str, Union[int, float, bool]]:
+    """
+    Get concurrency configuration for per-file LLM requests
+
+    Returns:
+        Concurrency configuration dictionary
+    """
+    load_env()
+    return {
+        # Use the asyncio description pipeline instead of the thread pool
+        "use_async": os.getenv("LLM_ASYNC", "0").lower() in ("1", "true", "yes"),
+        # Upper bound for in-flight requests; the adaptive limit backs off below it on 429s
+        "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "64")),
+        # Threads for the thread-pool description pipeline
+        "max_workers": int(os.getenv("LLM_MAX_WORKERS", "16")),
+        # Provider budgets, 0 for unlimited
+        "requests_per_minute": float(os.getenv("LLM_RPM", "0")),
+        "tokens_per_minute": float(os.getenv("LLM_TPM", "0"))
+    }
+
+
+def get_pipeline_config() -> Dict[str, bool]:
+    """
+    Get scheduling configuration for the generate() stages
+
+    Returns:
+        Pipeline configuration dictionary
+    """
+    load_env()
+    return {
+        # Run independent stages (e.g. dependencies and descriptions, logo and README) concurrently
+        "concurrent": os.getenv("PIPELINE_CONCURRENT", "1") == "1"
+    }
+
+
+def get_batch_config() -> Dict[str, int]:
+    """
+    Get configuration for batch runs over many repositories
+
+    Returns:
+        Batch configuration dictionary
+    """
+    load_env()
+    return {
+        # Worker processes, each generating one repository at a time
+        "workers": int(os.getenv("BATCH_WORKERS", "4"))
+    }
+
+
+def get_http_config() -> Dict[str, Union[int, float, bool]]:
+    """
+    Get connection pool settings shared by the LLM, image and download clients
+
+    Returns:
+        HTTP transport configuration dictionary
+    """
+    load_env()
+    return {
+        # 0 sizes the pools to LLM_MAX_CONCURRENCY
+        "max_connections": int(os.getenv("HTTP_MAX_CONNECTIONS", "0")),
+        "keepalive_expiry": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+        # Requires the optional h2 package
+        "http2": os.getenv("HTTP2", "0") == "1",
+        "download_chunk_bytes": int(os.getenv("HTTP_DOWNLOAD_CHUNK_BYTES", "65536"))
+    }
+
+
+def get_retry_config() -> Dict[str, Union[int, float]]:
+    """
+    Get retry, timeout and circuit breaker configuration for LLM requests
+
+    Returns:
+        Retry configuration dictionary
+    """
+    load_env()
+    return {
+        # Retries after the first attempt, for transient failures only
+        "max_retries": int(os.getenv("LLM_MAX_RETRIES", "5")),
+        "base_delay": float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+        "max_delay": float(os.getenv("LLM_RETRY_MAX_DELAY", "30")),
+        # Per-request timeout in seconds
+        "timeout": float(os.getenv("LLM_TIMEOUT", "60")),
+        # Consecutive failures that open the circuit, and seconds before a trial request
+        "circuit_failures": int(os.getenv("LLM_CIRCUIT_FAILURES", "5")),
+        "circuit_reset": float(os.getenv("LLM_CIRCUIT_RESET", "30")),
+        # Extra passes over files whose description failed transiently
+        "failed_file_rounds": int(os.getenv("LLM_FAILED_FILE_ROUNDS", "1"))
+    }
+
+
+def get_metrics_config() -> Dict[str, Union[str, float, bool, None]]:
+    """
+    Get per-call telemetry configuration
+
+    Returns:
+        Metrics configuration dictionary
+    """
+    load_env()
+    def price(name):
+        value = os.getenv(name, "")
+        return float(value) if value else None
+
+    return {
+        # Write metrics.json to the output directory after each run
+        "enabled": os.getenv("METRICS", "1") == "1",
+        # Prometheus textfile-collector export, disabled when empty
+        "prometheus_path": os.getenv("METRICS_PROMETHEUS_FILE", ""),
+        # Prices override the built-in table: USD per 1M tokens, USD per image
+        "input_price": price("LLM_PRICE_INPUT"),
+        "output_price": price("LLM_PRICE_OUTPUT"),
+        "image_price": price("T2I_PRICE_PER_IMAGE")
+    }
+
+
+def get_logo_config() -> bool:
+    """
+    Whether a project logo should be generated (needs the text-to-image settings)
+
+    Returns:
+        True unless GENERATE_LOGO=0
+    """
+    load_env()
+    return os.getenv("GENERATE_LOGO", "1") == "1"
+
+
+def validate_config(llm: bool = True, t2i: bool = False):
+    """
+    Validate if configuration is complete
     
-    if not llm_config["api_key"]:
+    Args:
+        llm: Check the LLM settings
+        t2i: Check the text-to-image settings, only needed when an image is generated
+    """
+    if llm and not all(endpoint["api_key"] for endpoint in get_endpoint_config()["endpoints"]):
         raise ValueError("LLM_API_KEY environment variable not set")
     
-    if not t2i_config["api_key"]:
+    if t2i and not get_t2i_config()["api_key"]:
         raise ValueError("T2I_API_KEY environment variable not set")
     
     print("Configuration validation passed")
@@ -70,7 +421,8 @@ DEFAULT_IGNORE_PATTERNS = [
     "__init__.py",      # 根目录下的 __init__.py
     "*/__init__.py",    # 一级子目录下的 __init__.py
     "*/*/__init__.py",  # 二级子目录下的 __init__.py
-    ".idea"
+    ".idea",
+    "aireadme_output",  # 默认输出目录，避免把上次生成的文件当作项目文件
 ]
 
 # Patterns for script files to be described by the LLM
@@ -102,6 +454,6 @@ if __name__ == "__main__":
     
     print("\n=== Configuration Validation ===")
     try:
-        validate_config()
+        validate_config(llm=True, t2i=True)
     except ValueError as e:
         print(f"Configuration validation failed: {e}")
\ No newline at end of file
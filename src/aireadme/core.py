@@ -1,28 +1,118 @@
 import os
 import json
+import asyncio
 import re
 import subprocess
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from threading import Event, Lock
 from rich.console import Console
 from rich.progress import Progress
 from rich.table import Table
 from aireadme.utils.model_client import ModelClient
-from aireadme.utils.file_handler import (
-    find_files,
-    get_project_structure,
-    load_gitignore_patterns,
-)
+from aireadme.utils.errors import ModelClientError, PermanentModelError, TransientModelError
+from aireadme.utils.description_store import DescriptionStore, hash_content, hash_file
+from aireadme.utils.file_reader import read_for_prompt, byte_budget
+from aireadme.utils.chunking import split_into_chunks, group_by_budget
+from aireadme.utils.batching import pack_small_files, format_batch_files, parse_batch_response
+from aireadme.utils.file_index import build_file_index
+from aireadme.utils.structure_renderer import write_structure, render_prompt_view
+from aireadme.utils.gitignore import IgnoreMatcher
 from aireadme.utils.logo_generator import generate_logo
-from .config import DEFAULT_IGNORE_PATTERNS, SCRIPT_PATTERNS, DOCUMENT_PATTERNS, get_readme_template_path
+from aireadme.utils.stage_graph import StageGraph, StageCancelled, bind_context
+from aireadme.utils.checkpoint import Checkpoint, CHECKPOINT_FILENAME
+from aireadme.utils.directory_summary import summarize_directories, render_overview
+from aireadme.utils.rate_limiter import estimate_tokens
+from aireadme.utils.readme_sections import (
+    STRUCTURE_SOURCE, DEPENDENCIES_SOURCE, git_changed_files, git_head, split_sections,
+    map_sections, stale_sections, load_section_map, save_section_map,
+)
+from .config import get_metrics_config, get_pipeline_config, get_overview_config, get_logo_config, get_batching_config, get_readme_config, get_chunking_config, get_concurrency_config, get_retry_config, get_scan_config, get_structure_config, get_file_read_config, DEFAULT_IGNORE_PATTERNS, SCRIPT_PATTERNS, DOCUMENT_PATTERNS, get_readme_template_path
+
+
+# Description of files skipped as binary, distinct from a missing or empty answer
+BINARY_FILE = object()
+
+# Map step: one prompt per chunk of a file too large for a single prompt
+CHUNK_PROMPT = (
+    "The following is part {index} of {total} (lines {start}-{end}) of the file {path}. "
+    "Summarize this part concisely. Focus on:\n1. What this part does\n"
+    "2. Key functions/classes defined here and their roles\n3. Notable features or dependencies\n\n"
+    "Content:\n{content}"
+)
+# Reduce step: merges partial summaries into one description
+REDUCE_PROMPT = (
+    "The following are summaries of consecutive parts of the file {path}. "
+    "Combine them into one concise summary of the whole file. Focus on:\n"
+    "1. Main purpose and functionality\n2. Key functions/methods and their roles\n"
+    "3. Important features or capabilities\n\nPart summaries:\n{summaries}"
+)
+# Several small files in one request, answered as a JSON object keyed by path
+BATCH_PROMPT = (
+    "Analyze each of the following {count} files and provide a concise summary of each. "
+    "For every file focus on its main purpose and functionality, key functions/methods "
+    "and important features.\n\nRespond with only a JSON object that maps each file path "
+    "exactly as given to its summary string, with no other text.\n\n{files}"
+)
+
+
+
+def clean_readme(readme):
+    """Remove the ```readme / ```markdown fences models like to wrap the README in"""
+    return readme.replace("```readme", "").replace("```markdown", "").strip("```")
+
+
+# Incremental refresh: rewrite one README section for the files it was written from
+SECTION_PROMPT = (
+    "You are updating one section of an existing README.md after changes to the project. "
+    "Rewrite the section below so it is accurate for the changes listed, keeping its heading, "
+    "structure, tone and everything that is still correct. Return only the updated section "
+    "in Markdown, with no other text.\n\n**Current section:**\n{section}\n\n**Changes:**\n{changes}"
+)
+
+# Metadata used when the user skips a prompt (or runs headless without providing it)
+CONTACT_DEFAULTS = {
+    "github_username": "your-username",
+    "repo_name": "your-repo",
+    "twitter_handle": "@your_handle",
+    "linkedin_username": "your-username",
+    "email": "your.email@example.com",
+}
 
 
 class aireadme:
-    def __init__(self, project_dir=None):
+    def __init__(self, project_dir=None, logo=None, output_dir=None, metadata=None,
+                 interactive=True, console=None, since=None, resume=False):
+        """
+        Args:
+            project_dir: Project to document; asked for when interactive
+            logo: Generate a logo, defaults to GENERATE_LOGO from config
+            output_dir: Directory the generated files are written to (headless mode)
+            metadata: Values for the README template (see self.config), used instead of prompts
+            interactive: Ask for paths and project information on the console
+            console: Rich console for all output, e.g. one writing to a log file
+            since: Git ref; refresh only what changed since then in the README of a previous run
+            resume: Continue an interrupted run from the descriptions checkpoint in the output directory
+        """
         self.model_client = ModelClient(quality="hd", image_size="1024x1024")  # 确保使用高质量、高分辨率图像生成
-        self.console = Console()
+        self.logo = get_logo_config() if logo is None else logo  # 是否生成 Logo（需要文生图配置）
+        self.console = console or Console()
         self.project_dir = project_dir  # 初始化时设置项目目录
-        self.output_dir = None  # 输出目录将在 _get_basic_info 中设置
+        self.output_dir = output_dir  # 交互模式下在 _get_basic_info 中设置
+        self.interactive = interactive
+        self.since = since
+        self.changed_files = None  # 自 since 以来 git 报告的变更文件，None 表示未知
+        self.described_files = set()  # 本次运行中重新生成描述的文件
+        self._previous_sections = None  # 上次运行保存的章节映射
+        self._dependencies_hash = None
+        self.resume = resume
+        self.cancelled = Event()  # 运行被中断（如 Ctrl-C）时置位，长时间运行的阶段据此提前结束
+        self._file_index = None  # 项目文件索引，首次使用时扫描一次
+        self._file_index_lock = Lock()  # 并行阶段共享同一次扫描
+        self.pipeline = None  # 最近一次 generate() 的阶段耗时与关键路径
+        self.failed_files = {}  # 描述生成失败的文件及错误信息
+        self._descriptions_by_hash = {}  # 本次运行中按内容哈希记录的描述，重复文件只请求一次
         self.config = {
             "github_username": "",
             "repo_name": "",
@@ -34,28 +124,68 @@ class aireadme:
             "key_features": "",
             "additional_info": "",
         }
+        unknown = set(metadata or {}) - set(self.config)
+        if unknown:
+            raise ValueError(f"Unknown metadata fields: {', '.join(sorted(unknown))}")
+        self.config.update({key: str(value) for key, value in (metadata or {}).items() if value})
 
     def generate(self):
-        self._get_basic_info()
-        self._get_git_info()
-        self._get_user_info()
+        if self.interactive:
+            self._get_basic_info()
+            self._get_git_info()
+            self._get_user_info()
+        else:
+            self._configure_headless()
         self.console.print("[bold green]Generating README...[/bold green]")
 
-        structure = self._generate_project_structure()
-        dependencies = self._generate_project_dependencies()
-        descriptions = self._generate_script_descriptions()
-        logo_path = generate_logo(
-            self.output_dir, descriptions, self.model_client, self.console
-        )
-
-        readme_content = self._generate_readme_content(
-            structure, dependencies, descriptions, logo_path
-        )
-
-        # Save README.md to output directory
+        telemetry = self.model_client.telemetry
         readme_path = os.path.join(self.output_dir, "README.md")
-        with open(readme_path, "w", encoding="utf-8") as f:
-            f.write(readme_content)
+        incremental = self.since is not None and self._prepare_incremental(readme_path)
+        # An incremental refresh keeps the existing logo
+        make_logo = self.logo and self.model_client.t2i_configured and not incremental
+        if self.logo and not incremental and not make_logo:
+            self.console.print("[yellow]T2I_API_KEY not set, skipping logo generation.[/yellow]")
+        # The logo is written to a fixed path, so the README can reference it while
+        # the image is still being generated; the reference is removed if that fails
+        planned_logo = os.path.join(self.output_dir, "images", "logo.png") if make_logo else None
+
+        # 结构、依赖与描述互不依赖；Logo 只依赖描述（概览），与 README 同时生成
+        concurrent = get_pipeline_config()["concurrent"]
+        graph = StageGraph(max_workers=None if concurrent else 1, wrap=telemetry.stage, cancelled=self.cancelled)
+        graph.add("structure", self._generate_project_structure)
+        graph.add("dependencies", self._generate_project_dependencies)
+        graph.add("descriptions", self._generate_script_descriptions)
+        if incremental:
+            # Sections are refreshed from the descriptions of the changed files themselves
+            graph.add(
+                "readme",
+                lambda structure, dependencies, descriptions: self._refresh_readme(
+                    structure, dependencies, descriptions, readme_path
+                ),
+                after=["structure", "dependencies", "descriptions"],
+            )
+        else:
+            # 大型项目先把文件描述逐级汇总为目录摘要，README 与 Logo 的提示词只使用有界的概览
+            graph.add("overview", self._generate_overview, after=["descriptions"])
+            if make_logo:
+                graph.add(
+                    "logo",
+                    lambda overview: generate_logo(self.output_dir, overview, self.model_client, self.console),
+                    after=["overview"],
+                )
+            graph.add(
+                "readme",
+                lambda structure, dependencies, overview: self._write_readme(
+                    structure, dependencies, overview, planned_logo, readme_path
+                ),
+                after=["structure", "dependencies", "overview"],
+            )
+        results = graph.run()
+        self.pipeline = graph.report()
+        logo_path = results.get("logo")
+        if planned_logo and not logo_path:
+            self._drop_logo_reference(readme_path)
+        self._save_sections(readme_path)
 
         self.console.print(
             f"[bold green]✔ README.md generated at: {readme_path}[/bold green]"
@@ -70,12 +200,241 @@ class aireadme:
         self.console.print(f"   📦 requirements.txt") 
         self.console.print(f"   📊 dependencies_analysis.txt")
         self.console.print(f"   📝 script_descriptions.json")
+        self.console.print(f"   🗂️  file_index.sqlite3")
+        self.console.print(f"   🧭 readme_sections.json")
+        if get_metrics_config()["enabled"]:
+            self.console.print(f"   📈 metrics.json")
         if logo_path:
             self.console.print(f"   🎨 images/logo.png")
         
         self.console.print(
             f"\n[bold green]✔ All files saved to output directory: {self.output_dir}[/bold green]"
         )
+        endpoints = self.model_client.endpoints
+        report = endpoints.report()
+        if report["requests"]:
+            self.console.print(
+                f"[dim]LLM throughput: {report['requests']} requests, {report['tokens']} tokens in "
+                f"{report['elapsed_seconds']}s ({report['requests_per_minute']} req/min, "
+                f"{report['tokens_per_minute']} tokens/min), {report['throttled']} throttled, "
+                f"final concurrency limit {report['concurrency_limit']}[/dim]"
+            )
+            if len(endpoints) > 1:
+                for stats in endpoints.stats():
+                    self.console.print(
+                        f"[dim]  endpoint {stats['name']}: {stats['requests']} requests, "
+                        f"{stats['failures']} failed, {stats['throttled']} throttled"
+                        f"{'' if stats['healthy'] else ' (unhealthy)'}[/dim]"
+                    )
+        flights = self.model_client.single_flight.stats()
+        if flights["coalesced"]:
+            self.console.print(f"[dim]LLM requests coalesced: {flights['coalesced']} identical prompts shared an in-flight request[/dim]")
+        connections = self.model_client.transport.stats()
+        if connections["api"]["requests"]:
+            api, download = connections["api"], connections["download"]
+            self.console.print(
+                f"[dim]HTTP connections: {api['requests']} API requests over {api['connections']} connections "
+                f"({api['reused']} reused), {download['requests']} downloads over {download['connections']}[/dim]"
+            )
+        if self.model_client.cache is not None:
+            stats = self.model_client.cache.stats()
+            self.console.print(
+                f"[dim]LLM cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f} KiB)[/dim]"
+            )
+        self._report_pipeline()
+        self._report_metrics()
+
+    def _write_readme(self, structure, dependencies, descriptions, logo_path, readme_path):
+        """Generate the README (streamed or in one answer) and save it to readme_path"""
+        if get_readme_config()["stream"]:
+            self._stream_readme(structure, dependencies, descriptions, logo_path, readme_path)
+        else:
+            readme_content = self._generate_readme_content(
+                structure, dependencies, descriptions, logo_path
+            )
+            with open(readme_path, "w", encoding="utf-8") as f:
+                f.write(readme_content)
+
+    def _prepare_incremental(self, readme_path):
+        """
+        Load the state of the previous run and ask git what changed since self.since
+
+        Returns:
+            Whether the README can be refreshed incrementally
+        """
+        previous = load_section_map(self.output_dir)
+        if previous is None or not os.path.exists(readme_path):
+            self.console.print("[yellow]No README from a previous run in the output directory, generating it in full.[/yellow]")
+            return False
+        self._previous_sections = previous
+        self.changed_files = git_changed_files(self.project_dir, self.since)
+        if self.changed_files is None:
+            # 没有 git 或引用无效时，退回按内容哈希判断哪些文件有变化
+            self.console.print(f"[yellow]Could not diff against '{self.since}' with git, detecting changes by content hash.[/yellow]")
+        else:
+            self.console.print(f"[cyan]{len(self.changed_files)} files changed since {self.since}[/cyan]")
+        return True
+
+    def _refresh_readme(self, structure, dependencies, descriptions, readme_path):
+        """
+        Regenerate only the README sections whose source files changed
+
+        Sections are mapped to the files they mention when the README is
+        written (see _save_sections); a section is rewritten from its current
+        text and the new descriptions of its changed files, the rest of the
+        README is kept as is.
+        """
+        previous = self._previous_sections
+        with open(readme_path, "r", encoding="utf-8") as f:
+            sections = split_sections(f.read())
+
+        current_files = {record.path for record in self._get_file_index().files()}
+        previous_files = set(previous.get("files", []))
+        changed = set(self.changed_files or ()) | self.described_files | (previous_files - current_files)
+        if current_files != previous_files:
+            changed.add(STRUCTURE_SOURCE)
+        if self._dependencies_hash != previous.get("dependencies_hash"):
+            changed.add(DEPENDENCIES_SOURCE)
+
+        stale = set(stale_sections(previous.get("sections", {}), changed))
+        if not stale:
+            self.console.print("[green]✔ README is up to date, no section depends on the changed files.[/green]")
+            return
+        # Sections renamed or removed by hand cannot be rewritten in place
+        missing = stale - {heading for heading, _ in sections}
+        if missing:
+            self.console.print(
+                f"[yellow]README sections {', '.join(sorted(missing))} no longer exist, "
+                f"generating the README in full.[/yellow]"
+            )
+            self._regenerate_readme(structure, dependencies, descriptions, readme_path)
+            return
+        self.console.print(f"Refreshing {len(stale)} of {len(sections)} README sections: {', '.join(sorted(stale))}")
+
+        descriptions = json.loads(descriptions)
+        prompts = {}
+        for heading, text in sections:
+            if heading not in stale:
+                continue
+            changes = []
+            for source in sorted(changed.intersection(previous["sections"][heading])):
+                if source == STRUCTURE_SOURCE:
+                    changes.append(f"Project structure is now:\n```\n{structure}\n```")
+                elif source == DEPENDENCIES_SOURCE:
+                    changes.append(f"Dependencies (requirements.txt) are now:\n```\n{dependencies}\n```")
+                elif source not in current_files:
+                    changes.append(f"- {source}: file was deleted")
+                else:
+                    changes.append(f"- {source}: {descriptions.get(source, 'file was modified')}")
+            prompts[heading] = SECTION_PROMPT.format(section=text.strip(), changes="\n".join(changes))
+
+        settings = self.model_client.stage_settings("readme")
+
+        def answer(heading):
+            try:
+                return self.model_client.get_answer(prompts[heading], **settings)
+            except ModelClientError as e:
+                # The other sections are still refreshed; this one keeps its old text
+                self.console.print(f"[yellow]Could not refresh section '{heading}', keeping it as is: {e}[/yellow]")
+                return None
+
+        workers = min(len(prompts), get_concurrency_config()["max_workers"])
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            answers = dict(zip(prompts, executor.map(bind_context(answer), prompts)))
+        answers = {heading: text for heading, text in answers.items() if text}
+
+        refreshed = []
+        for heading, text in sections:
+            if heading in answers:
+                new_text = clean_readme(answers[heading]).strip()
+                if not new_text.startswith("##"):
+                    new_text = text.splitlines()[0] + "\n\n" + new_text
+                # Keep the blank lines that separated the section from the next one
+                text = new_text + (text[len(text.rstrip()):] or "\n")
+            refreshed.append(text)
+        with open(readme_path, "w", encoding="utf-8") as f:
+            f.write("".join(refreshed))
+        self.console.print(f"[green]✔ Refreshed {len(answers)} README sections.[/green]")
+
+    def _regenerate_readme(self, structure, dependencies, descriptions, readme_path):
+        """Full README generation for an incremental run whose section map no longer fits the README"""
+        logo_path = os.path.join(self.output_dir, "images", "logo.png")
+        overview = self._generate_overview(descriptions)
+        self._write_readme(structure, dependencies, overview,
+                           logo_path if os.path.exists(logo_path) else None, readme_path)
+
+    def _save_sections(self, readme_path):
+        """Record which files each README section was written from, for later incremental refreshes"""
+        if not os.path.exists(readme_path):
+            return
+        with open(readme_path, "r", encoding="utf-8") as f:
+            sections = split_sections(f.read())
+        files = sorted(record.path for record in self._get_file_index().files())
+        save_section_map(self.output_dir, {
+            "commit": git_head(self.project_dir),
+            "dependencies_hash": self._dependencies_hash,
+            "files": files,
+            "sections": map_sections(sections, files),
+        })
+
+    def _drop_logo_reference(self, readme_path):
+        """Remove the logo image from a README written before logo generation failed"""
+        with open(readme_path, "r", encoding="utf-8") as f:
+            readme = f.read()
+        cleaned = re.sub(r'[ \t]*<img src="images/logo.png"[^>]*>[ \t]*\n?', "", readme)
+        if cleaned != readme:
+            with open(readme_path, "w", encoding="utf-8") as f:
+                f.write(cleaned)
+
+    def _report_pipeline(self):
+        """Print how long each stage took and which chain of stages bounded the run"""
+        pipeline = self.pipeline
+        if not pipeline:
+            return
+        table = Table(title="Pipeline stages")
+        for column in ("Stage", "After", "Start (s)", "Duration (s)", "Critical"):
+            table.add_column(column, justify="right" if column.endswith("(s)") else "left")
+        for timing in pipeline["stages"]:
+            table.add_row(
+                timing["stage"], ", ".join(timing["after"]) or "-",
+                f"{timing['start']:.2f}", f"{timing['seconds']:.2f}", "★" if timing["critical"] else "",
+            )
+        self.console.print(table)
+        self.console.print(
+            f"[dim]Critical path: {' → '.join(pipeline['critical_path'])} "
+            f"({pipeline['critical_path_seconds']:.2f}s of {pipeline['wall_seconds']:.2f}s wall time)[/dim]"
+        )
+
+    def _report_metrics(self):
+        """Write metrics.json (and the Prometheus export if configured) and print latency and cost per stage"""
+        metrics_config = get_metrics_config()
+        if not metrics_config["enabled"]:
+            return
+        telemetry = self.model_client.telemetry
+        metrics_path = os.path.join(self.output_dir, "metrics.json")
+        telemetry.write_json(metrics_path, {"pipeline": self.pipeline} if self.pipeline else None)
+        if metrics_config["prometheus_path"]:
+            telemetry.write_prometheus(metrics_config["prometheus_path"])
+
+        summary = telemetry.summary()
+        if not summary["total"]["calls"]:
+            return
+        table = Table(title="Model calls by stage")
+        for column in ("Stage", "Calls", "p50 (s)", "p95 (s)", "p99 (s)", "Queue p95 (s)",
+                       "Tokens in/out", "Retries", "Cache hits", "Cost (USD)"):
+            table.add_column(column, justify="left" if column == "Stage" else "right")
+        rows = [(name, stats) for name, stats in summary["stages"].items() if stats["calls"]]
+        for name, stats in rows + [("total", summary["total"])]:
+            table.add_row(
+                name, str(stats["calls"]),
+                f"{stats['latency']['p50']:.2f}", f"{stats['latency']['p95']:.2f}", f"{stats['latency']['p99']:.2f}",
+                f"{stats['queue_wait']['p95']:.2f}",
+                f"{stats['prompt_tokens']}/{stats['completion_tokens']}",
+                str(stats["retries"]), str(stats["cache_hits"]), f"{stats['cost_usd']:.4f}",
+            )
+        self.console.print(table)
+        self.console.print(f"[dim]Per-call metrics saved to: {metrics_path}[/dim]")
 
     def _get_basic_info(self):
         """
@@ -162,8 +521,29 @@ class aireadme:
         self.console.print("\n[green]✔ Project information collected![/green]")
         self.console.print()  # Empty line separator
 
-    def _get_git_info(self):
-        self.console.print("Gathering Git information...")
+    def _configure_headless(self):
+        """
+        Non-interactive counterpart of the _get_*_info prompts
+
+        Paths and metadata come from the constructor; the GitHub repository is
+        read from .git/config when not given, and anything still missing gets
+        the same defaults as pressing Enter at the prompts.
+        """
+        self.project_dir = os.path.abspath(self.project_dir or os.getcwd())
+        if not os.path.isdir(self.project_dir):
+            raise FileNotFoundError(f"Project path '{self.project_dir}' does not exist")
+        if self.output_dir is None:
+            self.output_dir = os.path.join(self.project_dir, "aireadme_output")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.console.print(f"[green]✔ Project path: {self.project_dir}[/green]")
+        self.console.print(f"[green]✔ Output directory: {self.output_dir}[/green]")
+        if not (self.config["github_username"] and self.config["repo_name"]):
+            self._read_git_remote()
+        for key, default in CONTACT_DEFAULTS.items():
+            self.config[key] = self.config[key] or default
+
+    def _read_git_remote(self):
+        """Fill github_username and repo_name from the origin URL in .git/config, returns whether it was found"""
         try:
             git_config_path = os.path.join(self.project_dir, ".git", "config")
             if os.path.exists(git_config_path):
@@ -178,9 +558,15 @@ class aireadme:
                     self.console.print("[green]✔ Git information gathered.[/green]")
                     self.console.print(f"[green]✔ GitHub Username: {self.config['github_username']}[/green]")
                     self.console.print(f"[green]✔ Repository Name: {self.config['repo_name']}[/green]")
-                    return
+                    return True
         except Exception as e:
             self.console.print(f"[yellow]Could not read .git/config: {e}[/yellow]")
+        return False
+
+    def _get_git_info(self):
+        self.console.print("Gathering Git information...")
+        if self._read_git_remote():
+            return
 
         self.console.print(
             "[yellow]Git info not found, please enter manually (or press Enter to use defaults):[/yellow]"
@@ -196,19 +582,40 @@ class aireadme:
         self.config["linkedin_username"] = self.console.input("[cyan]LinkedIn Username (default: your-username): [/cyan]") or "your-username"
         self.config["email"] = self.console.input("[cyan]Email (default: your.email@example.com): [/cyan]") or "your.email@example.com"
 
+    def _get_file_index(self):
+        """
+        Scan the project once and share the resulting index between stages
+        """
+        # Structure, dependencies and descriptions may ask for it concurrently
+        with self._file_index_lock:
+            if self._file_index is None or self._file_index.root != self.project_dir:
+                self.console.print("Scanning project files...")
+                # Defaults, .git/info/exclude and every nested .gitignore
+                matcher = IgnoreMatcher(self.project_dir, DEFAULT_IGNORE_PATTERNS)
+                scan_config = get_scan_config()
+                self._file_index = build_file_index(
+                    self.project_dir, matcher,
+                    walker=scan_config["walker"], max_workers=scan_config["max_workers"]
+                )
+                self.console.print(f"[green]✔ Indexed {len(self._file_index)} entries.[/green]")
+        return self._file_index
+
     def _generate_project_structure(self):
+        """
+        Write the full tree to project_structure.txt and return a bounded view for prompts
+        """
         self.console.print("Generating project structure...")
-        gitignore_patterns = load_gitignore_patterns(self.project_dir)
-        ignore_patterns = DEFAULT_IGNORE_PATTERNS + gitignore_patterns
-        structure = get_project_structure(self.project_dir, ignore_patterns)
+        file_index = self._get_file_index()
         
-        # Save project structure to output folder
+        # Save project structure to output folder, streaming line by line
         if self.output_dir:
             structure_path = os.path.join(self.output_dir, "project_structure.txt")
             with open(structure_path, "w", encoding="utf-8") as f:
-                f.write(structure)
+                write_structure(file_index, f)
             self.console.print(f"[green]✔ Project structure saved to: {structure_path}[/green]")
         
+        # 提示词中只放入有界的目录视图，避免超出模型上下文
+        structure = render_prompt_view(file_index, **get_structure_config())
         self.console.print("[green]✔ Project structure generated.[/green]")
         return structure
 
@@ -224,9 +631,7 @@ class aireadme:
             self.console.print("[yellow]Found existing requirements.txt[/yellow]")
         
         # Scan all Python files to extract import statements
-        gitignore_patterns = load_gitignore_patterns(self.project_dir)
-        ignore_patterns = DEFAULT_IGNORE_PATTERNS + gitignore_patterns
-        py_files = list(find_files(self.project_dir, ["*.py"], ignore_patterns))
+        py_files = self._get_file_index().find(["*.py"])
         
         all_imports = set()
         
@@ -250,6 +655,7 @@ class aireadme:
                 
                 # Use LLM to generate requirements.txt
                 imports_text = "\n".join(sorted(all_imports))
+                self._dependencies_hash = hash_content(f"{imports_text}\0{existing_dependencies}".encode("utf-8"))
                 prompt = f"""Based on the following import statements from a Python project, generate a requirements.txt file with appropriate package versions.
 
 Import statements found:
@@ -266,11 +672,19 @@ Please generate a complete requirements.txt file that includes:
 
 Return only the requirements.txt content, one package per line in format: package>=version
 """
-                self.console.print("Generating requirements.txt...")
-                generated_requirements = self.model_client.get_answer(prompt)
-                
-                # Clean the generated content
-                generated_requirements = self._clean_requirements_content(generated_requirements)
+                previous_requirements = self._previous_requirements()
+                if previous_requirements is not None:
+                    self.console.print("[green]✔ Imports unchanged, reusing the previous requirements.txt[/green]")
+                    generated_requirements = previous_requirements
+                else:
+                    self.console.print("Generating requirements.txt...")
+                    try:
+                        generated_requirements = self.model_client.get_answer(prompt)
+                        # Clean the generated content
+                        generated_requirements = self._clean_requirements_content(generated_requirements)
+                    except ModelClientError as e:
+                        self.console.print(f"[yellow]Warning: Could not generate requirements.txt: {e}[/yellow]")
+                        generated_requirements = existing_dependencies or "# Requirements could not be generated\n"
                 
             else:
                 generated_requirements = "# No external imports found\n"
@@ -308,6 +722,17 @@ Return only the requirements.txt content, one package per line in format: packag
         self.console.print("[green]✔ Project dependencies generated.[/green]")
         return generated_requirements
     
+    def _previous_requirements(self):
+        """requirements.txt of the previous run if its imports are unchanged (incremental refresh only)"""
+        previous = self._previous_sections
+        if not previous or previous.get("dependencies_hash") != self._dependencies_hash:
+            return None
+        path = os.path.join(self.output_dir, "requirements.txt")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
     def _extract_imports(self, content):
         """Extract import statements from Python code"""
         import re
@@ -358,73 +783,267 @@ Return only the requirements.txt content, one package per line in format: packag
         
         return '\n'.join(cleaned_lines)
 
-    def _generate_script_descriptions(self, max_workers=5):
+    def _generate_script_descriptions(self, max_workers=None, use_async=None, max_concurrency=None):
         """
-        Generate script descriptions using multithreading
+        Generate script descriptions using multithreading or asyncio
+        
+        The number of requests actually in flight is governed by the model
+        client's rate controller, which backs off when the provider throttles.
         
         Args:
-            max_workers (int): Maximum number of threads, default is 3
+            max_workers (int): Maximum number of threads; defaults to LLM_MAX_WORKERS from config
+            use_async (bool): Use the asyncio pipeline; defaults to LLM_ASYNC from config
+            max_concurrency (int): In-flight requests for the asyncio pipeline
         """
+        concurrency_config = get_concurrency_config()
+        if use_async is None:
+            use_async = concurrency_config["use_async"]
+        if max_concurrency is None:
+            max_concurrency = concurrency_config["max_concurrency"]
+        if max_workers is None:
+            max_workers = concurrency_config["max_workers"]
+
         self.console.print("Generating script and document descriptions...")
-        gitignore_patterns = load_gitignore_patterns(self.project_dir)
-        ignore_patterns = DEFAULT_IGNORE_PATTERNS + gitignore_patterns
         # 将脚本模式和文档模式合并，以便生成更全面的文件描述
         all_patterns = SCRIPT_PATTERNS + DOCUMENT_PATTERNS
-        filepaths = list(find_files(self.project_dir, all_patterns, ignore_patterns))
+        file_index = self._get_file_index()
+        records = file_index.find_records(all_patterns)
 
-        if not filepaths:
+        if not records:
             self.console.print("[yellow]No script or document files found to process.[/yellow]")
             return json.dumps({}, indent=2)
 
         table = Table(title="Files to be processed")
         table.add_column("File Path", style="cyan")
-        for filepath in filepaths:
-            table.add_row(os.path.relpath(filepath, self.project_dir))
+        for record in records:
+            table.add_row(record.path)
         self.console.print(table)
 
         descriptions = {}
         descriptions_lock = Lock()  # Thread lock to protect shared dictionary
+        reused = []  # Files whose stored description was reused
+        # 持久化索引：未变化的文件直接复用上次的描述
+        store = DescriptionStore.for_output_dir(self.output_dir) if self.output_dir else None
+        # 检查点：每完成一个文件就追加一行，中断后可用 --resume 继续
+        checkpoint = None
+        if self.output_dir:
+            checkpoint_path = os.path.join(self.output_dir, CHECKPOINT_FILENAME)
+            interrupted = not self.resume and os.path.exists(checkpoint_path)
+            checkpoint = Checkpoint(checkpoint_path, resume=self.resume)
+            if interrupted:
+                self.console.print(
+                    f"[yellow]Found the checkpoint of an interrupted run, moved to {checkpoint.previous_path} "
+                    f"(use --resume to continue a run instead)[/yellow]"
+                )
+        pending_records = records
+        if checkpoint and self.resume:
+            for record in records:
+                description = checkpoint.get(record)
+                if description is not None:
+                    descriptions[record.path] = description
+            pending_records = [r for r in records if r.path not in descriptions]
+            self.console.print(
+                f"[cyan]Resuming from checkpoint: {len(descriptions)} files done, {len(pending_records)} to go[/cyan]"
+            )
+
+        def record_result(record, description, was_reused):
+            """Store the outcome for one file, returns whether it succeeded"""
+            if description is BINARY_FILE:
+                self.console.print(f"[yellow]Skipping binary file: {record.path}[/yellow]")
+                return False
+            if not (description or "").strip():
+                # Retried like other transient failures and listed in failed_files if it persists
+                return record_failure(record, TransientModelError("The model returned an empty description"))
+            # Use lock to protect shared resource
+            with descriptions_lock:
+                descriptions[record.path] = description
+                if was_reused:
+                    reused.append(record.path)
+                else:
+                    self.described_files.add(record.path)
+            if checkpoint:
+                checkpoint.append(record, description)
+            return True
         
-        def process_file(filepath):
+        failures = {}  # Files whose LLM request failed, with the typed error
+
+        def record_failure(record, error):
+            with descriptions_lock:
+                failures[record.path] = error
+            self.console.print(f"[red]Error processing {record.path}: {error}[/red]")
+            return False
+        
+        def process_file(record):
             """Function to process a single file"""
+            filepath = file_index.abspath(record)
             try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    content = f.read()
-                
-                prompt = f"Analyze the following script and provide a concise summary. Focus on:\n1. Main purpose and functionality\n2. Key functions/methods and their roles\n3. Important features or capabilities\n\nScript content:\n{content}"
-                description = self.model_client.get_answer(prompt)
-                
-                # Use lock to protect shared resource
-                with descriptions_lock:
-                    descriptions[os.path.relpath(filepath, self.project_dir)] = description
-                
-                return True
+                return record_result(record, *self._describe_file(record, filepath, store))
+            except ModelClientError as e:
+                return record_failure(record, e)
             except Exception as e:
                 self.console.print(f"[red]Error processing {filepath}: {e}[/red]")
                 return False
 
-        # Use thread pool for concurrent processing
-        with Progress() as progress:
-            task = progress.add_task("[cyan]Generating...[/cyan]", total=len(filepaths))
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks
-                future_to_filepath = {
-                    executor.submit(process_file, filepath): filepath 
-                    for filepath in filepaths
-                }
-                
-                # Process completed tasks
-                for future in as_completed(future_to_filepath):
-                    filepath = future_to_filepath[future]
+        async def process_file_async(record):
+            """Coroutine version of process_file"""
+            filepath = file_index.abspath(record)
+            try:
+                return record_result(record, *(await self._describe_file_async(record, filepath, store)))
+            except ModelClientError as e:
+                return record_failure(record, e)
+            except Exception as e:
+                self.console.print(f"[red]Error processing {filepath}: {e}[/red]")
+                return False
+
+        def process_job(job):
+            """Describe one file, or a batch of small files with one request"""
+            if self.cancelled.is_set():
+                return []  # Picked up by a worker after cancellation, never started
+            if len(job) == 1:
+                return [(job[0], process_file(job[0]))]
+            try:
+                results, leftovers = self._describe_batch(job, file_index, store)
+            except ModelClientError as e:
+                return [(record, record_failure(record, e)) for record in job]
+            outcomes = [(r, record_result(r, *results[r.path])) for r in job if r.path in results]
+            # Files the batch answer did not cover fall back to single-file requests
+            return outcomes + [(record, process_file(record)) for record in leftovers]
+
+        async def process_job_async(job):
+            """Coroutine version of process_job"""
+            if len(job) == 1:
+                return [(job[0], await process_file_async(job[0]))]
+            try:
+                results, leftovers = await self._describe_batch_async(job, file_index, store)
+            except ModelClientError as e:
+                return [(record, record_failure(record, e)) for record in job]
+            outcomes = [(r, record_result(r, *results[r.path])) for r in job if r.path in results]
+            successes = await asyncio.gather(*(process_file_async(record) for record in leftovers))
+            return outcomes + list(zip(leftovers, successes))
+
+        batch_config = get_batching_config()
+
+        @contextmanager
+        def pass_progress(batch, label):
+            """Jobs of one pass over batch, with the callback that reports each finished file"""
+            if batch_config["enabled"]:
+                jobs = pack_small_files(batch, batch_config["max_tokens"], batch_config["max_files"],
+                                        batch_config["small_file_bytes"])
+            else:
+                jobs = [[record] for record in batch]
+            if len(jobs) < len(batch):
+                self.console.print(f"[cyan]Packed {len(batch)} files into {len(jobs)} requests[/cyan]")
+
+            with Progress(console=self.console) as progress:
+                task = progress.add_task(label, total=len(batch))
+
+                def on_done(record, success):
+                    if success:
+                        self.console.print(f"[dim]✓ {record.path}[/dim]")
+                    progress.update(task, advance=1)
+
+                yield jobs, on_done
+
+        def passes():
+            """The first pass, then retry rounds for files that failed transiently"""
+            if pending_records:
+                yield pending_records, "[cyan]Generating...[/cyan]"
+
+            # Only files that failed transiently are retried, the rest of the run is kept
+            for round_number in range(get_retry_config()["failed_file_rounds"]):
+                retry_records = [r for r in records if isinstance(failures.get(r.path), TransientModelError)]
+                if not retry_records:
+                    break
+                # Retrying while the circuit is open or the provider asked us to back off fails again at once
+                delay = max([self.model_client.circuit_wait()]
+                            + [failures[r.path].retry_after or 0.0 for r in retry_records])
+                if delay > 0:
+                    self.console.print(f"[yellow]Waiting {delay:.0f}s before retrying failed files...[/yellow]")
+                    if self.cancelled.wait(delay):
+                        raise StageCancelled("Script description generation was cancelled")
+                self.console.print(f"[yellow]Retrying {len(retry_records)} failed files (round {round_number + 1})...[/yellow]")
+                for r in retry_records:
+                    del failures[r.path]
+                yield retry_records, "[cyan]Retrying...[/cyan]"
+
+        def run_pass(batch, label):
+            with pass_progress(batch, label) as (jobs, on_done):
+                # Use thread pool for concurrent processing
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # Submit all tasks
+                    # Workers keep the caller's stage so their calls use its model and metrics
+                    process = bind_context(process_job)
+                    future_to_job = {
+                        executor.submit(process, job): job
+                        for job in jobs
+                    }
+
+                    # Process completed tasks
+                    pending = set(future_to_job)
                     try:
-                        success = future.result()
-                        if success:
-                            self.console.print(f"[dim]✓ {os.path.relpath(filepath, self.project_dir)}[/dim]")
-                        progress.update(task, advance=1)
-                    except Exception as e:
-                        self.console.print(f"[red]Exception for {filepath}: {e}[/red]")
-                        progress.update(task, advance=1)
+                        while pending:
+                            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                job = future_to_job[future]
+                                try:
+                                    for record, success in future.result():
+                                        on_done(record, success)
+                                except Exception as e:
+                                    for record in job:
+                                        self.console.print(f"[red]Exception for {file_index.abspath(record)}: {e}[/red]")
+                                        on_done(record, False)
+                            if self.cancelled.is_set():
+                                raise StageCancelled("Script description generation was cancelled")
+                    except BaseException:
+                        # Queued jobs never start; running ones finish (and are checkpointed) before the pool shuts down
+                        for future in pending:
+                            future.cancel()
+                        raise
+
+        async def run_passes_async():
+            try:
+                for batch, label in passes():
+                    with pass_progress(batch, label) as (jobs, on_done):
+                        await self._run_async_descriptions(jobs, process_job_async, on_done, max_concurrency)
+            finally:
+                # The async clients belong to this loop; later loops build their own
+                await self.model_client.aclose()
+
+        try:
+            if use_async:
+                # One event loop for the first pass and all retry rounds
+                asyncio.run(run_passes_async())
+            else:
+                for batch, label in passes():
+                    run_pass(batch, label)
+        except BaseException:
+            if checkpoint:
+                checkpoint.close()
+                self.console.print(
+                    f"[yellow]{len(descriptions)} of {len(records)} descriptions kept in {checkpoint.path}; "
+                    f"continue with --resume[/yellow]"
+                )
+            if store:
+                store.close()
+            raise
+
+        self.failed_files = {path: str(error) for path, error in failures.items()}
+        if self.failed_files:
+            self.console.print(f"[yellow]⚠ {len(self.failed_files)} files could not be described.[/yellow]")
+            if self.output_dir:
+                failed_path = os.path.join(self.output_dir, "failed_files.json")
+                with open(failed_path, "w", encoding="utf-8") as f:
+                    json.dump(self.failed_files, f, indent=2, ensure_ascii=False)
+                self.console.print(f"[yellow]  Failed files listed in: {failed_path}[/yellow]")
+
+        if store:
+            store.prune(r.path for r in records)
+            store.close()
+            if reused:
+                self.console.print(f"[green]✔ Reused {len(reused)} unchanged descriptions from {store.db_path}[/green]")
+        if checkpoint:
+            # Everything is in script_descriptions.json and the store from here on
+            checkpoint.remove()
 
         # Save script descriptions to output folder
         descriptions_json = json.dumps(descriptions, indent=2, ensure_ascii=False)
@@ -434,21 +1053,337 @@ Return only the requirements.txt content, one package per line in format: packag
                 f.write(descriptions_json)
             self.console.print(f"[green]✔ Script and document descriptions saved to: {descriptions_path}[/green]")
         
-        self.console.print(f"[green]✔ Script and document descriptions generated using {max_workers} threads.[/green]")
+        if use_async:
+            self.console.print(f"[green]✔ Script and document descriptions generated with up to {max_concurrency} concurrent requests.[/green]")
+        else:
+            self.console.print(f"[green]✔ Script and document descriptions generated using {max_workers} threads.[/green]")
         self.console.print(f"[green]✔ Processed {len(descriptions)} files successfully.[/green]")
         return descriptions_json
 
-    def _generate_readme_content(
-        self, structure, dependencies, descriptions, logo_path
-    ):
-        self.console.print("Generating README content...")
+    def _generate_overview(self, descriptions):
+        """
+        Condense the file descriptions into a bounded-size overview for the README prompt
+
+        Small projects keep their descriptions as they are. Above
+        OVERVIEW_THRESHOLD_TOKENS the descriptions are rolled up into one
+        summary per directory, bottom-up with each depth summarized in
+        parallel, and the README gets the root and package-level summaries.
+
+        Args:
+            descriptions (str): JSON of the file descriptions
+
+        Returns:
+            str: The descriptions, or the overview that replaces them
+        """
+        overview_config = get_overview_config()
+        if not overview_config["enabled"] or estimate_tokens(descriptions) <= overview_config["threshold_tokens"]:
+            return descriptions
+        file_descriptions = json.loads(descriptions)
+        self.console.print(f"Summarizing {len(file_descriptions)} file descriptions by directory...")
+
+        def answer(prompt):
+            try:
+                return self.model_client.get_answer(prompt)
+            except ModelClientError as e:
+                self.console.print(f"[yellow]Warning: Could not summarize a directory: {e}[/yellow]")
+                return None
+
+        answer = bind_context(answer)
+        with ThreadPoolExecutor(max_workers=get_concurrency_config()["max_workers"]) as executor:
+            summaries = summarize_directories(
+                file_descriptions, lambda prompts: list(executor.map(answer, prompts)),
+                overview_config["group_tokens"],
+            )
+        if self.output_dir:
+            summaries_path = os.path.join(self.output_dir, "directory_summaries.json")
+            with open(summaries_path, "w", encoding="utf-8") as f:
+                json.dump(summaries, f, indent=2, ensure_ascii=False)
+            self.console.print(f"[green]✔ Directory summaries saved to: {summaries_path}[/green]")
+        overview = render_overview(summaries, len(file_descriptions), overview_config["max_tokens"])
+        self.console.print(
+            f"[green]✔ Condensed {estimate_tokens(descriptions)} tokens of descriptions into a "
+            f"{estimate_tokens(overview)}-token overview of {len(summaries)} directories.[/green]"
+        )
+        return overview
+
+    async def _run_async_descriptions(self, jobs, process_job_async, on_done, max_concurrency):
+        """
+        Run process_job_async over all jobs with at most max_concurrency in flight
+
+        Tasks are created only when a semaphore slot is free, so huge file lists
+        do not turn into huge numbers of pending coroutines. Each job yields
+        (record, success) pairs that are passed to on_done.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        pending = set()
+        cancelled = False
+
+        async def run(job):
+            try:
+                for record, success in await process_job_async(job):
+                    on_done(record, success)
+            finally:
+                semaphore.release()
+
+        for job in jobs:
+            await semaphore.acquire()
+            if self.cancelled.is_set():
+                # Stop scheduling, but let the requests in flight finish and be recorded
+                semaphore.release()
+                cancelled = True
+                break
+            task = asyncio.ensure_future(run(job))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+        if cancelled:
+            raise StageCancelled("Script description generation was cancelled")
+
+    def _lookup_description(self, record, filepath, store=None):
+        """
+        Find the stored description of an unchanged file
+
+        Returns:
+            tuple: (description or None, content hash or None if it was not needed)
+        """
+        if store:
+            description = store.lookup(record.path, record.size, record.mtime)
+            if description is not None:
+                return description, None
+            if self.changed_files is not None and record.path not in self.changed_files:
+                # Unchanged according to git, e.g. only the mtime moved in a fresh checkout
+                description = store.latest(record.path)
+                if description is not None:
+                    return description, None
+
+        content_hash = hash_file(filepath)
+
+        if store:
+            description = store.get(record.path, content_hash)
+            if description is not None:
+                # Content unchanged, only the mtime moved
+                store.put(record.path, record.size, record.mtime, content_hash, description)
+                return description, content_hash
+
+        # A duplicate of a file already described in this run
+        description = self._descriptions_by_hash.get(content_hash)
+        if description is not None and store:
+            store.put(record.path, record.size, record.mtime, content_hash, description)
+        return description, content_hash
+
+    def _prepare_description(self, record, filepath, store=None):
+        """
+        Look up a stored description or build the prompts for a file
+
+        Returns:
+            tuple: (description, prompts, content_hash); exactly one of description
+                and prompts is set, the description being BINARY_FILE for binary files.
+                More than one prompt means the file is summarized chunk by chunk.
+        """
+        description, content_hash = self._lookup_description(record, filepath, store)
+        if description is not None:
+            return description, None, content_hash
+
+        read_config = get_file_read_config()
+        chunk_config = get_chunking_config()
+        max_bytes = byte_budget(read_config["max_bytes"], read_config["max_tokens"])
+        chunked = chunk_config["enabled"] and record.size > max_bytes
+        sample = read_for_prompt(
+            filepath,
+            max_bytes=max(max_bytes, chunk_config["max_file_bytes"]) if chunked else max_bytes,
+            samples=read_config["samples"],
+        )
+        if sample.binary:
+            return BINARY_FILE, None, content_hash
+
+        content = sample.text
+        if sample.truncated:
+            content = f"(Large file of {sample.size:,} bytes; showing the beginning, the end and sampled excerpts.)\n{content}"
+        if chunked:
+            chunks = split_into_chunks(content, chunk_config["chunk_tokens"])
+            if len(chunks) > 1:
+                return None, [
+                    CHUNK_PROMPT.format(index=i, total=len(chunks), path=record.path,
+                                        start=chunk.start_line, end=chunk.end_line, content=chunk.text)
+                    for i, chunk in enumerate(chunks, 1)
+                ], content_hash
+        prompt = f"Analyze the following script and provide a concise summary. Focus on:\n1. Main purpose and functionality\n2. Key functions/methods and their roles\n3. Important features or capabilities\n\nScript content:\n{content}"
+        return None, [prompt], content_hash
+
+    def _reduce_prompts(self, path, summaries):
+        """Group chunk summaries into reduce prompts that each fit the chunk budget"""
+        groups = group_by_budget(summaries, get_chunking_config()["chunk_tokens"])
+        if len(groups) == len(summaries):
+            # Summaries too long to combine within the budget: merge pairwise so the loop still ends
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        return [REDUCE_PROMPT.format(path=path, summaries="\n\n".join(group)) for group in groups]
+
+    def _summarize(self, path, prompts):
+        """
+        Map-reduce summarization: answer the chunk prompts in parallel, then merge
+        the partial summaries until a single description is left
+        """
+        if len(prompts) == 1:
+            return self.model_client.get_answer(prompts[0])
+        workers = min(len(prompts), get_chunking_config()["max_workers"])
+        answer = bind_context(self.model_client.get_answer)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            summaries = list(executor.map(answer, prompts))
+            while len(summaries) > 1:
+                summaries = list(executor.map(answer, self._reduce_prompts(path, summaries)))
+        return summaries[0]
+
+    async def _summarize_async(self, path, prompts):
+        """Coroutine version of _summarize; chunk requests are bounded by the rate controller"""
+        summaries = await asyncio.gather(*(self.model_client.get_answer_async(p) for p in prompts))
+        while len(summaries) > 1:
+            summaries = await asyncio.gather(
+                *(self.model_client.get_answer_async(p) for p in self._reduce_prompts(path, summaries))
+            )
+        return summaries[0]
+
+    def _describe_file(self, record, filepath, store=None):
+        """
+        Describe a single file, reusing the stored description when it is unchanged
+
+        Args:
+            record: FileRecord of the file
+            filepath: Absolute path of the file
+            store: Optional DescriptionStore of a previous run
+
+        Returns:
+            tuple: (description, whether it was reused from the store);
+                the description is BINARY_FILE for binary files
+        """
+        description, prompts, content_hash = self._prepare_description(record, filepath, store)
+        if prompts is None:
+            return description, description is not BINARY_FILE
+
+        description = self._summarize(record.path, prompts)
+        if not (description or "").strip():
+            return description, False
+        self._descriptions_by_hash[content_hash] = description
+        if store:
+            store.put(record.path, record.size, record.mtime, content_hash, description)
+        return description, False
+
+    async def _describe_file_async(self, record, filepath, store=None):
+        """Coroutine version of _describe_file; file I/O runs on the default executor"""
+        loop = asyncio.get_running_loop()
+        description, prompts, content_hash = await loop.run_in_executor(
+            None, self._prepare_description, record, filepath, store
+        )
+        if prompts is None:
+            return description, description is not BINARY_FILE
+
+        description = await self._summarize_async(record.path, prompts)
+        if not (description or "").strip():
+            return description, False
+        self._descriptions_by_hash[content_hash] = description
+        if store:
+            store.put(record.path, record.size, record.mtime, content_hash, description)
+        return description, False
+
+    def _prepare_batch(self, records, file_index, store=None):
+        """
+        Resolve stored and binary files of a batch and read the rest
+
+        Returns:
+            tuple: (results, pending) where results maps paths to
+                (description, reused) and pending lists (record, content, content_hash)
+                for the files that still need the LLM
+        """
+        small_file_bytes = get_batching_config()["small_file_bytes"]
+        results, pending = {}, []
+        for record in records:
+            filepath = file_index.abspath(record)
+            description, content_hash = self._lookup_description(record, filepath, store)
+            if description is not None:
+                results[record.path] = (description, True)
+                continue
+            sample = read_for_prompt(filepath, max_bytes=small_file_bytes, samples=0)
+            if sample.binary:
+                results[record.path] = (BINARY_FILE, False)
+                continue
+            pending.append((record, sample.text, content_hash))
+        return results, pending
+
+    def _batch_request(self, pending):
+        """Prompt and answer length for a batch of (record, content, content_hash)"""
+        prompt = BATCH_PROMPT.format(
+            count=len(pending),
+            files=format_batch_files([(record.path, content) for record, content, _ in pending]),
+        )
+        max_tokens = max(self.model_client.stage_settings()["max_tokens"],
+                         get_batching_config()["answer_tokens_per_file"] * len(pending))
+        return prompt, max_tokens
+
+    def _finish_batch(self, answer, pending, results, store=None):
+        """Split a batch answer into per-file results; returns records left without a description"""
+        parsed = parse_batch_response(answer, [record.path for record, _, _ in pending])
+        leftovers = []
+        for record, _, content_hash in pending:
+            description = parsed.get(record.path)
+            if description is None:
+                leftovers.append(record)
+                continue
+            self._descriptions_by_hash[content_hash] = description
+            if store:
+                store.put(record.path, record.size, record.mtime, content_hash, description)
+            results[record.path] = (description, False)
+        return leftovers
+
+    def _describe_batch(self, records, file_index, store=None):
+        """
+        Describe several small files with one request
+
+        Args:
+            records: FileRecords of the batch
+            file_index: FileIndex the records belong to
+            store: Optional DescriptionStore of a previous run
+
+        Returns:
+            tuple: (results, leftovers) where results maps paths to (description,
+                reused) and leftovers are records to describe one by one because
+                the answer could not be parsed for them
+
+        Raises:
+            TransientModelError: The batch request failed after retries
+        """
+        results, pending = self._prepare_batch(records, file_index, store)
+        if len(pending) < 2:
+            return results, [record for record, _, _ in pending]
+        prompt, max_tokens = self._batch_request(pending)
+        try:
+            answer = self.model_client.get_answer(prompt, max_tokens=max_tokens)
+        except PermanentModelError:
+            # e.g. the batch exceeds the context window; single requests may still succeed
+            answer = None
+        return results, self._finish_batch(answer, pending, results, store)
+
+    async def _describe_batch_async(self, records, file_index, store=None):
+        """Coroutine version of _describe_batch"""
+        loop = asyncio.get_running_loop()
+        results, pending = await loop.run_in_executor(None, self._prepare_batch, records, file_index, store)
+        if len(pending) < 2:
+            return results, [record for record, _, _ in pending]
+        prompt, max_tokens = self._batch_request(pending)
+        try:
+            answer = await self.model_client.get_answer_async(prompt, max_tokens=max_tokens)
+        except PermanentModelError:
+            answer = None
+        return results, self._finish_batch(answer, pending, results, store)
+
+    def _build_readme_prompt(self, structure, dependencies, descriptions, logo_path):
+        """Fill the README template and build the generation prompt; None if the template is missing"""
         try:
             template_path = get_readme_template_path()
             with open(template_path, "r") as f:
                 template = f.read()
         except FileNotFoundError as e:
             self.console.print(f"[red]Error: {e}[/red]")
-            return ""
+            return None
 
         # Replace placeholders
         for key, value in self.config.items():
@@ -530,8 +1465,62 @@ Return only the requirements.txt content, one package per line in format: packag
 
         Please ensure the final README is well-structured, professional, and incorporates all the user-provided information appropriately.
         """
-        readme = self.model_client.get_answer(prompt)
+        return prompt
+
+    def _generate_readme_content(
+        self, structure, dependencies, descriptions, logo_path
+    ):
+        self.console.print("Generating README content...")
+        prompt = self._build_readme_prompt(structure, dependencies, descriptions, logo_path)
+        if prompt is None:
+            return ""
+        # The README is written by the premium-tier model (see get_stage_model_config)
+        readme = self.model_client.get_answer(prompt, **self.model_client.stage_settings("readme"))
+        self.console.print("[green]✔ README content generated.[/green]")
+        return clean_readme(readme)
+
+    def _stream_readme(self, structure, dependencies, descriptions, logo_path, readme_path):
+        """
+        Generate the README with a streaming completion, writing it as it arrives
+
+        Chunks go to a temporary file next to readme_path (and to the terminal
+        when README_STREAM_ECHO is on), which replaces readme_path atomically
+        once the answer is complete, so an interrupted run never leaves a
+        half-written README behind. Answers cut off by the token limit are
+        continued automatically.
+        """
+        readme_config = get_readme_config()
+        self.console.print("Generating README content...")
+        prompt = self._build_readme_prompt(structure, dependencies, descriptions, logo_path)
+
+        fd, temp_path = tempfile.mkstemp(
+            prefix=".README.", suffix=".tmp", dir=os.path.dirname(readme_path) or "."
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                if prompt is not None:
+                    for text in self.model_client.stream_answer(
+                        prompt,
+                        max_continuations=readme_config["max_continuations"],
+                        **self.model_client.stage_settings("readme"),
+                    ):
+                        f.write(text)
+                        f.flush()
+                        if readme_config["echo"]:
+                            self.console.print(text, end="", markup=False, highlight=False)
+            if readme_config["echo"] and prompt is not None:
+                self.console.print()
+
+            # Code fences can only be stripped once the whole answer is known
+            with open(temp_path, "r", encoding="utf-8") as f:
+                raw = f.read()
+            readme = clean_readme(raw)
+            if readme != raw:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(readme)
+            os.replace(temp_path, readme_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
         self.console.print("[green]✔ README content generated.[/green]")
-        # Simple cleaning, remove ```readme``` and ```markdown```
-        readme = readme.replace("```readme", "").replace("```markdown", "").strip("```")
         return readme
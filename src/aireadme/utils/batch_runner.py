@@ -0,0 +1,208 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from rich.console import Console
+from rich.table import Table
+from aireadme.config import get_concurrency_config
+
+# Keys of a manifest entry besides the README metadata fields
+ENTRY_KEYS = ("project_dir", "output_dir", "logo", "since", "resume", "metadata")
+
+
+def load_manifest(path: str) -> List[Dict[str, object]]:
+    """
+    Read the repositories of a batch run from a JSON list or a JSON Lines file
+
+    Each entry needs a project_dir and may set output_dir, logo, since (git
+    ref for an incremental refresh), resume (continue from the checkpoint of
+    an interrupted run) and metadata; README metadata fields
+    (github_username, project_description, ...) can also be given at the top
+    level of the entry. Relative paths are resolved against the manifest's
+    directory.
+
+    Returns:
+        Entries with project_dir, output_dir, logo, since, resume and metadata keys
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        raw_entries = json.loads(text)
+    else:
+        raw_entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    entries = []
+    for number, raw in enumerate(raw_entries, 1):
+        if isinstance(raw, str):
+            raw = {"project_dir": raw}
+        if not raw.get("project_dir"):
+            raise ValueError(f"Manifest entry {number} has no project_dir")
+        metadata = dict(raw.get("metadata") or {})
+        metadata.update({key: value for key, value in raw.items() if key not in ENTRY_KEYS})
+        output_dir = raw.get("output_dir")
+        entries.append({
+            "project_dir": os.path.join(base_dir, raw["project_dir"]),
+            "output_dir": os.path.join(base_dir, output_dir) if output_dir else None,
+            "logo": raw.get("logo"),
+            "since": raw.get("since"),
+            "resume": bool(raw.get("resume")),
+            "metadata": metadata,
+        })
+    return entries
+
+
+def worker_budget(workers: int) -> Dict[str, str]:
+    """
+    Share of the LLM concurrency and rate budget for each of workers processes
+
+    The configured LLM_MAX_CONCURRENCY, LLM_RPM and LLM_TPM apply to the whole
+    batch, so each worker gets an equal slice and together they stay within it.
+
+    Returns:
+        Environment variables to set in every worker
+    """
+    config = get_concurrency_config()
+    workers = max(1, workers)
+    budget = {"LLM_MAX_CONCURRENCY": str(max(1, config["max_concurrency"] // workers))}
+    for name, key in (("LLM_RPM", "requests_per_minute"), ("LLM_TPM", "tokens_per_minute")):
+        if config[key]:
+            budget[name] = str(config[key] / workers)
+    return budget
+
+
+def _init_worker(env: Dict[str, str]):
+    os.environ.update(env)
+
+
+def run_repo(entry: Dict[str, object], logo: Optional[bool] = None) -> Dict[str, object]:
+    """
+    Generate the README of one manifest entry without prompting
+
+    Output of the run goes to aireadme.log in the entry's output directory.
+    Errors are reported in the result rather than raised, so one broken
+    repository does not stop the batch.
+
+    Returns:
+        Result row: project, output_dir, status, error, seconds, calls,
+        prompt_tokens, completion_tokens, cost_usd and failed_files
+    """
+    from aireadme.core import aireadme
+
+    project_dir = os.path.abspath(str(entry["project_dir"]))
+    output_dir = entry.get("output_dir") or os.path.join(project_dir, "aireadme_output")
+    result = {
+        "project": project_dir, "output_dir": output_dir, "status": "ok", "error": "",
+        "seconds": 0.0, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        "cost_usd": 0.0, "failed_files": 0,
+    }
+    start = time.perf_counter()
+    generator = None
+    try:
+        if not os.path.isdir(project_dir):
+            raise FileNotFoundError(f"Project path '{project_dir}' does not exist")
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "aireadme.log"), "w", encoding="utf-8") as log:
+            console = Console(file=log, width=120)
+            entry_logo = entry.get("logo")
+            generator = aireadme(
+                project_dir=project_dir, output_dir=output_dir,
+                logo=logo if entry_logo is None else bool(entry_logo),
+                metadata=entry.get("metadata"), interactive=False, console=console,
+                since=entry.get("since"), resume=bool(entry.get("resume")),
+            )
+            try:
+                generator.generate()
+            except Exception as e:
+                console.print(f"[red]Error: {e}[/red]")
+                raise
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    if generator is not None:
+        total = generator.model_client.telemetry.summary()["total"]
+        result.update(
+            calls=total["calls"], prompt_tokens=total["prompt_tokens"],
+            completion_tokens=total["completion_tokens"], cost_usd=total["cost_usd"],
+            failed_files=len(generator.failed_files),
+        )
+        if result["status"] == "ok" and generator.failed_files:
+            result["status"] = "partial"
+    return result
+
+
+def run_batch(entries: List[Dict[str, object]], workers: int, logo: Optional[bool] = None,
+              console: Optional[Console] = None) -> List[Dict[str, object]]:
+    """
+    Generate READMEs for many repositories in parallel worker processes
+
+    Args:
+        entries: Manifest entries, see load_manifest
+        workers: Worker processes; 1 runs the repositories one by one in this process
+        logo: Generate logos unless an entry says otherwise, defaults to GENERATE_LOGO
+        console: Console for progress lines
+
+    Returns:
+        Result rows of run_repo in manifest order
+    """
+    console = console or Console()
+    workers = max(1, min(workers, len(entries)))
+    results: List[Optional[Dict[str, object]]] = [None] * len(entries)
+
+    def report(index, result):
+        results[index] = result
+        done = sum(r is not None for r in results)
+        style = {"ok": "green", "partial": "yellow"}.get(result["status"], "red")
+        console.print(
+            f"[{style}]{done}/{len(entries)} {result['status']}: {result['project']} "
+            f"({result['seconds']:.1f}s)[/{style}]"
+            + (f" [red]{result['error']}[/red]" if result["error"] else "")
+        )
+
+    if workers == 1:
+        for index, entry in enumerate(entries):
+            report(index, run_repo(entry, logo))
+        return results
+
+    console.print(f"[cyan]Generating {len(entries)} READMEs with {workers} worker processes...[/cyan]")
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(worker_budget(workers),)
+    )
+    futures = {executor.submit(run_repo, entry, logo): index for index, entry in enumerate(entries)}
+    try:
+        for future in as_completed(futures):
+            report(futures[future], future.result())
+    except KeyboardInterrupt:
+        # Repositories already being generated finish, the rest never start
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        executor.shutdown(wait=True)
+    return results
+
+
+def print_summary(results: List[Dict[str, object]], console: Console):
+    """Print time, tokens, cost and failures per repository and for the whole batch"""
+    table = Table(title="Batch summary")
+    for column in ("Repository", "Status", "Time (s)", "Calls", "Tokens in/out", "Cost (USD)", "Failed files"):
+        table.add_column(column, justify="left" if column in ("Repository", "Status") else "right")
+    for result in results:
+        table.add_row(
+            os.path.basename(str(result["project"]).rstrip(os.sep)) or str(result["project"]), str(result["status"]),
+            f"{result['seconds']:.1f}", str(result["calls"]),
+            f"{result['prompt_tokens']}/{result['completion_tokens']}",
+            f"{result['cost_usd']:.4f}", str(result["failed_files"]),
+        )
+    failed = sum(r["status"] == "failed" for r in results)
+    table.add_row(
+        "total", f"{len(results) - failed}/{len(results)} ok",
+        f"{sum(r['seconds'] for r in results):.1f}", str(sum(r["calls"] for r in results)),
+        f"{sum(r['prompt_tokens'] for r in results)}/{sum(r['completion_tokens'] for r in results)}",
+        f"{sum(r['cost_usd'] for r in results):.4f}", str(sum(r["failed_files"] for r in results)),
+    )
+    console.print(table)
+    for result in results:
+        if result["error"]:
+            console.print(f"[red]{result['project']}: {result['error']}[/red]")
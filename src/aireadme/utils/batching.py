@@ -0,0 +1,102 @@
+import json
+import re
+from bisect import bisect_left, insort
+from typing import Dict, List, Sequence, Tuple
+from aireadme.utils.file_index import FileRecord
+from aireadme.utils.file_reader import BYTES_PER_TOKEN
+
+# Path header and JSON framing added for every file in a batch
+PER_FILE_OVERHEAD_TOKENS = 20
+
+_CODE_FENCE = re.compile(r"^```[\w-]*\s*|\s*```$")
+
+
+def estimate_record_tokens(record: FileRecord) -> int:
+    """Prompt tokens a file adds to a batch, estimated from its size."""
+    return record.size // BYTES_PER_TOKEN + PER_FILE_OVERHEAD_TOKENS
+
+
+def pack_small_files(records: Sequence[FileRecord], max_tokens: int, max_files: int,
+                     small_file_bytes: int) -> List[List[FileRecord]]:
+    """
+    Group files into jobs for the description pipeline
+
+    Files up to small_file_bytes are bin-packed (best-fit decreasing) into
+    batches of at most max_files files and max_tokens estimated prompt tokens.
+    Only bins that can still take a file are searched, by binary search on
+    their remaining budget, so packing stays fast for hundreds of thousands
+    of files.
+    Every other file becomes a job of its own. A batch that ends up holding a
+    single file is just a single-file job.
+
+    Args:
+        records: Files to describe
+        max_tokens: Prompt token budget per batch
+        max_files: Upper bound for files per batch
+        small_file_bytes: Size limit for files that may be batched
+
+    Returns:
+        Jobs, each a non-empty list of records; singles keep their input order
+        and come first so that large files start early
+    """
+    singles, small = [], []
+    for record in records:
+        if max_files > 1 and record.size <= small_file_bytes and estimate_record_tokens(record) <= max_tokens:
+            small.append(record)
+        else:
+            singles.append(record)
+
+    small.sort(key=lambda r: r.size, reverse=True)
+    min_tokens = estimate_record_tokens(small[-1]) if small else 0
+    bins: List[List[FileRecord]] = []
+    # (remaining tokens, bin number) of the bins that can still take a file, sorted
+    open_bins: List[Tuple[int, int]] = []
+    for record in small:
+        tokens = estimate_record_tokens(record)
+        i = bisect_left(open_bins, (tokens, -1))
+        if i < len(open_bins):
+            remaining, number = open_bins.pop(i)
+        else:
+            bins.append([])
+            remaining, number = max_tokens, len(bins) - 1
+        bins[number].append(record)
+        remaining -= tokens
+        # Full bins, and bins even the smallest file no longer fits, are never looked at again
+        if len(bins[number]) < max_files and remaining >= min_tokens:
+            insort(open_bins, (remaining, number))
+    return [[record] for record in singles] + bins
+
+
+def format_batch_files(entries: Sequence[tuple]) -> str:
+    """Render (path, content) pairs as delimited file sections for a batch prompt."""
+    return "\n\n".join(f"=== FILE: {path} ===\n{content}\n=== END FILE: {path} ===" for path, content in entries)
+
+
+def parse_batch_response(text: str, paths: Sequence[str]) -> Dict[str, str]:
+    """
+    Extract per-file descriptions from a JSON answer keyed by path
+
+    Tolerates code fences and text around the JSON object. Keys that were not
+    asked for and non-string or empty values are dropped, so callers can fall
+    back to single-file requests for whatever is missing.
+
+    Returns:
+        Descriptions by path; empty if the answer is not a JSON object
+    """
+    if not text:
+        return {}
+    text = _CODE_FENCE.sub("", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    wanted = set(paths)
+    return {
+        path: value.strip() for path, value in data.items()
+        if path in wanted and isinstance(value, str) and value.strip()
+    }
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+from threading import Lock
+from typing import Dict, Optional
+
+CHECKPOINT_FILENAME = "descriptions.checkpoint.jsonl"
+
+
+class Checkpoint:
+    """
+    Append-only JSON Lines journal of the file descriptions finished in a run
+
+    Every description is written and flushed as soon as its file is done, so a
+    run that is killed keeps everything it finished. Each line records the
+    file's size and mtime, so a resumed run only trusts entries for files that
+    have not changed since. Safe to share between threads.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        """
+        Open the checkpoint
+
+        Args:
+            path: JSON Lines file, created if missing
+            resume: Keep the entries of an earlier run instead of starting empty;
+                otherwise an existing checkpoint is moved aside to path.previous
+        """
+        self.path = path
+        self.previous_path = path + ".previous"
+        self.entries = self.load(path) if resume else {}
+        self._lock = Lock()
+        if resume:
+            self._compact()
+        elif os.path.exists(path):
+            # Never silently drop the checkpoint of an interrupted run
+            os.replace(path, self.previous_path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _compact(self):
+        """
+        Rewrite the loaded entries without a line torn by a crash
+
+        The new journal is written to a temporary file that replaces the old one
+        atomically, so an interrupt at any point leaves one of them intact.
+        """
+        directory = os.path.dirname(self.path) or "."
+        fd, temp_path = tempfile.mkstemp(prefix=".checkpoint.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def load(path: str) -> Dict[str, dict]:
+        """Entries by file path; unreadable lines (e.g. the last one after a crash) are skipped."""
+        entries = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict) and "path" in entry and "description" in entry:
+                        entries[entry["path"]] = entry
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def get(self, record) -> Optional[str]:
+        """Description from the earlier run if the file is unchanged since."""
+        entry = self.entries.get(record.path)
+        if entry and entry.get("size") == record.size and entry.get("mtime") == record.mtime:
+            return entry["description"]
+        return None
+
+    def append(self, record, description: str):
+        entry = {"path": record.path, "size": record.size, "mtime": record.mtime, "description": description}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.entries[record.path] = entry
+            if not self._file.closed:
+                self._file.write(line)
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def remove(self):
+        """Delete the checkpoint once the run it protects has completed."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
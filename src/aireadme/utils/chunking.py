@@ -0,0 +1,148 @@
+import re
+from typing import List
+from aireadme.utils.rate_limiter import estimate_tokens
+
+# Lines that start a definition in common languages (Python, JS/TS, Go, Rust, Java, ...)
+_DEFINITION = re.compile(
+    r"(?:export\s+(?:default\s+)?)?(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?"
+    r"(?:(?:def|class|function|func|fn|interface|struct|enum|impl|trait|module|"
+    r"public|private|protected|static)\b|const\s+\w+\s*=\s*(?:async\s*)?(?:\(|function\b))"
+)
+# Decorators, annotations, attributes and comments stay attached to the definition below them
+_ATTACHED = ("@", "#", "//", "/*", "*")
+
+
+class Chunk:
+    """A run of whole lines from a file, sized to fit one prompt."""
+
+    __slots__ = ("text", "start_line", "end_line")
+
+    def __init__(self, text: str, start_line: int, end_line: int):
+        self.text = text
+        self.start_line = start_line
+        self.end_line = end_line
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _split_at_definitions(lines: List[str], start: int, end: int, indent: int) -> List[int]:
+    """
+    Line numbers in (start, end) where a definition at the given indentation begins
+
+    Decorators and the comment block directly above a definition are kept with it.
+    """
+    cuts = []
+    for i in range(start + 1, end):
+        line = lines[i]
+        if _indent(line) != indent or not _DEFINITION.match(line.lstrip()):
+            continue
+        cut = i
+        while cut - 1 > start and _indent(lines[cut - 1]) == indent \
+                and lines[cut - 1].lstrip().startswith(_ATTACHED):
+            cut -= 1
+        if cut == start + 1 and _indent(lines[start]) < indent:
+            continue  # Keep a class header with its first member
+        if not cuts or cut > cuts[-1]:
+            cuts.append(cut)
+    return cuts
+
+
+def _segments(lines: List[str], start: int, end: int, max_tokens: int, indent: int = 0) -> List[range]:
+    """Split lines[start:end] into line ranges that each fit max_tokens where possible."""
+    if estimate_tokens("".join(lines[start:end])) <= max_tokens:
+        return [range(start, end)]
+
+    cuts = _split_at_definitions(lines, start, end, indent)
+    if cuts:
+        bounds = [start] + cuts + [end]
+        result = []
+        for a, b in zip(bounds, bounds[1:]):
+            result.extend(_segments(lines, a, b, max_tokens, indent))
+        return result
+
+    # No definitions at this level: look one indentation level deeper (methods of a class)
+    deeper = [_indent(line) for line in lines[start + 1:end] if line.strip() and _indent(line) > indent]
+    if deeper:
+        return _segments(lines, start, end, max_tokens, min(deeper))
+
+    # Flat code: fall back to fixed runs of lines
+    result = []
+    run_start, run_tokens = start, 0
+    for i in range(start, end):
+        tokens = estimate_tokens(lines[i])
+        if run_tokens + tokens > max_tokens and i > run_start:
+            result.append(range(run_start, i))
+            run_start, run_tokens = i, 0
+        run_tokens += tokens
+    result.append(range(run_start, end))
+    return result
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[Chunk]:
+    """
+    Split source text into chunks of at most about max_tokens tokens
+
+    Cuts are made on function/class boundaries where possible, first at the top
+    level and then inside oversized classes; only code without such boundaries
+    is cut into plain runs of lines. Neighbouring small pieces are packed
+    together so the number of chunks stays low. A single line longer than the
+    budget is cut by characters.
+
+    Args:
+        text: Source text
+        max_tokens: Token budget per chunk
+
+    Returns:
+        Chunks in file order; empty for empty text
+    """
+    lines = text.splitlines(keepends=True)
+    if not lines:
+        return []
+
+    chunks = []
+    current, current_start, current_tokens = [], 0, 0
+
+    def flush(end_line):
+        if current:
+            chunks.append(Chunk("".join(current), current_start + 1, end_line))
+
+    for segment in _segments(lines, 0, len(lines), max_tokens):
+        piece = "".join(lines[i] for i in segment)
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            flush(segment.start)
+            current, current_start, current_tokens = [], segment.start, 0
+        if not current:
+            current_start = segment.start
+        if tokens > max_tokens and len(segment) == 1:
+            # One enormous line (minified code, embedded data)
+            step = max_tokens * 4
+            for offset in range(0, len(piece), step):
+                chunks.append(Chunk(piece[offset:offset + step], segment.start + 1, segment.start + 1))
+            current_start = segment.stop
+            continue
+        current.append(piece)
+        current_tokens += tokens
+    flush(len(lines))
+    return chunks
+
+
+def group_by_budget(texts: List[str], max_tokens: int) -> List[List[str]]:
+    """Pack consecutive texts into groups whose combined estimate fits max_tokens."""
+    groups, current, current_tokens = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
@@ -1,15 +1,15 @@
 import argparse
-from rich.console import Console
-from aireadme.core import aireadme
+import sys
 
 def main():
     """
     aireadme command line entry point
-    Use interactive interface to get project path and output directory
+    Use interactive interface to get project path and output directory,
+    or run headless with --project or --manifest
     """
     parser = argparse.ArgumentParser(
         description="aireadme - AI-driven README documentation generator",
-        epilog="Use interactive interface to configure project path and output directory"
+        epilog="Without --project or --manifest, the project path and output directory are asked for interactively"
     )
     parser.add_argument(
         "--version", 
@@ -17,19 +17,124 @@ def main():
         version="aireadme 0.1.8"
     )
     
-    # Parse command line arguments (now only --help and --version)
+    parser.add_argument(
+        "--no-logo",
+        action="store_true",
+        help="Skip logo generation (no text-to-image settings needed)"
+    )
+    
+    parser.add_argument(
+        "--project",
+        help="Generate the README for this project without prompting"
+    )
+    parser.add_argument(
+        "--output",
+        help="Output directory for --project (default: <project>/aireadme_output)"
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="README metadata for --project, e.g. --set project_description='...' (repeatable)"
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REF",
+        help="Refresh the README of a previous run, re-describing only files changed since this git ref"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, describing only the files missing from its checkpoint"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="JSON or JSON Lines file listing the repositories of a batch run"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for --manifest (default: BATCH_WORKERS or 4)"
+    )
+    parser.add_argument(
+        "--summary-file",
+        help="Write the per-repository results of a batch run to this JSON file"
+    )
+
+    # Parse command line arguments before importing anything heavy,
+    # so --help and --version return immediately
     args = parser.parse_args()
+    metadata = {}
+    for item in args.set:
+        key, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--set expects KEY=VALUE, got: {item}")
+        metadata[key.strip()] = value
+    if args.manifest and args.project:
+        parser.error("--manifest and --project cannot be combined")
+
+    from rich.console import Console
+    from aireadme.core import aireadme
+    from aireadme.utils.errors import ModelClientError
+
+    if args.manifest:
+        sys.exit(_run_manifest(args))
 
     try:
-        # Create aireadme instance using interactive mode
-        readme_generator = aireadme()
+        if args.project:
+            readme_generator = aireadme(
+                project_dir=args.project, output_dir=args.output, metadata=metadata,
+                logo=False if args.no_logo else None, interactive=False, since=args.since,
+                resume=args.resume,
+            )
+        else:
+            # Create aireadme instance using interactive mode
+            readme_generator = aireadme(logo=False if args.no_logo else None, since=args.since, resume=args.resume)
         readme_generator.generate()
     except KeyboardInterrupt:
         console = Console()
-        console.print("\n[yellow]Operation cancelled[/yellow]")
+        console.print("\n[yellow]Operation cancelled, run again with --resume to continue[/yellow]")
     except FileNotFoundError as e:
         console = Console()
         console.print(f"[red]Error: {e}[/red]")
+    except ModelClientError as e:
+        console = Console()
+        console.print(f"[red]LLM request failed: {e}[/red]")
     except Exception as e:
         console = Console()
-        console.print(f"[red]An error occurred: {e}[/red]")
\ No newline at end of file
+        console.print(f"[red]An error occurred: {e}[/red]")
+
+
+def _run_manifest(args):
+    """Batch run over the repositories of a manifest, returns the exit code"""
+    import json
+    from rich.console import Console
+    from aireadme.config import load_env, get_batch_config
+    from aireadme.utils.batch_runner import load_manifest, run_batch, print_summary
+
+    load_env()  # The global budget is split between workers before any client reads it
+    console = Console()
+    try:
+        entries = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Cannot read manifest: {e}[/red]")
+        return 2
+    workers = args.workers or get_batch_config()["workers"]
+    try:
+        if args.since:
+            for entry in entries:
+                entry["since"] = entry.get("since") or args.since
+        if args.resume:
+            for entry in entries:
+                entry["resume"] = True
+        results = run_batch(entries, workers, logo=False if args.no_logo else None, console=console)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Operation cancelled, run again with --resume to continue[/yellow]")
+        return 130
+    print_summary(results, console)
+    if args.summary_file:
+        with open(args.summary_file, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        console.print(f"[dim]Batch results saved to: {args.summary_file}[/dim]")
+    return 1 if any(r["status"] == "failed" for r in results) else 0
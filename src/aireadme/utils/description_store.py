@@ -0,0 +1,122 @@
+import hashlib
+import os
+import sqlite3
+from threading import Lock
+from typing import Iterable, Optional
+
+DESCRIPTION_STORE_FILENAME = "file_index.sqlite3"
+
+
+def hash_content(content: bytes) -> str:
+    """Content hash used to detect changed files."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Same hash as hash_content, computed in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DescriptionStore:
+    """
+    Persistent per-project index of file metadata and generated descriptions
+
+    Each row holds a file's relative path, size, mtime and content hash together
+    with the description produced for it, so reruns only re-describe files that
+    are new or whose content changed. Safe to share between threads.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize store
+
+        Args:
+            db_path: SQLite database file, created if missing
+        """
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    description TEXT NOT NULL
+                )"""
+            )
+
+    @classmethod
+    def for_output_dir(cls, output_dir: str) -> "DescriptionStore":
+        return cls(os.path.join(output_dir, DESCRIPTION_STORE_FILENAME))
+
+    def lookup(self, path: str, size: int, mtime: float) -> Optional[str]:
+        """
+        Fast path: return the stored description if size and mtime are unchanged
+
+        Returns:
+            Stored description, or None if the file must be hashed
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime, description FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row and row[0] == size and row[1] == mtime:
+            return row[2]
+        return None
+
+    def get(self, path: str, content_hash: str) -> Optional[str]:
+        """Return the stored description if the file content is unchanged."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description FROM files WHERE path = ? AND content_hash = ?",
+                (path, content_hash),
+            ).fetchone()
+        return row[0] if row else None
+
+    def latest(self, path: str) -> Optional[str]:
+        """Return the stored description of a file without checking its content."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, path: str, size: int, mtime: float, content_hash: str, description: str):
+        """Insert or replace the record for a file."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, content_hash, description) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (path, size, mtime, content_hash, description),
+            )
+
+    def prune(self, keep_paths: Iterable[str]) -> int:
+        """
+        Delete records for files that no longer exist in the project
+
+        Returns:
+            Number of deleted records
+        """
+        keep = set(keep_paths)
+        with self._lock, self._conn:
+            stale = [
+                (path,) for (path,) in self._conn.execute("SELECT path FROM files")
+                if path not in keep
+            ]
+            self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        return len(stale)
+
+    def count(self) -> int:
+        """Number of stored file records."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,136 @@
+import posixpath
+from typing import Callable, Dict, List, Optional
+from aireadme.utils.chunking import group_by_budget
+from aireadme.utils.rate_limiter import estimate_tokens
+
+# One directory from the descriptions of its files and the summaries of its subdirectories
+DIRECTORY_PROMPT = (
+    "The following are summaries of the files and subdirectories in the directory {path} "
+    "of a software project{part}. Summarize what this directory contains and its role in the "
+    "project in at most 80 words, naming its most important modules.\n\n{entries}"
+)
+# Merges the partial summaries of a directory too large for one prompt
+MERGE_PROMPT = (
+    "The following are summaries of consecutive parts of the directory {path} of a software "
+    "project. Combine them into one summary of at most 80 words, naming its most important "
+    "modules.\n\n{summaries}"
+)
+
+
+def _label(directory: str) -> str:
+    return f"{directory}/" if directory else "the project root"
+
+
+def directory_levels(paths: List[str]) -> List[List[str]]:
+    """
+    Every directory holding one of paths, grouped by depth, deepest first
+
+    The project root is "" and comes last, so each directory is listed after
+    all of its subdirectories.
+    """
+    directories = {""}
+    for path in paths:
+        parent = posixpath.dirname(path)
+        while parent:
+            directories.add(parent)
+            parent = posixpath.dirname(parent)
+    by_depth: Dict[int, List[str]] = {}
+    for directory in directories:
+        depth = directory.count("/") + 1 if directory else 0
+        by_depth.setdefault(depth, []).append(directory)
+    return [sorted(by_depth[depth]) for depth in sorted(by_depth, reverse=True)]
+
+
+def summarize_directories(descriptions: Dict[str, str],
+                          answer_all: Callable[[List[str]], List[Optional[str]]],
+                          group_tokens: int) -> Dict[str, str]:
+    """
+    Roll file descriptions up into one summary per directory, bottom-up
+
+    All directories of one depth are summarized together through answer_all,
+    which should answer its prompts concurrently. A directory holding a single
+    entry reuses that entry's text without a request; one whose entries exceed
+    group_tokens is summarized in parts that are merged in a second request.
+
+    Args:
+        descriptions: File descriptions keyed by relative path
+        answer_all: Answers a list of prompts in order, None for a failed prompt
+        group_tokens: Token budget of the entries in one prompt
+
+    Returns:
+        Summaries keyed by directory path, "" for the project root
+    """
+    files: Dict[str, List[str]] = {}
+    for path in sorted(descriptions):
+        files.setdefault(posixpath.dirname(path), []).append(path)
+    levels = directory_levels(list(descriptions))
+    children: Dict[str, List[str]] = {}
+    for level in levels:
+        for directory in level:
+            if directory:
+                children.setdefault(posixpath.dirname(directory), []).append(directory)
+    summaries: Dict[str, str] = {}
+
+    for level in levels:
+        entries = {}
+        for directory in level:
+            items = [f"- {posixpath.basename(p)}: {descriptions[p].strip()}" for p in files.get(directory, [])]
+            items += [f"- {posixpath.basename(child)}/: {summaries[child]}"
+                      for child in sorted(children.get(directory, []))]
+            entries[directory] = items
+
+        # First round: whole directories, or the parts of large ones
+        jobs = []
+        for directory, items in entries.items():
+            if len(items) == 1:
+                summaries[directory] = items[0].split(": ", 1)[1]
+                continue
+            groups = group_by_budget(items, group_tokens)
+            for index, group in enumerate(groups, 1):
+                part = f" (part {index} of {len(groups)})" if len(groups) > 1 else ""
+                jobs.append((directory, DIRECTORY_PROMPT.format(
+                    path=_label(directory), part=part, entries="\n".join(group))))
+        answers = answer_all([prompt for _, prompt in jobs]) if jobs else []
+        parts: Dict[str, List[str]] = {}
+        for (directory, _), text in zip(jobs, answers):
+            parts.setdefault(directory, []).append(text.strip() if text else _fallback(entries[directory]))
+
+        # Second round: merge the parts of directories that did not fit one prompt
+        merges = [directory for directory, texts in parts.items() if len(texts) > 1]
+        merged = answer_all([
+            MERGE_PROMPT.format(path=_label(d), summaries="\n\n".join(parts[d])) for d in merges
+        ]) if merges else []
+        for directory, texts in parts.items():
+            summaries[directory] = texts[0]
+        for directory, text in zip(merges, merged):
+            summaries[directory] = text.strip() if text else " ".join(parts[directory])
+    return summaries
+
+
+def _fallback(items: List[str], limit: int = 400) -> str:
+    """Stand-in summary when the request for a directory failed: the start of its entries."""
+    text = " ".join(item[2:] for item in items)
+    return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+
+def render_overview(summaries: Dict[str, str], file_count: int, max_tokens: int) -> str:
+    """
+    Bounded-size project overview for the README prompt
+
+    The root summary comes first, then directory summaries breadth-first
+    (top-level packages before their subpackages) while they fit max_tokens.
+    """
+    header = (f"Project overview rolled up from the descriptions of {file_count} files "
+              f"in {len(summaries)} directories.\n\nProject root: {summaries.get('', '')}\n")
+    lines = [header]
+    used = estimate_tokens(header)
+    directories = sorted((d for d in summaries if d), key=lambda d: (d.count("/"), d))
+    for shown, directory in enumerate(directories):
+        line = f"- {directory}/: {summaries[directory]}"
+        tokens = estimate_tokens(line)
+        if used + tokens > max_tokens:
+            lines.append(f"- ... {len(directories) - shown} more directories omitted")
+            break
+        lines.append(line)
+        used += tokens
+    return "\n".join(lines)
@@ -0,0 +1,169 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+from aireadme.utils.rate_limiter import RateController
+from aireadme.utils.retry import CircuitBreaker
+
+ROUTING_LEAST_OUTSTANDING = "least_outstanding"
+ROUTING_WEIGHTED = "weighted"
+
+
+class Endpoint:
+    """
+    One deployment/key of the LLM API
+
+    Each endpoint has its own rate limits, concurrency limit and circuit
+    breaker, so keys with separate quotas add up instead of sharing one budget.
+    The SDK clients are created by ModelClient on first use.
+    """
+
+    def __init__(self, base_url: str, api_key: Optional[str], weight: float = 1.0,
+                 rate_controller: Optional[RateController] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None, name: Optional[str] = None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.weight = max(weight, 0.0)
+        self.rate_controller = rate_controller or RateController()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.name = name or urlparse(base_url).netloc or base_url
+        self.client = None
+        self.async_client = None
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.throttled = 0
+        self.cooldown_until = 0.0
+        self.current_weight = 0.0  # Smooth weighted round-robin state
+        self._lock = threading.Lock()
+
+    def recovers_at(self) -> float:
+        """Monotonic time at which the endpoint may take requests again."""
+        breaker = self.circuit_breaker
+        reopens = breaker.opened_at + breaker.reset_timeout if breaker.state == CircuitBreaker.OPEN else 0.0
+        return max(self.cooldown_until, reopens)
+
+    def available(self, now: float) -> bool:
+        """Not cooling down after a throttle and not behind an open circuit."""
+        return now >= self.recovers_at()
+
+    @contextmanager
+    def track(self):
+        """Count the request as outstanding from admission until it finishes."""
+        with self._lock:
+            self.outstanding += 1
+            self.requests += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.outstanding -= 1
+
+    def record_failure(self, throttled: bool = False, retry_after: Optional[float] = None):
+        with self._lock:
+            if throttled:
+                self.throttled += 1
+                # Route around the endpoint until its quota should have recovered
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + (retry_after or 1.0))
+            else:
+                self.failures += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "requests": self.requests,
+                "failures": self.failures,
+                "throttled": self.throttled,
+                "outstanding": self.outstanding,
+                "healthy": self.available(time.monotonic()),
+            }
+
+
+class EndpointPool:
+    """
+    Routes LLM requests across several endpoints
+
+    Least-outstanding routing sends each request to the available endpoint
+    with the fewest in-flight requests relative to its weight; weighted
+    routing spreads requests in proportion to the weights (smooth weighted
+    round-robin). Endpoints that are throttled or whose circuit is open are
+    skipped until they recover, and ModelClient fails over to the next
+    candidate when a request errors.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], routing: str = ROUTING_LEAST_OUTSTANDING):
+        if not endpoints:
+            raise ValueError("Endpoint pool needs at least one endpoint")
+        if routing not in (ROUTING_LEAST_OUTSTANDING, ROUTING_WEIGHTED):
+            raise ValueError(f"Unknown routing strategy: {routing}")
+        self.endpoints = endpoints
+        self.routing = routing
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    @property
+    def primary(self) -> Endpoint:
+        return self.endpoints[0]
+
+    def candidates(self, avoid: Iterable[Endpoint] = ()) -> List[Endpoint]:
+        """
+        Endpoints in the order they should be tried for the next request
+
+        Available endpoints not in avoid come first, ordered by the routing
+        strategy, then available standby endpoints (weight 0); endpoints that
+        are avoided, cooling down or circuit-open follow, soonest-recovering
+        first, as a last resort.
+        """
+        avoid = set(id(e) for e in avoid)
+        now = time.monotonic()
+        with self._lock:
+            usable = [e for e in self.endpoints if id(e) not in avoid and e.available(now)]
+            ready = [e for e in usable if e.weight > 0]
+            standby = [e for e in usable if e.weight == 0]
+            rest = sorted((e for e in self.endpoints if e not in usable), key=lambda e: e.recovers_at())
+            if not ready:
+                return standby + rest
+            if self.routing == ROUTING_WEIGHTED:
+                total = sum(e.weight for e in ready)
+                for endpoint in ready:
+                    endpoint.current_weight += endpoint.weight
+                chosen = max(ready, key=lambda e: e.current_weight)
+                chosen.current_weight -= total
+                ordered = [chosen] + sorted((e for e in ready if e is not chosen), key=lambda e: -e.weight)
+            else:
+                # Rotate the starting point so ties are spread round-robin
+                start = self._next % len(ready)
+                self._next += 1
+                rotated = ready[start:] + ready[:start]
+                ordered = sorted(rotated, key=lambda e: e.outstanding / e.weight)
+            return ordered + standby + rest
+
+    def has_alternative(self, avoid: Iterable[Endpoint]) -> bool:
+        """Whether an available endpoint outside avoid is left to fail over to."""
+        avoid = set(id(e) for e in avoid)
+        now = time.monotonic()
+        return any(id(e) not in avoid and e.available(now) for e in self.endpoints)
+
+    def report(self) -> Dict[str, float]:
+        """Throughput summed over all endpoints, in the shape of RateController.report()."""
+        reports = [e.rate_controller.report() for e in self.endpoints]
+        if len(reports) == 1:
+            return reports[0]
+        elapsed = max(r["elapsed_seconds"] for r in reports)
+        return {
+            "requests": sum(r["requests"] for r in reports),
+            "throttled": sum(r["throttled"] for r in reports),
+            "tokens": sum(r["tokens"] for r in reports),
+            "elapsed_seconds": elapsed,
+            "requests_per_minute": round(sum(r["requests_per_minute"] for r in reports), 1),
+            "tokens_per_minute": round(sum(r["tokens_per_minute"] for r in reports), 1),
+            "concurrency_limit": round(sum(r["concurrency_limit"] for r in reports), 2),
+        }
+
+    def stats(self) -> List[Dict[str, object]]:
+        return [e.stats() for e in self.endpoints]
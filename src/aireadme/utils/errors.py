@@ -0,0 +1,77 @@
+from typing import Optional
+
+# HTTP statuses worth retrying: timeouts, conflicts, throttling and server errors
+TRANSIENT_STATUS_CODES = {408, 409, 425, 429}
+# SDK exception classes (matched by name so this module does not import the SDK)
+TRANSIENT_ERROR_NAMES = {"APITimeoutError", "APIConnectionError"}
+# Statuses tied to one deployment or key (revoked key, missing deployment); another endpoint may still answer
+ENDPOINT_STATUS_CODES = {401, 403, 404}
+
+
+class ModelClientError(Exception):
+    """Base class for failed LLM requests."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TransientModelError(ModelClientError):
+    """Failure that may succeed on retry: timeouts, connection errors, 429 and 5xx."""
+
+
+class PermanentModelError(ModelClientError):
+    """Failure that will not change on retry: bad credentials, invalid requests, ..."""
+
+
+class CircuitOpenError(TransientModelError):
+    """The endpoint failed repeatedly and requests are being rejected without trying."""
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 responses from the OpenAI SDK (or anything shaped like them)."""
+    if type(error).__name__ == "RateLimitError":
+        return True
+    return getattr(error, "status_code", None) == 429
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the Retry-After header of an SDK error, if present."""
+    if isinstance(error, ModelClientError):
+        return error.retry_after
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def classify_error(error: Exception) -> ModelClientError:
+    """
+    Wrap an SDK or network exception in a typed ModelClientError
+
+    Args:
+        error: Exception raised by the LLM call
+
+    Returns:
+        TransientModelError or PermanentModelError (errors that are already typed are returned as-is)
+    """
+    if isinstance(error, ModelClientError):
+        return error
+    status = getattr(error, "status_code", None)
+    names = {cls.__name__ for cls in type(error).__mro__}
+    transient = (
+        status in TRANSIENT_STATUS_CODES
+        or (status is not None and status >= 500)
+        or bool(names & TRANSIENT_ERROR_NAMES)
+        or isinstance(error, (TimeoutError, ConnectionError))
+    )
+    error_cls = TransientModelError if transient else PermanentModelError
+    return error_cls(f"{type(error).__name__}: {error}", status_code=status,
+                     retry_after=retry_after_seconds(error))
@@ -0,0 +1,222 @@
+import os
+from fnmatch import fnmatch
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+from aireadme.utils.gitignore import IgnoreMatcher, as_matcher
+
+KIND_FILE = "file"
+KIND_DIR = "dir"
+
+
+class FileRecord:
+    """A single scanned entry. Uses __slots__ so millions of records stay cheap."""
+
+    __slots__ = ("path", "size", "mtime", "kind")
+
+    def __init__(self, path: str, size: int, mtime: float, kind: str):
+        self.path = path  # Path relative to the project root
+        self.size = size
+        self.mtime = mtime
+        self.kind = kind
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def depth(self) -> int:
+        """Number of directories between the project root and this entry."""
+        return self.path.count(os.sep)
+
+    def __repr__(self) -> str:
+        return f"FileRecord({self.path!r}, size={self.size}, mtime={self.mtime}, kind={self.kind!r})"
+
+
+class FileIndex:
+    """
+    In-memory index of a project tree built by a single directory scan.
+
+    Records are kept in walk order: every directory record is followed by its
+    files, then by its sub-directories, so the tree can be rendered without
+    walking the file system again.
+    """
+
+    def __init__(self, root: str, records: Optional[List[FileRecord]] = None):
+        self.root = root
+        self.records: List[FileRecord] = records if records is not None else []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[FileRecord]:
+        return iter(self.records)
+
+    def files(self) -> Iterator[FileRecord]:
+        return (r for r in self.records if r.kind == KIND_FILE)
+
+    def dirs(self) -> Iterator[FileRecord]:
+        return (r for r in self.records if r.kind == KIND_DIR)
+
+    def abspath(self, record: FileRecord) -> str:
+        return os.path.join(self.root, record.path)
+
+    def find(self, patterns: List[str]) -> List[str]:
+        """
+        Find indexed files whose basename matches any of the patterns
+
+        Args:
+            patterns: Glob patterns such as "*.py"
+
+        Returns:
+            Absolute file paths, in index order
+        """
+        return [self.abspath(r) for r in self.find_records(patterns)]
+
+    def find_records(self, patterns: List[str]) -> List[FileRecord]:
+        """Like find, but returns the FileRecords (with size and mtime) instead of paths."""
+        return [
+            r for r in self.files()
+            if any(fnmatch(r.name, pattern) for pattern in patterns)
+        ]
+
+    def iter_structure_lines(self) -> Iterator[str]:
+        """Yield the tree one line at a time, without building the whole string."""
+        yield f"{os.path.basename(self.root)}/"
+        for r in self.records:
+            indent = "    " * r.depth
+            if r.kind == KIND_DIR:
+                yield f"{indent}├── {r.name}/"
+            else:
+                yield f"{indent}├── {r.name}"
+
+    def render_structure(self) -> str:
+        """Render the indexed tree in the same format as get_project_structure."""
+        return "\n".join(self.iter_structure_lines())
+
+
+WALKER_SERIAL = "serial"
+WALKER_PARALLEL = "parallel"
+
+
+class _DirListing:
+    """Kept entries of one directory, produced by a single os.scandir call."""
+
+    __slots__ = ("rel_dir", "files", "subdirs")
+
+    def __init__(self, rel_dir: str):
+        self.rel_dir = rel_dir
+        self.files: List[FileRecord] = []
+        self.subdirs: List[FileRecord] = []
+
+
+def _scan_dir(directory: str, rel_dir: str, matcher: IgnoreMatcher) -> _DirListing:
+    """
+    List one directory with os.scandir, reusing the stat data cached on each DirEntry
+    """
+    listing = _DirListing(rel_dir)
+    try:
+        with os.scandir(os.path.join(directory, rel_dir)) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        # Unreadable directories are skipped, as os.walk does
+        return listing
+
+    for entry in entries:
+        rel_path = os.path.join(rel_dir, entry.name)
+        try:
+            is_dir = entry.is_dir()
+            if is_dir and entry.is_symlink():
+                # Symlinked directories are not followed
+                continue
+            if matcher.is_ignored(rel_path, is_dir=is_dir):
+                continue
+            st = entry.stat()
+        except OSError:
+            continue
+        if is_dir:
+            listing.subdirs.append(FileRecord(rel_path, 0, st.st_mtime, KIND_DIR))
+        else:
+            listing.files.append(FileRecord(rel_path, st.st_size, st.st_mtime, KIND_FILE))
+    return listing
+
+
+def _preorder(get_listing: Callable[[str], _DirListing]) -> Iterator[FileRecord]:
+    """Yield each directory's files, then each sub-directory record followed by its contents."""
+    root = get_listing("")
+    yield from root.files
+    stack = [iter(root.subdirs)]
+    while stack:
+        subdir = next(stack[-1], None)
+        if subdir is None:
+            stack.pop()
+            continue
+        yield subdir
+        listing = get_listing(subdir.path)
+        yield from listing.files
+        stack.append(iter(listing.subdirs))
+
+
+def _walk_serial(directory: str, matcher: IgnoreMatcher) -> Iterator[FileRecord]:
+    return _preorder(lambda rel_dir: _scan_dir(directory, rel_dir, matcher))
+
+
+def _walk_parallel(directory: str, matcher: IgnoreMatcher, max_workers: int,
+                   max_pending: Optional[int] = None) -> Iterator[FileRecord]:
+    """
+    Scan directories concurrently on a thread pool, then emit records in the
+    same deterministic order as the serial walker.
+
+    At most max_pending directory scans are queued on the pool at any time.
+    Directories still to be scanned are not copied into a queue: the frontier
+    is a stack of lazy iterators over the subdirectory lists of finished
+    scans, consumed depth first, so it holds about one iterator per level of
+    the tree being worked on however wide the tree is.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    max_pending = max_pending or max_workers * 4
+    listings: Dict[str, _DirListing] = {}
+    frontier = [iter([""])]
+    in_flight = set()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while frontier or in_flight:
+            while frontier and len(in_flight) < max_pending:
+                rel_dir = next(frontier[-1], None)
+                if rel_dir is None:
+                    frontier.pop()
+                    continue
+                in_flight.add(executor.submit(_scan_dir, directory, rel_dir, matcher))
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                listing = future.result()
+                listings[listing.rel_dir] = listing
+                if listing.subdirs:
+                    frontier.append(d.path for d in listing.subdirs)
+
+    yield from _preorder(listings.__getitem__)
+
+
+def build_file_index(directory: str, ignore_patterns: Union[Sequence[str], IgnoreMatcher],
+                     walker: str = WALKER_SERIAL, max_workers: int = 8) -> FileIndex:
+    """
+    Scan a project once and build a FileIndex of everything not ignored
+
+    Args:
+        directory: Project root directory
+        ignore_patterns: IgnoreMatcher, or gitignore-style patterns relative to the root
+        walker: "serial" or "parallel" (threaded os.scandir, for high-latency file systems)
+        max_workers: Number of scanning threads for the parallel walker
+
+    Returns:
+        FileIndex with one record per kept file and directory, in sorted walk order
+    """
+    matcher = as_matcher(directory, ignore_patterns)
+    if walker == WALKER_PARALLEL:
+        records = _walk_parallel(directory, matcher, max_workers)
+    elif walker == WALKER_SERIAL:
+        records = _walk_serial(directory, matcher)
+    else:
+        raise ValueError(f"Unknown walker: {walker}")
+    return FileIndex(directory, list(records))
@@ -0,0 +1,152 @@
+import codecs
+import mmap
+import os
+from typing import List, Optional, Tuple
+
+# Rough average for source code and prose, used to turn token caps into byte caps
+BYTES_PER_TOKEN = 4
+SNIFF_BYTES = 8192
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Bytes that never appear in text files (everything below 0x20 except \t \n \f \r and ESC)
+_CONTROL_BYTES = bytes(set(range(32)) - {9, 10, 12, 13, 27})
+
+
+class FileSample:
+    """Text prepared for a prompt, plus how it was obtained."""
+
+    __slots__ = ("text", "size", "encoding", "binary", "truncated")
+
+    def __init__(self, text: str, size: int, encoding: Optional[str],
+                 binary: bool = False, truncated: bool = False):
+        self.text = text
+        self.size = size
+        self.encoding = encoding
+        self.binary = binary
+        self.truncated = truncated
+
+
+def is_binary(head: bytes) -> bool:
+    """
+    Guess whether data is binary from its first bytes
+
+    Files with a Unicode BOM are text. Otherwise a NUL byte, or more than 30%
+    control characters, marks the data as binary.
+    """
+    if not head:
+        return False
+    if any(head.startswith(bom) for bom, _ in _BOMS):
+        return False
+    if b"\x00" in head:
+        return True
+    control = len(head) - len(head.translate(None, _CONTROL_BYTES))
+    return control / len(head) > 0.3
+
+
+def detect_encoding(head: bytes) -> str:
+    """
+    Detect the text encoding of a sample
+
+    Checks for a BOM, then strict UTF-8, then charset_normalizer if it is
+    installed, and finally falls back to latin-1, which decodes anything.
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        # The sample may end in the middle of a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(head).best()
+        if best is not None:
+            return best.encoding
+    except ImportError:
+        pass
+    return "latin-1"
+
+
+def byte_budget(max_bytes: int, max_tokens: int = 0) -> int:
+    """Combine a byte cap and an optional token cap (0 disables it) into one byte budget."""
+    if max_tokens > 0:
+        return min(max_bytes, max_tokens * BYTES_PER_TOKEN)
+    return max_bytes
+
+
+def _align_to_lines(view, start: int, end: int, size: int, floor: int) -> Tuple[int, int]:
+    """Move a window so it starts and ends on line boundaries when possible."""
+    if start > floor:
+        nl = view.find(b"\n", start, end)
+        if nl != -1:
+            start = nl + 1
+    if end < size:
+        nl = view.rfind(b"\n", start, end)
+        if nl != -1:
+            end = nl + 1
+    return start, end
+
+
+def _sample_windows(size: int, max_bytes: int, samples: int) -> List[Tuple[int, int]]:
+    """Head, evenly spaced middle windows and tail whose lengths add up to max_bytes."""
+    head_len = max_bytes * 4 // 10
+    tail_len = max_bytes * 3 // 10
+    windows = [(0, head_len)]
+    if samples > 0:
+        middle_len = (max_bytes - head_len - tail_len) // samples
+        span_start, span_end = head_len, size - tail_len
+        step = (span_end - span_start) / (samples + 1)
+        for i in range(1, samples + 1):
+            center = int(span_start + step * i)
+            windows.append((center - middle_len // 2, center + middle_len - middle_len // 2))
+    windows.append((size - tail_len, size))
+    return windows
+
+
+def read_for_prompt(path: str, max_bytes: int = 65536, samples: int = 3) -> FileSample:
+    """
+    Read a file for an LLM prompt without loading oversized files into memory
+
+    Files up to max_bytes are read whole. Larger files are sampled through mmap:
+    a head, a tail and evenly spaced middle excerpts, max_bytes in total, so
+    memory use does not grow with the file size.
+
+    Args:
+        path: File to read
+        max_bytes: Byte budget for the returned text
+        samples: Number of middle excerpts for oversized files
+
+    Returns:
+        FileSample; binary files come back with empty text and binary=True
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(min(SNIFF_BYTES, max_bytes))
+        if is_binary(head):
+            return FileSample("", size, None, binary=True)
+        encoding = detect_encoding(head)
+
+        if size <= max_bytes:
+            f.seek(0)
+            return FileSample(f.read().decode(encoding, errors="replace"), size, encoding)
+
+        parts = []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            last_end = 0
+            for start, end in _sample_windows(size, max_bytes, samples):
+                start, end = _align_to_lines(view, max(start, last_end), end, size, last_end)
+                if end <= start:
+                    continue
+                if start > last_end:
+                    parts.append(f"\n... [{start - last_end:,} bytes omitted] ...\n")
+                parts.append(view[start:end].decode(encoding, errors="replace"))
+                last_end = end
+    return FileSample("".join(parts), size, encoding, truncated=True)
@@ -0,0 +1,234 @@
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+
+def parse_gitignore_lines(lines: Sequence[str]) -> List[str]:
+    """
+    Strip comments, blank lines and unescaped trailing spaces from .gitignore lines
+
+    Args:
+        lines: Raw lines of a .gitignore style file
+
+    Returns:
+        Patterns in file order
+    """
+    patterns = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        if not line or line.startswith("#"):
+            continue
+        # Trailing spaces are ignored unless escaped with a backslash
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        if stripped:
+            patterns.append(stripped)
+    return patterns
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate one path segment of a glob into a regex that never crosses '/'."""
+    i, n = 0, len(segment)
+    res = []
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == "*":
+            while i < n and segment[i] == "*":
+                i += 1
+            res.append("[^/]*")
+        elif c == "?":
+            res.append("[^/]")
+        elif c == "\\" and i < n:
+            res.append(re.escape(segment[i]))
+            i += 1
+        elif c == "[":
+            j = i
+            if j < n and segment[j] in "!^":
+                j += 1
+            if j < n and segment[j] == "]":
+                j += 1
+            while j < n and segment[j] != "]":
+                j += 1
+            if j >= n:
+                res.append("\\[")
+            else:
+                body = segment[i:j].replace("\\", "\\\\")
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                res.append(f"[{body}]")
+                i = j + 1
+        else:
+            res.append(re.escape(c))
+    return "".join(res)
+
+
+class IgnoreRule:
+    """A single compiled gitignore rule."""
+
+    __slots__ = ("pattern", "negate", "dir_only", "regex")
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        elif pattern.startswith("\\!") or pattern.startswith("\\#"):
+            pattern = pattern[1:]
+
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        # A slash at the beginning or in the middle anchors the pattern to
+        # the directory of the .gitignore; otherwise it matches at any depth.
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        segments = pattern.split("/")
+        parts = [] if anchored else ["(?:.*/)?"]
+        for idx, segment in enumerate(segments):
+            last = idx == len(segments) - 1
+            if segment == "**":
+                parts.append(".+" if last else "(?:.*/)?")
+            else:
+                parts.append(_translate_segment(segment) + ("" if last else "/"))
+        self.regex = "".join(parts)
+
+
+class RuleSet:
+    """
+    Rules from one source (a .gitignore file, info/exclude or defaults),
+    relative to one base directory.
+
+    Consecutive rules with the same sign are merged into a single alternation
+    regex, so matching costs one regex per run of rules instead of one
+    fnmatch call per pattern. Later runs take precedence, as in git.
+    """
+
+    def __init__(self, base: str, patterns: Sequence[str]):
+        self.base = base  # posix path relative to the project root, "" for root
+        self.groups: List[Tuple[bool, Optional["re.Pattern"], Optional["re.Pattern"]]] = []
+
+        rules = [IgnoreRule(p) for p in patterns if p and p != "!"]
+        start = 0
+        while start < len(rules):
+            end = start
+            while end < len(rules) and rules[end].negate == rules[start].negate:
+                end += 1
+            run = rules[start:end]
+            any_regex = "|".join(f"(?:{r.regex})" for r in run)
+            file_regex = "|".join(f"(?:{r.regex})" for r in run if not r.dir_only)
+            self.groups.append((
+                run[0].negate,
+                re.compile(f"^(?:{any_regex})$", re.DOTALL),
+                re.compile(f"^(?:{file_regex})$", re.DOTALL) if file_regex else None,
+            ))
+            start = end
+
+    def __bool__(self) -> bool:
+        return bool(self.groups)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Returns:
+            True if ignored, False if re-included by a negation, None if no rule matched
+        """
+        for negate, any_re, file_re in reversed(self.groups):
+            regex = any_re if is_dir else file_re
+            if regex is not None and regex.match(rel_path):
+                return not negate
+        return None
+
+
+class IgnoreMatcher:
+    """
+    Compiled ignore engine with nested .gitignore support
+
+    Precedence, lowest first: base patterns (e.g. DEFAULT_IGNORE_PATTERNS),
+    .git/info/exclude, the root .gitignore, then .gitignore files in deeper
+    directories. Rule sets are loaded once per directory and cached.
+
+    Callers walking top-down are expected to prune ignored directories, so
+    is_ignored only checks the path itself and never its parents.
+    """
+
+    def __init__(self, root: str, base_patterns: Optional[Sequence[str]] = None,
+                 read_gitignore: bool = True):
+        """
+        Initialize matcher
+
+        Args:
+            root: Project root directory
+            base_patterns: Extra patterns with gitignore semantics, lowest precedence
+            read_gitignore: Whether to read .git/info/exclude and .gitignore files
+        """
+        self.root = root
+        self.read_gitignore = read_gitignore
+        root_sets = [RuleSet("", base_patterns or [])]
+        if read_gitignore:
+            root_sets.append(RuleSet("", self._read_patterns(os.path.join(root, ".git", "info", "exclude"))))
+            root_sets.append(RuleSet("", self._read_patterns(os.path.join(root, ".gitignore"))))
+        self._chains: Dict[str, Tuple[RuleSet, ...]] = {
+            "": tuple(s for s in root_sets if s)
+        }
+
+    @staticmethod
+    def _read_patterns(path: str) -> List[str]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return parse_gitignore_lines(f.readlines())
+        except (FileNotFoundError, NotADirectoryError, PermissionError, IsADirectoryError):
+            return []
+
+    def _chain(self, rel_dir: str) -> Tuple[RuleSet, ...]:
+        """Rule sets that apply to entries of rel_dir, lowest precedence first."""
+        chain = self._chains.get(rel_dir)
+        if chain is None:
+            parent = rel_dir.rpartition("/")[0]
+            chain = self._chain(parent)
+            if self.read_gitignore:
+                local = RuleSet(rel_dir, self._read_patterns(
+                    os.path.join(self.root, rel_dir, ".gitignore")))
+                if local:
+                    chain = chain + (local,)
+            self._chains[rel_dir] = chain
+        return chain
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Check a single path relative to the project root
+
+        Args:
+            rel_path: Path relative to root, using os.sep or '/'
+            is_dir: Whether the path is a directory (directory-only rules apply)
+
+        Returns:
+            True if the path is ignored
+        """
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        rel_dir = rel_path.rpartition("/")[0]
+        for rule_set in reversed(self._chain(rel_dir)):
+            local_path = rel_path[len(rule_set.base) + 1:] if rule_set.base else rel_path
+            result = rule_set.match(local_path, is_dir)
+            if result is not None:
+                return result
+        return False
+
+    def is_path_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Like is_ignored, but also checks every parent directory of the path."""
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        parts = rel_path.split("/")
+        for i in range(1, len(parts)):
+            if self.is_ignored("/".join(parts[:i]), is_dir=True):
+                return True
+        return self.is_ignored(rel_path, is_dir)
+
+
+def as_matcher(root: str, ignore: Union[Sequence[str], IgnoreMatcher]) -> IgnoreMatcher:
+    """Accept either a ready matcher or a plain pattern list (compiled without reading .gitignore)."""
+    if hasattr(ignore, "is_ignored"):
+        return ignore
+    return IgnoreMatcher(root, list(ignore), read_gitignore=False)
@@ -0,0 +1,235 @@
+import os
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+
+def _httpx():
+    """The httpx module behind the openai SDK, imported on first use"""
+    import openai
+    try:
+        import httpx
+    except ImportError:
+        # Some openai builds vendor httpx under another name; use whatever DefaultHttpxClient is built on
+        import importlib
+        httpx = importlib.import_module(openai.DefaultHttpxClient.__mro__[1].__module__.split(".")[0])
+    return httpx
+
+# Headers for image downloads; some image CDNs reject requests without a browser User-Agent
+DOWNLOAD_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'image/*,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+}
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _ConnectionStats:
+    """Counts requests and newly opened connections; the difference was served from the pool."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def add(self, requests_count: int = 0, connections: int = 0):
+        with self._lock:
+            self.requests += requests_count
+            self.connections += connections
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "reused": max(0, self.requests - self.connections),
+            }
+
+
+class HttpTransport:
+    """
+    Shared, pooled HTTP clients for the LLM API, the image API and image downloads
+
+    One sync and one async httpx client (handed to the OpenAI SDK clients) and one
+    requests session for downloads, each with a connection pool sized to the
+    configured concurrency so that keep-alive connections are reused instead of
+    opening a new TLS connection per request. Tracks how many requests reused a
+    pooled connection.
+    """
+
+    def __init__(self, max_connections: int = 64, keepalive_expiry: float = 30.0,
+                 http2: bool = False, download_chunk_bytes: int = 64 * 1024):
+        """
+        Initialize transport
+
+        Args:
+            max_connections: Pool size per client, normally the LLM concurrency
+            keepalive_expiry: Seconds an idle connection stays in the pool
+            http2: Use HTTP/2 for API calls (ignored if the h2 package is missing)
+            download_chunk_bytes: Read size when streaming downloads to disk
+        """
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and http2_available()
+        self.download_chunk_bytes = download_chunk_bytes
+        self.api_stats = _ConnectionStats()
+        self._client = None
+        self._async_client = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _limits(self):
+        return _httpx().Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def _trace(self, event_name: str, info: dict):
+        # httpcore reports each new TCP connection through the "trace" request extension
+        if event_name == "connection.connect_tcp.complete":
+            self.api_stats.add(connections=1)
+
+    async def _trace_async(self, event_name: str, info: dict):
+        self._trace(event_name, info)
+
+    def _on_request(self, request):
+        self.api_stats.add(requests_count=1)
+        request.extensions["trace"] = self._trace
+
+    async def _on_request_async(self, request):
+        self.api_stats.add(requests_count=1)
+        request.extensions["trace"] = self._trace_async
+
+    @property
+    def client(self):
+        """Sync httpx client for OpenAI SDK clients, created on first use"""
+        with self._lock:
+            if self._client is None:
+                import openai
+                self._client = openai.DefaultHttpxClient(
+                    limits=self._limits(),
+                    http2=self.http2,
+                    event_hooks={"request": [self._on_request]},
+                )
+            return self._client
+
+    @property
+    def async_client(self):
+        """Async httpx client for AsyncOpenAI clients, created on first use"""
+        with self._lock:
+            if self._async_client is None:
+                import openai
+                self._async_client = openai.DefaultAsyncHttpxClient(
+                    limits=self._limits(),
+                    http2=self.http2,
+                    event_hooks={"request": [self._on_request_async]},
+                )
+            return self._async_client
+
+    @property
+    def session(self) -> "requests.Session":
+        """Pooled requests session for downloads, created on first use"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_connections)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DOWNLOAD_HEADERS)
+                self._session = session
+            return self._session
+
+    def download(self, url: str, dest_path: Optional[str] = None, timeout: float = 60):
+        """
+        Download a URL through the pooled session, streaming the body
+
+        With dest_path the body is written chunk by chunk to a temporary file in
+        the destination directory, which then replaces dest_path atomically, so
+        the image is never held in memory as a whole.
+
+        Args:
+            url: URL to fetch
+            dest_path: File to write to; if None the body is returned as bytes
+            timeout: Connect/read timeout in seconds
+
+        Returns:
+            Number of bytes written when dest_path is given, otherwise the body
+
+        Raises:
+            requests.RequestException: Network or HTTP error
+        """
+        with self.session.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            if dest_path is None:
+                return b"".join(response.iter_content(self.download_chunk_bytes))
+
+            directory = os.path.dirname(dest_path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".download.", suffix=".tmp", dir=directory)
+            size = 0
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in response.iter_content(self.download_chunk_bytes):
+                        f.write(chunk)
+                        size += len(chunk)
+                os.replace(temp_path, dest_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            return size
+
+    def download_stats(self) -> Dict[str, int]:
+        """Request and connection counts of the download session's urllib3 pools"""
+        requests_count = connections = 0
+        if self._session is not None:
+            # The same adapter is mounted for http:// and https://
+            adapters = {id(a): a for a in self._session.adapters.values()}
+            for adapter in adapters.values():
+                pools = adapter.poolmanager.pools
+                for pool in [pools[key] for key in pools.keys()]:
+                    requests_count += pool.num_requests
+                    connections += pool.num_connections
+        return {
+            "requests": requests_count,
+            "connections": connections,
+            "reused": max(0, requests_count - connections),
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Connection reuse for API calls and downloads."""
+        return {"api": self.api_stats.snapshot(), "download": self.download_stats()}
+
+    async def aclose(self):
+        """
+        Close the async client from inside the event loop it was used in
+
+        Its pooled connections belong to that loop, so the next loop gets a new
+        client instead of one whose connections are bound to a closed loop.
+        """
+        with self._lock:
+            client, self._async_client = self._async_client, None
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
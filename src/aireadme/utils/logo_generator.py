@@ -48,19 +48,21 @@ Return only the logo design description focusing on geometric elements and color
         
         # Call text-to-image API to generate logo with high quality settings
         console.print(f"[cyan]Using high-quality image generation (quality: hd, size: 1024x1024)[/cyan]")
-        image_result = model_client.get_image(image_prompt)
+        # The image is streamed straight into png_path
+        image_result = model_client.get_image(image_prompt, dest_path=png_path)
         
         if "error" in image_result:
             console.print(f"[red]Image generation failed: {image_result['error']}[/red]")
             return None
         
-        if not image_result["content"]:
-            console.print("[red]Image content is empty, generation failed[/red]")
-            return None
-        
-        # Save image file
-        with open(png_path, 'wb') as f:
-            f.write(image_result["content"])
+        if not image_result.get("path"):
+            if not image_result["content"]:
+                console.print("[red]Image content is empty, generation failed[/red]")
+                return None
+            
+            # Save image file
+            with open(png_path, 'wb') as f:
+                f.write(image_result["content"])
         
         console.print(f"[green]✔ Logo image saved to {png_path}[/green]")
         console.print(f"[green]✔ Image URL: {image_result['url']}[/green]")
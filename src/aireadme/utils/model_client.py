@@ -1,16 +1,49 @@
 import os
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
 from rich.console import Console
-import requests
-from openai import OpenAI
-from typing import Optional, Dict, Union
-from aireadme.config import get_llm_config, get_t2i_config, validate_config
+from typing import TYPE_CHECKING, Optional, Dict, Iterator, List, Tuple, Union
+from aireadme.config import (
+    get_llm_config, get_t2i_config, get_cache_config, get_concurrency_config,
+    get_retry_config, get_http_config, get_metrics_config, get_endpoint_config, get_stage_model_config,
+    validate_config,
+)
+from aireadme.utils.response_cache import ResponseCache
+from aireadme.utils.rate_limiter import RateController, estimate_tokens
+from aireadme.utils.errors import (
+    ENDPOINT_STATUS_CODES, CircuitOpenError, ModelClientError, PermanentModelError, TransientModelError,
+    classify_error, is_rate_limit_error,
+)
+from aireadme.utils.retry import RetryPolicy, CircuitBreaker
+from aireadme.utils.single_flight import SingleFlight
+from aireadme.utils.http_transport import HttpTransport, http2_available
+from aireadme.utils.telemetry import CallStats, Telemetry
+from aireadme.utils.endpoint_pool import Endpoint, EndpointPool
+
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
+
+
+def _answer_text(response) -> str:
+    try:
+        content = response.choices[0].message.content
+    except (AttributeError, IndexError, TypeError):
+        return ""
+    return content if isinstance(content, str) else ""
 
 
 class ModelClient:
     """Model client class for LLM Q&A and text-to-image functionality"""
     
     def __init__(self, max_tokens: int = 1000, temperature: float = 0.7, 
-                 image_size: str = "1024x1024", quality: str = "hd"):
+                 image_size: str = "1024x1024", quality: str = "hd",
+                 cache: Optional[ResponseCache] = None,
+                 rate_controller: Optional[RateController] = None,
+                 transport: Optional[HttpTransport] = None,
+                 telemetry: Optional[Telemetry] = None,
+                 endpoints: Optional[EndpointPool] = None):
         """
         Initialize model client
         
@@ -19,8 +52,14 @@ class ModelClient:
             temperature: Temperature parameter
             image_size: Image size
             quality: Image quality
+            cache: Response cache; if None, one is created when LLM_CACHE is enabled
+            rate_controller: Admission control for the first endpoint; if None, one is built from config
+            transport: Shared pooled HTTP clients; if None, one is built from config
+            telemetry: Per-call metrics sink; if None, one is built from config
+            endpoints: LLM deployments/keys to route across; if None, built from LLM_ENDPOINTS
+                or the single LLM_BASE_URL/LLM_API_KEY pair
         """
-        # Validate configuration
+        # Validate configuration; text-to-image settings are checked when an image is requested
         validate_config()
         
         # Get configurations
@@ -30,160 +69,774 @@ class ModelClient:
         # Set parameters
         self.max_tokens = max_tokens
         self.temperature = temperature
+        # Model, max_tokens and temperature per pipeline stage (fast vs premium tier)
+        self.stage_models = get_stage_model_config()
         self.image_size = image_size
         self.quality = quality
         
         # Initialize console
         self.console = Console()
         
-        # Initialize clients
-        self.llm_client = self._initialize_llm_client()
-        self.t2i_client = self._initialize_t2i_client()
+        # Optional persistent response cache
+        if cache is None:
+            cache_config = get_cache_config()
+            if cache_config["enabled"]:
+                cache = ResponseCache(
+                    cache_config["path"],
+                    max_bytes=cache_config["max_bytes"],
+                    ttl_seconds=cache_config["ttl_seconds"],
+                )
+        self.cache = cache
+        
+        # Retries with jittered backoff and per-request timeout
+        retry_config = get_retry_config()
+        self.retry_policy = RetryPolicy(
+            max_retries=retry_config["max_retries"],
+            base_delay=retry_config["base_delay"],
+            max_delay=retry_config["max_delay"],
+        )
+        self.request_timeout = retry_config["timeout"]
+        
+        # LLM endpoints, each with its own rate limits, adaptive concurrency and circuit
+        # breaker, so that keys with separate quotas add up
+        concurrency_config = get_concurrency_config()
+        if endpoints is None:
+            endpoint_config = get_endpoint_config()
+            pool = []
+            for settings in endpoint_config["endpoints"]:
+                if rate_controller is None or pool:
+                    controller = RateController(
+                        max_concurrency=concurrency_config["max_concurrency"],
+                        requests_per_minute=concurrency_config["requests_per_minute"],
+                        tokens_per_minute=concurrency_config["tokens_per_minute"],
+                    )
+                else:
+                    controller = rate_controller
+                pool.append(Endpoint(
+                    settings["base_url"], settings["api_key"], weight=settings["weight"],
+                    rate_controller=controller,
+                    circuit_breaker=CircuitBreaker(
+                        failure_threshold=retry_config["circuit_failures"],
+                        reset_timeout=retry_config["circuit_reset"],
+                    ),
+                ))
+            endpoints = EndpointPool(pool, routing=endpoint_config["routing"])
+        self.endpoints = endpoints
+        
+        # Concurrent identical prompts are sent once
+        self.single_flight = SingleFlight()
+        
+        # Pooled HTTP connections shared by all API clients and image downloads
+        if transport is None:
+            http_config = get_http_config()
+            if http_config["http2"] and not http2_available():
+                self.console.print("[yellow]HTTP2=1 needs the h2 package, falling back to HTTP/1.1[/yellow]")
+            transport = HttpTransport(
+                max_connections=http_config["max_connections"] or concurrency_config["max_concurrency"] * len(endpoints),
+                keepalive_expiry=http_config["keepalive_expiry"],
+                http2=http_config["http2"],
+                download_chunk_bytes=http_config["download_chunk_bytes"],
+            )
+        self.transport = transport
+        
+        # Latency, queue wait, tokens, retries and cache status of every call
+        if telemetry is None:
+            metrics_config = get_metrics_config()
+            telemetry = Telemetry(
+                input_price=metrics_config["input_price"],
+                output_price=metrics_config["output_price"],
+                image_price=metrics_config["image_price"],
+            )
+        self.telemetry = telemetry
+        
+        # SDK clients are built on first use, so the openai package is only imported
+        # once a request is made and the image client only exists if a logo is wanted
+        self._t2i_client = None
+        self._async_t2i_client = None
+        self._client_lock = threading.Lock()
+    
+    @property
+    def rate_controller(self) -> RateController:
+        """Admission control of the first endpoint"""
+        return self.endpoints.primary.rate_controller
+    
+    @rate_controller.setter
+    def rate_controller(self, controller: RateController):
+        self.endpoints.primary.rate_controller = controller
+    
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Circuit breaker of the first endpoint"""
+        return self.endpoints.primary.circuit_breaker
+    
+    @circuit_breaker.setter
+    def circuit_breaker(self, breaker: CircuitBreaker):
+        self.endpoints.primary.circuit_breaker = breaker
     
-    def _initialize_llm_client(self) -> OpenAI:
+    @property
+    def t2i_configured(self) -> bool:
+        """Whether text-to-image credentials are available"""
+        return bool(self.t2i_config["api_key"])
+    
+    def _initialize_llm_client(self, endpoint: Optional[Endpoint] = None) -> "OpenAI":
         """
         Initialize LLM client
         
+        Args:
+            endpoint: Endpoint to connect to, defaults to the first one
+            
         Returns:
             Configured LLM OpenAI client
         """
+        from openai import OpenAI
+        endpoint = endpoint or self.endpoints.primary
         return OpenAI(
-            base_url=self.llm_config["base_url"],
-            api_key=self.llm_config["api_key"],
+            base_url=endpoint.base_url,
+            api_key=endpoint.api_key,
+            # Retries are handled by ModelClient, which needs to see every failure
+            max_retries=0,
+            http_client=self.transport.client,
         )
     
-    def _initialize_t2i_client(self) -> OpenAI:
+    def _initialize_t2i_client(self) -> "OpenAI":
         """
         Initialize text-to-image client
         
         Returns:
             Configured text-to-image OpenAI client
+            
+        Raises:
+            ValueError: T2I_API_KEY is not set
         """
+        from openai import OpenAI
+        validate_config(llm=False, t2i=True)
         return OpenAI(
             base_url=self.t2i_config["base_url"],
             api_key=self.t2i_config["api_key"],
+            http_client=self.transport.client,
         )
     
-    def get_answer(self, question: str, model: Optional[str] = None) -> str:
+    def _endpoint_client(self, endpoint: Endpoint) -> "OpenAI":
+        """LLM client of an endpoint, created on first use"""
+        with self._client_lock:
+            if endpoint.client is None:
+                endpoint.client = self._initialize_llm_client(endpoint)
+            return endpoint.client
+    
+    def _endpoint_async_client(self, endpoint: Endpoint) -> "AsyncOpenAI":
+        """Async LLM client of an endpoint, created on first use"""
+        if endpoint.async_client is None:
+            from openai import AsyncOpenAI
+            endpoint.async_client = AsyncOpenAI(
+                base_url=endpoint.base_url,
+                api_key=endpoint.api_key,
+                max_retries=0,
+                http_client=self.transport.async_client,
+            )
+        return endpoint.async_client
+    
+    def circuit_wait(self) -> float:
+        """Seconds until some endpoint's circuit accepts requests again, 0 if one does now"""
+        return min(endpoint.circuit_breaker.remaining() for endpoint in self.endpoints.endpoints)
+    
+    async def aclose(self):
+        """
+        Close the async clients at the end of an event loop
+
+        Call this before the loop given to asyncio.run() finishes; the next
+        async call then creates clients bound to its own loop.
+        """
+        for endpoint in self.endpoints.endpoints:
+            endpoint.async_client = None
+        self._async_t2i_client = None
+        await self.transport.aclose()
+    
+    @property
+    def llm_client(self) -> "OpenAI":
+        """LLM client of the first endpoint, created on first use"""
+        return self._endpoint_client(self.endpoints.primary)
+    
+    @llm_client.setter
+    def llm_client(self, client):
+        self.endpoints.primary.client = client
+    
+    @property
+    def t2i_client(self) -> "OpenAI":
+        """Text-to-image client, created on first use"""
+        with self._client_lock:
+            if self._t2i_client is None:
+                self._t2i_client = self._initialize_t2i_client()
+            return self._t2i_client
+    
+    @t2i_client.setter
+    def t2i_client(self, client):
+        self._t2i_client = client
+    
+    @property
+    def async_llm_client(self) -> "AsyncOpenAI":
+        """Async LLM client of the first endpoint, created on first use"""
+        return self._endpoint_async_client(self.endpoints.primary)
+    
+    @async_llm_client.setter
+    def async_llm_client(self, client):
+        self.endpoints.primary.async_client = client
+
+    @property
+    def async_t2i_client(self) -> "AsyncOpenAI":
+        """Async text-to-image client, created on first use"""
+        if self._async_t2i_client is None:
+            from openai import AsyncOpenAI
+            validate_config(llm=False, t2i=True)
+            self._async_t2i_client = AsyncOpenAI(
+                base_url=self.t2i_config["base_url"],
+                api_key=self.t2i_config["api_key"],
+                http_client=self.transport.async_client,
+            )
+        return self._async_t2i_client
+
+    def stage_settings(self, stage: Optional[str] = None) -> Dict[str, Union[str, int, float]]:
+        """
+        Model, max_tokens and temperature for a pipeline stage
+        
+        Args:
+            stage: Stage name, e.g. "descriptions" or "readme"; defaults to the
+                stage the call is made in (see Telemetry.stage)
+            
+        Returns:
+            Settings of the stage, with the client defaults for anything it does
+            not set; calls outside a known stage get the defaults throughout
+        """
+        settings = self.stage_models.get(stage or self.telemetry.current_stage(), {})
+        temperature = settings.get("temperature")
+        return {
+            "model": settings.get("model") or self.llm_config["model_name"],
+            "max_tokens": settings.get("max_tokens") or self.max_tokens,
+            "temperature": self.temperature if temperature is None else temperature,
+        }
+
+    def _request_key(self, question: str, model_name: str, max_tokens: int,
+                     temperature: Optional[float] = None) -> str:
+        """Hash of everything that determines an answer, shared by the cache and single-flight"""
+        return ResponseCache.make_key(
+            self.llm_config["base_url"], model_name,
+            self.temperature if temperature is None else temperature, max_tokens, question
+        )
+
+    def _cache_key(self, question: str, model_name: str, max_tokens: int,
+                   temperature: Optional[float] = None) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self._request_key(question, model_name, max_tokens, temperature)
+
+    def _completion_params(self, question: str, model_name: str, max_tokens: int,
+                           messages: Optional[List[dict]] = None,
+                           temperature: Optional[float] = None) -> dict:
+        return {
+            "model": model_name,
+            "messages": messages or [
+                {"role": "user", "content": question}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": self.temperature if temperature is None else temperature
+        }
+
+    def _on_failure(self, error: Exception, slot, endpoint: Endpoint) -> ModelClientError:
+        """Classify a failed attempt and report it to the endpoint's rate controller and circuit breaker"""
+        typed = classify_error(error)
+        if is_rate_limit_error(error):
+            # Throttling means the endpoint is alive: it does not trip the breaker and ends a half-open trial
+            endpoint.circuit_breaker.record_success()
+            slot.throttle(typed.retry_after)
+            endpoint.record_failure(throttled=True, retry_after=typed.retry_after)
+        elif isinstance(typed, TransientModelError):
+            endpoint.circuit_breaker.record_failure()
+            endpoint.record_failure()
+        else:
+            # A 4xx concerns this one request (too long, invalid, ...); the endpoint itself answered
+            endpoint.circuit_breaker.record_success()
+            endpoint.record_failure()
+        return typed
+
+    def _pick_endpoint(self, avoid: set) -> Tuple[Endpoint, bool]:
+        """
+        Endpoint for the next attempt, in routing order, skipping open circuits
+        
+        Returns:
+            The endpoint, and whether the attempt is its circuit's half-open trial
+        
+        Raises:
+            CircuitOpenError: Every endpoint's circuit is open
+        """
+        error = None
+        for endpoint in self.endpoints.candidates(avoid):
+            try:
+                return endpoint, endpoint.circuit_breaker.before_call()
+            except CircuitOpenError as e:
+                error = e
+        raise error
+
+    @staticmethod
+    @contextmanager
+    def _attempt(endpoint: Endpoint, trial: bool):
+        """Around one attempt: a trial that ends without an outcome (interrupted, cancelled) is released"""
+        try:
+            yield
+        finally:
+            if trial:
+                endpoint.circuit_breaker.release_trial()
+
+    def _retry_delay(self, attempt: int, error: ModelClientError, endpoint: Endpoint,
+                     avoid: set) -> Optional[float]:
+        """
+        Decide how the next attempt goes after a failure on endpoint
+        
+        While another endpoint is available the request fails over to it
+        immediately; once every endpoint has been tried it backs off as usual.
+        Errors tied to one key or deployment fail over but are not retried
+        on a single endpoint.
+        
+        Returns:
+            Seconds to wait before the next attempt, or None to give up
+        """
+        endpoint_specific = isinstance(error, PermanentModelError) and error.status_code in ENDPOINT_STATUS_CODES
+        if endpoint_specific and attempt >= self.retry_policy.max_retries:
+            return None
+        delay = 0.0 if endpoint_specific else self.retry_policy.next_delay(attempt, error)
+        if delay is None:
+            return None
+        avoid.add(endpoint)
+        if self.endpoints.has_alternative(avoid):
+            return 0.0
+        if endpoint_specific:
+            return None
+        avoid.clear()
+        return delay
+
+    def _create_completion(self, question: str, model_name: str, max_tokens: int,
+                           call: Optional[CallStats] = None, temperature: Optional[float] = None):
+        """
+        Send a chat completion with admission control, retries and circuit breaking
+        
+        Queue wait, retries and token usage are added to call when given.
+        
+        Raises:
+            ModelClientError: TransientModelError once retries are exhausted,
+                PermanentModelError immediately, CircuitOpenError while every endpoint's circuit is open
+        """
+        params = self._completion_params(question, model_name, max_tokens, temperature=temperature)
+        estimated = estimate_tokens(question) + max_tokens
+        call = call if call is not None else CallStats()
+        attempt = 0
+        avoid = set()
+        while True:
+            endpoint, trial = self._pick_endpoint(avoid)
+            queued = time.perf_counter()
+            with endpoint.track(), self._attempt(endpoint, trial), endpoint.rate_controller.slot(estimated) as slot:
+                call.queue_wait += time.perf_counter() - queued
+                call.sent = True
+                call.endpoint = endpoint.name
+                try:
+                    response = self._endpoint_client(endpoint).chat.completions.create(
+                        **params, timeout=self.request_timeout
+                    )
+                except Exception as e:
+                    error = self._on_failure(e, slot, endpoint)
+                    delay = self._retry_delay(attempt, error, endpoint, avoid)
+                    if delay is None:
+                        raise error from e
+                else:
+                    endpoint.circuit_breaker.record_success()
+                    slot.record_usage(getattr(response, "usage", None))
+                    call.add_usage(getattr(response, "usage", None), question, _answer_text(response))
+                    return response
+            attempt += 1
+            call.retries = attempt
+            time.sleep(delay)
+
+    async def _create_completion_async(self, question: str, model_name: str, max_tokens: int,
+                                       call: Optional[CallStats] = None,
+                                       temperature: Optional[float] = None):
+        """Async version of _create_completion"""
+        params = self._completion_params(question, model_name, max_tokens, temperature=temperature)
+        estimated = estimate_tokens(question) + max_tokens
+        call = call if call is not None else CallStats()
+        attempt = 0
+        avoid = set()
+        while True:
+            endpoint, trial = self._pick_endpoint(avoid)
+            queued = time.perf_counter()
+            with endpoint.track(), self._attempt(endpoint, trial):
+                async with endpoint.rate_controller.slot_async(estimated) as slot:
+                    call.queue_wait += time.perf_counter() - queued
+                    call.sent = True
+                    call.endpoint = endpoint.name
+                    try:
+                        response = await self._endpoint_async_client(endpoint).chat.completions.create(
+                            **params, timeout=self.request_timeout
+                        )
+                    except Exception as e:
+                        error = self._on_failure(e, slot, endpoint)
+                        delay = self._retry_delay(attempt, error, endpoint, avoid)
+                        if delay is None:
+                            raise error from e
+                    else:
+                        endpoint.circuit_breaker.record_success()
+                        slot.record_usage(getattr(response, "usage", None))
+                        call.add_usage(getattr(response, "usage", None), question, _answer_text(response))
+                        return response
+            attempt += 1
+            call.retries = attempt
+            await asyncio.sleep(delay)
+
+    def _image_params(self, prompt: str, model_name: str) -> dict:
+        # Generate image request parameters
+        generate_params = {
+            "model": model_name,
+            "prompt": prompt,
+            "n": 1,
+            "size": self.image_size
+        }
+        
+        # Add quality parameter if model supports it
+        if model_name.startswith("dall-e"):
+            generate_params["quality"] = self.quality
+        return generate_params
+
+    def get_answer(self, question: str, model: Optional[str] = None,
+                   max_tokens: Optional[int] = None, temperature: Optional[float] = None) -> str:
         """
         Get answer to question using LLM
         
         Args:
             question: User question
-            model: Specify model to use, if not specified use default model from config
+            model: Specify model to use, defaults to the model of the current stage
+            max_tokens: Answer length limit for this call, defaults to the current stage's limit
+            temperature: Sampling temperature for this call, defaults to the current stage's temperature
             
         Returns:
             LLM answer
+            
+        Raises:
+            ModelClientError: Typed failure (transient, permanent or circuit open)
         """
+        # Explicit arguments win over the settings of the current pipeline stage
+        settings = self.stage_settings()
+        model_name = model or settings["model"]
+        max_tokens = max_tokens or settings["max_tokens"]
+        temperature = settings["temperature"] if temperature is None else temperature
+        started = time.perf_counter()
+        
+        request_key = self._request_key(question, model_name, max_tokens, temperature)
+        if self.cache is not None:
+            cached = self.cache.get(request_key)
+            if cached is not None:
+                self.telemetry.record("chat", model_name, started, cache="hit")
+                return cached
+        
+        call = CallStats(cache="miss" if self.cache is not None else "off")
+        
+        def fetch():
+            response = self._create_completion(question, model_name, max_tokens, call, temperature)
+            answer = response.choices[0].message.content
+            # Only successful, non-empty answers are cached
+            if self.cache is not None and answer:
+                self.cache.put(request_key, answer)
+            return answer
+        
+        # Identical prompts already in flight (e.g. duplicate files) share one request
         try:
-            # Use specified model or default LLM model from config
-            model_name = model or self.llm_config["model_name"]
-            
-            response = self.llm_client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {"role": "user", "content": question}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
-            )
+            answer = self.single_flight.do(request_key, fetch)
+        except Exception:
+            self.telemetry.record("chat", model_name, started, call, ok=False)
+            raise
+        self.telemetry.record("chat", model_name, started, call, cache=None if call.sent else "coalesced")
+        return answer
+
+    async def get_answer_async(self, question: str, model: Optional[str] = None,
+                               max_tokens: Optional[int] = None,
+                               temperature: Optional[float] = None) -> str:
+        """
+        Coroutine version of get_answer, built on AsyncOpenAI
+        
+        Args:
+            question: User question
+            model: Specify model to use, defaults to the model of the current stage
+            max_tokens: Answer length limit for this call, defaults to the current stage's limit
+            temperature: Sampling temperature for this call, defaults to the current stage's temperature
             
-            return response.choices[0].message.content
+        Returns:
+            LLM answer
             
-        except Exception as e:
-            return f"Error occurred while getting answer: {str(e)}"
+        Raises:
+            ModelClientError: Typed failure (transient, permanent or circuit open)
+        """
+        settings = self.stage_settings()
+        model_name = model or settings["model"]
+        max_tokens = max_tokens or settings["max_tokens"]
+        temperature = settings["temperature"] if temperature is None else temperature
+        started = time.perf_counter()
+        
+        request_key = self._request_key(question, model_name, max_tokens, temperature)
+        if self.cache is not None:
+            cached = self.cache.get(request_key)
+            if cached is not None:
+                self.telemetry.record("chat", model_name, started, cache="hit")
+                return cached
+        
+        call = CallStats(cache="miss" if self.cache is not None else "off")
+        
+        async def fetch():
+            response = await self._create_completion_async(question, model_name, max_tokens, call, temperature)
+            answer = response.choices[0].message.content
+            if self.cache is not None and answer:
+                self.cache.put(request_key, answer)
+            return answer
+        
+        try:
+            answer = await self.single_flight.do_async(request_key, fetch)
+        except Exception:
+            self.telemetry.record("chat", model_name, started, call, ok=False)
+            raise
+        self.telemetry.record("chat", model_name, started, call, cache=None if call.sent else "coalesced")
+        return answer
     
-    def get_image(self, prompt: str, model: Optional[str] = None) -> Dict[str, Union[str, bytes, None]]:
+    def _stream_completion(self, messages: List[dict], model_name: str, max_tokens: int,
+                           call: Optional[CallStats] = None,
+                           temperature: Optional[float] = None) -> Iterator[str]:
+        """
+        Stream one chat completion, yielding text deltas
+
+        Failures before the first delta are retried like _create_completion;
+        a failure after output has been yielded is raised as a typed error.
+        Queue wait, retries and estimated token usage are added to call when given.
+
+        Returns:
+            The finish_reason of the completion (as the generator's return value)
+        """
+        question = "".join(m["content"] for m in messages)
+        params = self._completion_params(question, model_name, max_tokens, messages=messages,
+                                         temperature=temperature)
+        estimated = estimate_tokens(question) + max_tokens
+        call = call if call is not None else CallStats()
+        attempt = 0
+        avoid = set()
+        while True:
+            endpoint, trial = self._pick_endpoint(avoid)
+            queued = time.perf_counter()
+            with endpoint.track(), self._attempt(endpoint, trial), endpoint.rate_controller.slot(estimated) as slot:
+                call.queue_wait += time.perf_counter() - queued
+                call.sent = True
+                call.endpoint = endpoint.name
+                produced = False
+                finish_reason = None
+                pieces = []
+                try:
+                    stream = self._endpoint_client(endpoint).chat.completions.create(
+                        **params, stream=True, timeout=self.request_timeout
+                    )
+                    for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        choice = chunk.choices[0]
+                        text = getattr(choice.delta, "content", None)
+                        if text:
+                            produced = True
+                            pieces.append(text)
+                            yield text
+                        if choice.finish_reason:
+                            finish_reason = choice.finish_reason
+                except Exception as e:
+                    error = self._on_failure(e, slot, endpoint)
+                    # Output already shown cannot be taken back, so only failures before it are retried
+                    delay = None if produced else self._retry_delay(attempt, error, endpoint, avoid)
+                    if delay is None:
+                        raise error from e
+                else:
+                    endpoint.circuit_breaker.record_success()
+                    # Streams carry no usage block, so tokens are estimated from the text
+                    call.add_usage(None, question, "".join(pieces))
+                    return finish_reason
+            attempt += 1
+            call.retries = attempt
+            time.sleep(delay)
+
+    def stream_answer(self, question: str, model: Optional[str] = None,
+                      max_tokens: Optional[int] = None, max_continuations: int = 0,
+                      temperature: Optional[float] = None) -> Iterator[str]:
+        """
+        Stream an answer as it is generated
+        
+        When the model stops because it hit the token limit, a follow-up request
+        asks it to continue where it stopped, up to max_continuations times, and
+        the continuation is streamed as part of the same answer.
+        
+        Args:
+            question: User question
+            model: Specify model to use, defaults to the model of the current stage
+            max_tokens: Answer length limit per request, defaults to the current stage's limit
+            max_continuations: Follow-up requests allowed after a length stop
+            temperature: Sampling temperature, defaults to the current stage's temperature
+            
+        Yields:
+            Pieces of the answer text
+            
+        Raises:
+            ModelClientError: Typed failure (transient, permanent or circuit open)
+        """
+        settings = self.stage_settings()
+        model_name = model or settings["model"]
+        max_tokens = max_tokens or settings["max_tokens"]
+        temperature = settings["temperature"] if temperature is None else temperature
+        started = time.perf_counter()
+        
+        cache_key = self._cache_key(question, model_name, max_tokens, temperature)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.telemetry.record("stream", model_name, started, cache="hit")
+                yield cached
+                return
+        
+        call = CallStats(cache="miss" if cache_key is not None else "off")
+        messages = [{"role": "user", "content": question}]
+        parts = []
+        try:
+            for continuation in range(max_continuations + 1):
+                start = len(parts)
+                stream = self._stream_completion(messages, model_name, max_tokens, call, temperature)
+                while True:
+                    try:
+                        text = next(stream)
+                    except StopIteration as stop:
+                        finish_reason = stop.value
+                        break
+                    parts.append(text)
+                    yield text
+                if finish_reason != "length" or continuation == max_continuations:
+                    break
+                messages = messages + [
+                    {"role": "assistant", "content": "".join(parts[start:])},
+                    {"role": "user", "content": "Continue exactly where you stopped. Do not repeat anything already written."},
+                ]
+        except Exception:
+            self.telemetry.record("stream", model_name, started, call, ok=False)
+            raise
+        self.telemetry.record("stream", model_name, started, call)
+        
+        answer = "".join(parts)
+        if cache_key is not None and answer:
+            self.cache.put(cache_key, answer)
+
+    def _image_result(self, image_url: str, downloaded, dest_path: Optional[str]) -> dict:
+        self.console.print(f"Image URL: {image_url}")
+        if dest_path is not None:
+            saved = downloaded is not None
+            if saved:
+                self.console.print(f"Image saved to {dest_path} ({downloaded} bytes)")
+            return {"url": image_url, "content": None, "path": dest_path if saved else None}
+        if downloaded is not None:
+            self.console.print(f"Image content size: {len(downloaded)} bytes")
+        return {"url": image_url, "content": downloaded}
+
+    def get_image(self, prompt: str, model: Optional[str] = None,
+                  dest_path: Optional[str] = None) -> Dict[str, Union[str, bytes, None]]:
         """
         Generate image using text-to-image model
         
         Args:
             prompt: Image description prompt
             model: Specify model to use, if not specified use default model from config
+            dest_path: Stream the image straight into this file instead of returning its bytes
             
         Returns:
-            Dictionary containing url and content: {"url": str, "content": bytes}
+            Dictionary containing url and content: {"url": str, "content": bytes};
+            with dest_path, content is None and "path" is set once the file is written
         """
+        started = time.perf_counter()
+        call = CallStats()
+        model_name = model or self.t2i_config["model_name"]
         try:
-            # Use specified model or default text-to-image model from config
-            model_name = model or self.t2i_config["model_name"]
-            
-            # Generate image request parameters
-            generate_params = {
-                "model": model_name,
-                "prompt": prompt,
-                "n": 1,
-                "size": self.image_size
-            }
-            
-            # Add quality parameter if model supports it
-            if model_name.startswith("dall-e"):
-                generate_params["quality"] = self.quality
-            
-            response = self.t2i_client.images.generate(**generate_params)
+            response = self.t2i_client.images.generate(**self._image_params(prompt, model_name))
+            call.sent = True
             
             image_url = response.data[0].url
             
             # Download image content with retry mechanism
-            image_content = self._download_image_with_retry(image_url, max_retries=3)
-            
-            self.console.print(f"Image URL: {image_url}")
-            self.console.print(f"Image content size: {len(image_content)} bytes")
+            downloaded = self._download_image_with_retry(image_url, max_retries=3, dest_path=dest_path)
+            self.telemetry.record("image", model_name, started, call, ok=downloaded is not None)
+            return self._image_result(image_url, downloaded, dest_path)
             
+        except Exception as e:
+            self.telemetry.record("image", model_name, started, call, ok=False)
             return {
-                "url": image_url,
-                "content": image_content
+                "url": None,
+                "content": None,
+                "error": f"Error occurred while generating image: {str(e)}"
             }
+
+    async def get_image_async(self, prompt: str, model: Optional[str] = None,
+                              dest_path: Optional[str] = None) -> Dict[str, Union[str, bytes, None]]:
+        """
+        Coroutine version of get_image; the download runs on the default executor
+        
+        Args:
+            prompt: Image description prompt
+            model: Specify model to use, if not specified use default model from config
+            dest_path: Stream the image straight into this file instead of returning its bytes
+            
+        Returns:
+            Dictionary containing url and content: {"url": str, "content": bytes};
+            with dest_path, content is None and "path" is set once the file is written
+        """
+        started = time.perf_counter()
+        call = CallStats()
+        model_name = model or self.t2i_config["model_name"]
+        try:
+            response = await self.async_t2i_client.images.generate(**self._image_params(prompt, model_name))
+            call.sent = True
+            
+            image_url = response.data[0].url
+            
+            loop = asyncio.get_running_loop()
+            downloaded = await loop.run_in_executor(
+                None, self._download_image_with_retry, image_url, 3, dest_path
+            )
+            self.telemetry.record("image", model_name, started, call, ok=downloaded is not None)
+            return self._image_result(image_url, downloaded, dest_path)
             
         except Exception as e:
+            self.telemetry.record("image", model_name, started, call, ok=False)
             return {
                 "url": None,
                 "content": None,
                 "error": f"Error occurred while generating image: {str(e)}"
             }
     
-    def _download_image_with_retry(self, image_url: str, max_retries: int = 3) -> Optional[bytes]:
+    def _download_image_with_retry(self, image_url: str, max_retries: int = 3,
+                                   dest_path: Optional[str] = None) -> Optional[Union[bytes, int]]:
         """
-        Download image with retry mechanism
+        Download image with retry mechanism, reusing pooled connections
         
         Args:
             image_url: Image URL
             max_retries: Maximum retry attempts
+            dest_path: Stream the body to this file instead of returning it
             
         Returns:
-            Image content bytes, returns None if failed
+            Image content bytes (or the number of bytes written to dest_path),
+            returns None if failed
         """
-        import time
         import ssl
+        import requests
         
         for attempt in range(max_retries):
             try:
                 self.console.print(f"Downloading image (attempt {attempt + 1}/{max_retries})...")
                 
-                # Set request parameters with SSL tolerance
-                session = requests.Session()
-                session.verify = True  # Verify SSL certificate
-                
-                # Add User-Agent and other headers
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    'Accept': 'image/*,*/*;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive'
-                }
-                
-                response = session.get(
-                    image_url, 
-                    timeout=60,  # Increase timeout
-                    headers=headers,
-                    stream=True  # Stream download
-                )
-                response.raise_for_status()
-                
-                # Get image content
-                image_content = response.content
-                self.console.print(f"Image downloaded successfully, size: {len(image_content)} bytes")
-                return image_content
+                downloaded = self.transport.download(image_url, dest_path=dest_path, timeout=60)
+                size = downloaded if dest_path is not None else len(downloaded)
+                self.console.print(f"Image downloaded successfully, size: {size} bytes")
+                return downloaded
                 
             except (requests.exceptions.SSLError, ssl.SSLError) as ssl_error:
                 self.console.print(f"SSL error (attempt {attempt + 1}/{max_retries}): {str(ssl_error)}")
@@ -224,13 +877,17 @@ class ModelClient:
         """
         return {
             "llm_base_url": self.llm_config["base_url"],
+            "llm_endpoints": [endpoint.base_url for endpoint in self.endpoints.endpoints],
+            "llm_routing": self.endpoints.routing,
             "llm_model_name": self.llm_config["model_name"],
             "t2i_base_url": self.t2i_config["base_url"],
             "t2i_model_name": self.t2i_config["model_name"],
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
+            "stage_models": self.stage_models,
             "image_size": self.image_size,
-            "quality": self.quality
+            "quality": self.quality,
+            "cache_path": self.cache.path if self.cache is not None else None
         }
 
 
@@ -284,4 +941,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+
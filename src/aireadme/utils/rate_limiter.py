@@ -0,0 +1,235 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+# Rough average used to estimate prompt tokens before the request is sent
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for rate budgeting."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at a per-minute rate
+
+    reserve() always succeeds and returns how long the caller must wait, which
+    lets the bucket go into debt for requests larger than its capacity and lets
+    sync and async callers share one implementation.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        # Allow bursts of up to 15 seconds' worth of budget
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 4)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float = 1) -> float:
+        """
+        Take amount from the bucket
+
+        Returns:
+            Seconds to wait before the reservation is covered
+        """
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, delta: float):
+        """Correct an earlier reservation once the real cost is known (positive = used more)."""
+        if self.unlimited:
+            return
+        with self._lock:
+            self._refill()
+            self.tokens -= delta
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit
+
+    The limit grows by about one slot per round of successful requests and is
+    multiplied by decrease_factor on a throttling response. After a throttle no
+    new request starts until the Retry-After delay (or backoff) has passed.
+    """
+
+    def __init__(self, max_limit: int, initial: Optional[int] = None, min_limit: int = 1,
+                 decrease_factor: float = 0.5, default_backoff: float = 1.0):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial or max_limit)
+        self.decrease_factor = decrease_factor
+        self.default_backoff = default_backoff
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._cond = threading.Condition()
+
+    def _try_acquire(self) -> float:
+        """Returns 0 when a slot was taken, otherwise a hint of how long to wait. Caller holds the lock."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return 0.0
+        return 0.05
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0.0:
+                    return
+                self._cond.wait(timeout=wait)
+
+    async def acquire_async(self):
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+            if wait == 0.0:
+                return
+            await asyncio.sleep(min(wait, 0.05))
+
+    def release(self, throttled: bool = False, retry_after: Optional[float] = None):
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                # Several requests usually fail together; back off once per episode
+                if now >= self.blocked_until:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self.blocked_until = max(self.blocked_until, now + (retry_after or self.default_backoff))
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class _Slot:
+    """Handle for one admitted request, used to report its outcome."""
+
+    __slots__ = ("estimated_tokens", "throttled", "retry_after", "used_tokens")
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.throttled = False
+        self.retry_after = None
+        self.used_tokens = None
+
+    def throttle(self, retry_after: Optional[float] = None):
+        self.throttled = True
+        self.retry_after = retry_after
+
+    def record_usage(self, usage):
+        total = getattr(usage, "total_tokens", None)
+        if total is not None:
+            self.used_tokens = total
+
+
+class RateController:
+    """
+    Admission control for LLM requests
+
+    Combines a requests-per-minute bucket, a tokens-per-minute bucket and an
+    AIMD concurrency limit, and keeps throughput statistics for the run.
+    """
+
+    def __init__(self, max_concurrency: int = 64, requests_per_minute: float = 0,
+                 tokens_per_minute: float = 0, initial_concurrency: Optional[int] = None):
+        """
+        Initialize controller
+
+        Args:
+            max_concurrency: Upper bound for in-flight requests
+            requests_per_minute: Request budget, 0 for unlimited
+            tokens_per_minute: Token budget, 0 for unlimited
+            initial_concurrency: Starting concurrency limit, defaults to max_concurrency
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(max_concurrency, initial=initial_concurrency)
+        self._stats_lock = threading.Lock()
+        self.completed = 0
+        self.throttled = 0
+        self.tokens_used = 0
+        self.started = None
+        self.finished = None
+
+    def _admit_delay(self, estimated_tokens: int) -> float:
+        with self._stats_lock:
+            if self.started is None:
+                self.started = time.monotonic()
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def _finish(self, slot: _Slot):
+        if slot.throttled:
+            # A rejected request does not consume provider budget
+            self.tokens.adjust(-slot.estimated_tokens)
+        elif slot.used_tokens is not None:
+            self.tokens.adjust(slot.used_tokens - slot.estimated_tokens)
+        self.concurrency.release(slot.throttled, slot.retry_after)
+        with self._stats_lock:
+            self.finished = time.monotonic()
+            if slot.throttled:
+                self.throttled += 1
+            else:
+                self.completed += 1
+                self.tokens_used += slot.used_tokens if slot.used_tokens is not None else slot.estimated_tokens
+
+    @contextmanager
+    def slot(self, estimated_tokens: int):
+        """Block until the request may start; report the outcome on the yielded slot."""
+        delay = self._admit_delay(estimated_tokens)
+        if delay:
+            time.sleep(delay)
+        self.concurrency.acquire()
+        slot = _Slot(estimated_tokens)
+        try:
+            yield slot
+        finally:
+            self._finish(slot)
+
+    @asynccontextmanager
+    async def slot_async(self, estimated_tokens: int):
+        """Async version of slot."""
+        delay = self._admit_delay(estimated_tokens)
+        if delay:
+            await asyncio.sleep(delay)
+        await self.concurrency.acquire_async()
+        slot = _Slot(estimated_tokens)
+        try:
+            yield slot
+        finally:
+            self._finish(slot)
+
+    def report(self) -> Dict[str, float]:
+        """Achieved throughput since the first request."""
+        with self._stats_lock:
+            elapsed = (self.finished - self.started) if self.started and self.finished else 0.0
+            minutes = elapsed / 60 if elapsed else 0.0
+            return {
+                "requests": self.completed,
+                "throttled": self.throttled,
+                "tokens": self.tokens_used,
+                "elapsed_seconds": round(elapsed, 2),
+                "requests_per_minute": round(self.completed / minutes, 1) if minutes else 0.0,
+                "tokens_per_minute": round(self.tokens_used / minutes, 1) if minutes else 0.0,
+                "concurrency_limit": round(self.concurrency.limit, 2),
+            }
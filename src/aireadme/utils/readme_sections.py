@@ -0,0 +1,166 @@
+import json
+import os
+import re
+import subprocess
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SECTION_MAP_FILENAME = "readme_sections.json"
+# Pseudo-sources for sections that depend on the whole project rather than on files
+STRUCTURE_SOURCE = "@structure"
+DEPENDENCIES_SOURCE = "@dependencies"
+# Sections whose heading contains one of these words follow the project layout or dependencies
+STRUCTURE_KEYWORDS = ("structure", "layout", "directory")
+DEPENDENCY_KEYWORDS = ("install", "prerequisite", "requirement", "dependenc", "built with", "getting started")
+
+_HEADING = re.compile(r"^##(?!#)\s*(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+# Longest runs of characters that can appear in a mentioned path
+_TOKEN = re.compile(r"[\w./-]+")
+
+
+def git_changed_files(project_dir: str, base_ref: str) -> Optional[List[str]]:
+    """
+    Files changed between base_ref and the working tree, relative to project_dir
+
+    Includes staged, unstaged and untracked files; a rename shows up as both
+    its old and its new path.
+
+    Returns:
+        Sorted paths, or None if git is not installed, project_dir is not in a
+        repository or base_ref cannot be resolved
+    """
+    commands = (
+        ["git", "-C", project_dir, "diff", "--name-only", "--no-renames", "--relative", base_ref, "--"],
+        ["git", "-C", project_dir, "ls-files", "--others", "--exclude-standard"],
+    )
+    paths: Set[str] = set()
+    for command in commands:
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=60)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            return None
+        paths.update(line.strip() for line in result.stdout.splitlines() if line.strip())
+    return sorted(paths)
+
+
+def git_head(project_dir: str) -> Optional[str]:
+    """Commit checked out in project_dir, None outside a git repository"""
+    try:
+        result = subprocess.run(["git", "-C", project_dir, "rev-parse", "HEAD"],
+                                capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def split_sections(readme: str) -> List[Tuple[str, str]]:
+    """
+    Split a README at its level-2 headings
+
+    Headings inside code blocks are ignored. The text before the first
+    heading (title, badges, logo) is returned as a section with heading "".
+
+    Returns:
+        (heading, text) pairs; text includes the heading line, and joining
+        the texts gives back the README
+    """
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    in_fence = False
+    for line in readme.splitlines(keepends=True):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            sections.append((match.group(1), []))
+        sections[-1][1].append(line)
+    return [(heading, "".join(lines)) for heading, lines in sections if heading or lines]
+
+
+def _mentions(text: str) -> Tuple[Set[str], Set[str]]:
+    """
+    Every piece of text that could name a file, collected in one pass
+
+    Path-like tokens are cut at their dots and slashes, so "see lib/cli.py."
+    yields "lib/cli.py" and "lib" among others. Returns the pieces that start
+    a token, which can be file names, and those starting after a slash
+    inside one, which can only be the tail of a longer path.
+    """
+    heads: Set[str] = set()
+    tails: Set[str] = set()
+    for token in _TOKEN.findall(text):
+        starts = [0] + [i + 1 for i, char in enumerate(token) if char == "/"]
+        ends = [i for i, char in enumerate(token) if char in "./"] + [len(token)]
+        for start in starts:
+            pieces = heads if start == 0 else tails
+            pieces.update(token[start:end] for end in ends if end > start)
+    return heads, tails
+
+
+def map_sections(sections: List[Tuple[str, str]], paths: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Source files each README section is written from
+
+    A section depends on the files whose path it mentions, or whose file name
+    it mentions when that name is unique in the project, and on the project
+    layout or dependencies if its heading says so. Each section is tokenized
+    once and looked up in sets, so this scales to very large projects.
+
+    Returns:
+        Sources per section heading: relative paths, STRUCTURE_SOURCE and DEPENDENCIES_SOURCE
+    """
+    names: Dict[str, List[str]] = {}
+    plain_paths: Set[str] = set()
+    other_paths = []  # Paths with spaces or other characters a token cannot hold
+    for path in paths:
+        names.setdefault(os.path.basename(path), []).append(path)
+        if _TOKEN.fullmatch(path):
+            plain_paths.add(path)
+        else:
+            other_paths.append(path)
+    unique_names = {name: matches[0] for name, matches in names.items() if len(matches) == 1}
+    other_names = {name: path for name, path in unique_names.items() if not _TOKEN.fullmatch(name)}
+
+    section_map = {}
+    for heading, text in sections:
+        if not heading:
+            continue
+        heads, tails = _mentions(text)
+        sources = plain_paths.intersection(heads | tails)
+        sources.update(path for path in other_paths if path in text)
+        sources.update(unique_names[name] for name in heads if name in unique_names)
+        sources.update(
+            path for name, path in other_names.items()
+            if re.search(rf"(?<![\w/.-]){re.escape(name)}(?![\w-])", text)
+        )
+        lowered = heading.lower()
+        if any(word in lowered for word in STRUCTURE_KEYWORDS):
+            sources.add(STRUCTURE_SOURCE)
+        if any(word in lowered for word in DEPENDENCY_KEYWORDS):
+            sources.add(DEPENDENCIES_SOURCE)
+        section_map[heading] = sorted(sources)
+    return section_map
+
+
+def stale_sections(section_map: Dict[str, List[str]], changed: Iterable[str]) -> List[str]:
+    """Headings of the sections that depend on a changed file or pseudo-source"""
+    changed = set(changed)
+    return [heading for heading, sources in section_map.items() if changed.intersection(sources)]
+
+
+def load_section_map(output_dir: str) -> Optional[dict]:
+    """State saved by the previous run, None if there is none"""
+    path = os.path.join(output_dir, SECTION_MAP_FILENAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_section_map(output_dir: str, state: dict):
+    """Save the section map together with the file list, dependency hash and commit it was built from"""
+    path = os.path.join(output_dir, SECTION_MAP_FILENAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,116 @@
+import random
+import threading
+import time
+from typing import Optional
+from aireadme.utils.errors import CircuitOpenError, ModelClientError, TransientModelError
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient failures."""
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Initialize policy
+
+        Args:
+            max_retries: Retries after the first attempt
+            base_delay: Backoff ceiling for the first retry, doubled on each further retry
+            max_delay: Upper bound for a single backoff
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, attempt: int, error: ModelClientError) -> Optional[float]:
+        """
+        Decide whether to retry after a failed attempt
+
+        Args:
+            attempt: Zero-based number of the attempt that just failed
+            error: Typed failure of that attempt
+
+        Returns:
+            Seconds to sleep before retrying, or None to give up
+        """
+        if not isinstance(error, TransientModelError) or isinstance(error, CircuitOpenError):
+            return None
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if error.retry_after:
+            delay = max(delay, error.retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an endpoint is down
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    raise CircuitOpenError without being sent. Once reset_timeout has passed a
+    single trial call is let through (half-open); its success closes the
+    circuit and its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError if the call must not be sent
+
+        Returns:
+            True if the call is the half-open trial; it must end in
+            record_success, record_failure or release_trial
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            remaining = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(
+                f"Circuit open after {self.failures} consecutive failures, retry in {remaining:.0f}s",
+                retry_after=remaining,
+            )
+
+    def remaining(self) -> float:
+        """Seconds until the circuit lets a call through again, 0 if it does now"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def release_trial(self):
+        """Let another call be the trial after one that ended without an outcome (e.g. cancelled)"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
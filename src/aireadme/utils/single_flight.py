@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls
+
+    The first caller for a key runs the function; callers arriving with the same
+    key while it is in flight wait for that result (or exception) instead of
+    starting their own call. Nothing is kept once the call finishes, so a later
+    call with the same key runs again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._async_calls: Dict[Tuple[int, str], "asyncio.Future"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Run fn once for all concurrent callers with this key
+
+        Args:
+            key: Identity of the call, e.g. a hash of the request
+            fn: Function producing the result
+
+        Returns:
+            Result of fn, shared by every caller that joined the flight
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Coroutine version of do; coalesces within the running event loop"""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        future = self._async_calls.get(flight_key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+            # shield: a cancelled waiter must not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._async_calls[flight_key] = future
+        with self._lock:
+            self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Waiters see the cancellation too; they are cancelled along with the run anyway
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._async_calls[flight_key]
+
+    def stats(self) -> Dict[str, int]:
+        """Calls actually made and calls that joined one already in flight."""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced}
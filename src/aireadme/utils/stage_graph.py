@@ -0,0 +1,203 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple
+
+
+def bind_context(fn: Callable) -> Callable:
+    """
+    Wrap fn so that calls from worker threads see the caller's context variables
+
+    Thread pools start every task in an empty context, which would lose the
+    pipeline stage (see Telemetry.stage) that model calls are attributed to.
+    Each call runs in its own copy, so the wrapper can be used by many
+    threads at once.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+class StageCancelled(Exception):
+    """Raised inside a stage that stopped early because the run was cancelled"""
+
+
+class Stage:
+    """One step of a StageGraph, with its timing once it has run"""
+
+    __slots__ = ("name", "fn", "after", "started", "finished")
+
+    def __init__(self, name: str, fn: Callable[..., Any], after: Tuple[str, ...]):
+        self.name = name
+        self.fn = fn
+        self.after = after
+        self.started: Optional[float] = None  # Seconds since the graph started
+        self.finished: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class StageGraph:
+    """
+    Runs pipeline stages as a dependency graph
+
+    A stage starts as soon as every stage it depends on has finished, so
+    independent stages run side by side on a thread pool. Each stage is called
+    with the results of its dependencies as keyword arguments. Stages are
+    declared after their dependencies, which keeps the graph acyclic and makes
+    the declaration order a valid sequential order (max_workers=1).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 wrap: Optional[Callable[[str], ContextManager]] = None,
+                 cancelled: Optional[threading.Event] = None):
+        """
+        Initialize the graph
+
+        Args:
+            max_workers: Stages allowed to run at once, defaults to all of them
+            wrap: Context manager factory entered around each stage in its
+                worker thread, e.g. Telemetry.stage
+            cancelled: Event set when run() is interrupted (e.g. Ctrl-C);
+                long stages should check it and stop early
+        """
+        self.max_workers = max_workers
+        self.wrap = wrap
+        self.cancelled = cancelled or threading.Event()
+        self.stages: Dict[str, Stage] = {}
+        self.wall_seconds = 0.0
+        self._started = 0.0
+
+    def add(self, name: str, fn: Callable[..., Any], after: Iterable[str] = ()):
+        """
+        Declare a stage
+
+        Args:
+            name: Stage name, also the keyword its result is passed under
+            fn: Callable taking the results of the stages in after as keyword arguments
+            after: Names of previously declared stages this stage depends on
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        after = tuple(after)
+        unknown = [dep for dep in after if dep not in self.stages]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on undeclared stages: {', '.join(unknown)}")
+        self.stages[name] = Stage(name, fn, after)
+
+    def _run_stage(self, stage: Stage, inputs: Dict[str, Any]):
+        stage.started = time.perf_counter() - self._started
+        try:
+            with self.wrap(stage.name) if self.wrap else nullcontext():
+                return stage.fn(**inputs)
+        finally:
+            stage.finished = time.perf_counter() - self._started
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every stage once its dependencies are done
+
+        If a stage raises, no further stages are started; the stages already
+        running are allowed to finish and the first error is re-raised. If
+        the calling thread is interrupted, self.cancelled is set so running
+        stages can wind down, and the interrupt is re-raised once they have.
+
+        Returns:
+            Results of all stages keyed by name
+        """
+        self._started = time.perf_counter()
+        results: Dict[str, Any] = {}
+        pending = dict(self.stages)
+        running = {}
+        error = None
+        workers = max(1, self.max_workers or len(self.stages))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage") as executor:
+            try:
+                while pending or running:
+                    if error is None:
+                        for name, stage in list(pending.items()):
+                            if all(dep in results for dep in stage.after):
+                                del pending[name]
+                                inputs = {dep: results[dep] for dep in stage.after}
+                                # Each stage starts from the context of the caller, not an empty one
+                                context = contextvars.copy_context()
+                                running[executor.submit(context.run, self._run_stage, stage, inputs)] = stage
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage = running.pop(future)
+                        try:
+                            results[stage.name] = future.result()
+                        except BaseException as e:
+                            error = error or e
+            except BaseException:
+                # Interrupted while waiting: tell the running stages, the pool waits for them on exit
+                self.cancelled.set()
+                raise
+        self.wall_seconds = time.perf_counter() - self._started
+        if error is not None:
+            raise error
+        return results
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Longest chain of dependent stages, weighted by how long each stage took
+
+        This chain bounds the wall-clock time of the whole run: speeding up a
+        stage off the critical path does not make the pipeline finish sooner.
+
+        Returns:
+            Stage names along the path in execution order, and their summed duration
+        """
+        length: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name, stage in self.stages.items():
+            if stage.finished is None:
+                continue
+            deps = [dep for dep in stage.after if dep in length]
+            best = max(deps, key=lambda dep: length[dep]) if deps else None
+            previous[name] = best
+            length[name] = stage.duration + (length[best] if best else 0.0)
+        if not length:
+            return [], 0.0
+        name = max(length, key=lambda n: length[n])
+        total = length[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], total
+
+    def timings(self) -> List[Dict[str, Any]]:
+        """Start offset and duration of every stage that ran, in declaration order."""
+        path = set(self.critical_path()[0])
+        return [
+            {
+                "stage": stage.name,
+                "after": list(stage.after),
+                "start": round(stage.started, 3),
+                "seconds": round(stage.duration, 3),
+                "critical": stage.name in path,
+            }
+            for stage in self.stages.values() if stage.finished is not None
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        """Timings, critical path and wall-clock time, e.g. for metrics.json."""
+        path, seconds = self.critical_path()
+        return {
+            "wall_seconds": round(self.wall_seconds, 3),
+            "critical_path": path,
+            "critical_path_seconds": round(seconds, 3),
+            "stages": self.timings(),
+        }
@@ -0,0 +1,446 @@
+"""
+Offline stand-in for an OpenAI-compatible API
+
+Serves /chat/completions (plain and streaming), /images/generations and the
+generated image files, so the whole pipeline can run without a paid endpoint:
+
+    python -m aireadme.utils.stand_in_server --port 8765 --latency lognormal:-1.5,0.5 --rate-limit-rate 0.05
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 T2I_BASE_URL=http://127.0.0.1:8765/v1 aireadme
+
+Answers are synthesized from the prompt unless a cassette is used: in record
+mode every request is forwarded to a real endpoint and the response saved, in
+replay mode responses come from the cassette only.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import struct
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from aireadme.utils.rate_limiter import CHARS_PER_TOKEN, estimate_tokens
+
+MODE_SYNTHETIC = "synthetic"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+_BATCH_FILE = re.compile(r"^=== FILE: (.+) ===$", re.M)
+_WORDS = ("module", "function", "handles", "configuration", "parses", "returns", "data",
+          "client", "request", "cache", "file", "project", "utility", "generates", "output")
+
+
+def parse_latency(spec: str, rng: Optional[random.Random] = None) -> Callable[[], float]:
+    """
+    Build a latency sampler from a spec string
+
+    Supported specs (seconds): "0.2" or "fixed:0.2", "uniform:LOW,HIGH",
+    "normal:MEAN,STD", "lognormal:MU,SIGMA" (of the underlying normal) and
+    "exp:MEAN". Samples are never negative.
+
+    Raises:
+        ValueError: Unknown distribution or wrong number of parameters
+    """
+    rng = rng or random.Random()
+    name, _, params = spec.partition(":")
+    if not params:
+        name, params = "fixed", name
+    try:
+        values = [float(v) for v in params.split(",")] if params else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+    samplers = {
+        "fixed": (1, lambda v: lambda: v[0]),
+        "uniform": (2, lambda v: lambda: rng.uniform(v[0], v[1])),
+        "normal": (2, lambda v: lambda: rng.gauss(v[0], v[1])),
+        "lognormal": (2, lambda v: lambda: rng.lognormvariate(v[0], v[1])),
+        "exp": (1, lambda v: lambda: rng.expovariate(1.0 / v[0]) if v[0] > 0 else 0.0),
+    }
+    if name not in samplers or len(values) != samplers[name][0]:
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+    sample = samplers[name][1](values)
+    return lambda: max(0.0, sample())
+
+
+def _png(width: int = 8, height: int = 8, seed: int = 0) -> bytes:
+    """A small solid-colour PNG, so downloads return a real image."""
+    color = bytes(((seed * 67) % 256, (seed * 131) % 256, (seed * 199) % 256))
+    raw = b"".join(b"\x00" + color * width for _ in range(height))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def request_key(endpoint: str, body: dict) -> str:
+    """Cassette key: the request body without transport-only fields."""
+    canonical = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+    payload = json.dumps([endpoint, canonical], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Recorded request/response pairs in a JSONL file, keyed by request_key."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self.entries.get(key)
+
+    def record(self, entry: dict):
+        with self._lock:
+            self.entries[entry["key"]] = entry
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class StandInServer:
+    """
+    OpenAI-compatible test server running in a background thread
+
+    Use it as a context manager in tests and benchmarks and point ModelClient
+    at base_url. Counters for requests, injected failures and token usage are
+    available from stats() and GET /stats.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "0",
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 0.1,
+                 answer_tokens: int = 60, mode: str = MODE_SYNTHETIC, cassette: Optional[str] = None,
+                 upstream_url: Optional[str] = None, upstream_api_key: Optional[str] = None,
+                 seed: Optional[int] = None):
+        """
+        Initialize server
+
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 picks a free one
+            latency: Latency spec for every request, see parse_latency
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            retry_after: Retry-After seconds sent with injected 429s
+            answer_tokens: Length of synthesized chat answers
+            mode: synthetic, record (forward to upstream_url and save) or replay (cassette only)
+            cassette: JSONL cassette file for record and replay modes
+            upstream_url: Real API base URL for record mode
+            upstream_api_key: Key for the upstream; defaults to the caller's Authorization header
+            seed: Seed for latency and failure injection, for reproducible runs
+        """
+        if mode not in (MODE_SYNTHETIC, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode != MODE_SYNTHETIC and not cassette:
+            raise ValueError(f"{mode} mode needs a cassette file")
+        if mode == MODE_RECORD and not upstream_url:
+            raise ValueError("record mode needs an upstream URL")
+        self.rng = random.Random(seed)
+        self.sample_latency = parse_latency(latency, self.rng)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.answer_tokens = answer_tokens
+        self.mode = mode
+        self.cassette = Cassette(cassette) if cassette else None
+        self.upstream_url = upstream_url.rstrip("/") if upstream_url else None
+        self.upstream_api_key = upstream_api_key
+        self.images: Dict[str, bytes] = {}
+        self._counters = {
+            "requests": 0, "chat_completions": 0, "images": 0, "errors": 0, "throttled": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "replay_misses": 0,
+        }
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["total_tokens"] = stats["prompt_tokens"] + stats["completion_tokens"]
+        return stats
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counters[name] += delta
+
+    def _inject_failure(self):
+        """Returns (status, headers, body) for an injected failure, or None."""
+        with self._lock:
+            roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            self._count(throttled=1)
+            return 429, {"Retry-After": str(self.retry_after)}, {
+                "error": {"message": "Rate limit reached (injected)", "type": "rate_limit_error"}}
+        if roll < self.rate_limit_rate + self.error_rate:
+            self._count(errors=1)
+            return 500, {}, {"error": {"message": "Internal server error (injected)", "type": "server_error"}}
+        return None
+
+    def _synthesize_chat(self, body: dict) -> dict:
+        prompt = "".join(m.get("content") or "" for m in body.get("messages", []))
+        max_tokens = body.get("max_tokens") or 1000
+        paths = _BATCH_FILE.findall(prompt)
+        if paths:
+            text = json.dumps({path: f"Stand-in summary of {path}." for path in dict.fromkeys(paths)})
+        else:
+            digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+            words = [_WORDS[digest[i % len(digest)] % len(_WORDS)] for i in range(self.answer_tokens)]
+            text = "Stand-in answer: " + " ".join(words) + "."
+        finish_reason = "stop"
+        if estimate_tokens(text) > max_tokens:
+            text = text[:max_tokens * CHARS_PER_TOKEN]
+            finish_reason = "length"
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(text)
+        return {
+            "id": "chatcmpl-standin-" + hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12],
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                         "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def _store_image(self, data: bytes, base_url: str) -> str:
+        with self._lock:
+            name = f"{len(self.images)}.png"
+            self.images[name] = data
+        return f"{base_url}/images/{name}"
+
+    def _forward(self, endpoint: str, body: dict, authorization: Optional[str]):
+        """Send a request to the upstream API; returns (status, response body)."""
+        upstream_body = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+        headers = {"Content-Type": "application/json"}
+        if self.upstream_api_key:
+            headers["Authorization"] = f"Bearer {self.upstream_api_key}"
+        elif authorization:
+            headers["Authorization"] = authorization
+        request = urllib.request.Request(
+            f"{self.upstream_url}/{endpoint}", data=json.dumps(upstream_body).encode("utf-8"), headers=headers
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=300) as response:
+                return response.status, json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read().decode("utf-8") or "{}")
+
+    def _respond(self, endpoint: str, body: dict, authorization: Optional[str], base_url: str):
+        """Produce (status, headers, response body) for an API request."""
+        key = request_key(endpoint, body)
+        if self.mode == MODE_REPLAY:
+            entry = self.cassette.get(key)
+            if entry is None:
+                self._count(replay_misses=1)
+                return 404, {}, {"error": {"message": f"Request not in cassette ({key[:12]})",
+                                           "type": "invalid_request_error"}}
+            return self._from_entry(entry, base_url)
+
+        failure = self._inject_failure()
+        if failure:
+            return failure
+
+        if self.mode == MODE_RECORD:
+            status, response = self._forward(endpoint, body, authorization)
+            if status != 200:
+                return status, {}, response
+            entry = {"key": key, "endpoint": endpoint, "request": body, "response": response}
+            if endpoint == "images/generations":
+                entry["images"] = []
+                for item in response.get("data", []):
+                    if item.get("url"):
+                        with urllib.request.urlopen(item["url"], timeout=300) as image:
+                            entry["images"].append(base64.b64encode(image.read()).decode("ascii"))
+            self.cassette.record(entry)
+            return self._from_entry(entry, base_url)
+
+        if endpoint == "chat/completions":
+            return 200, {}, self._synthesize_chat(body)
+        image = _png(seed=int(hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest(), 16) % 997)
+        return 200, {}, {"created": int(time.time()), "data": [{"url": self._store_image(image, base_url)}]}
+
+    def _from_entry(self, entry: dict, base_url: str):
+        response = json.loads(json.dumps(entry["response"]))
+        # Recorded image URLs expire; serve the captured bytes locally instead
+        for item, data in zip(response.get("data", []), entry.get("images", [])):
+            item["url"] = self._store_image(base64.b64decode(data), base_url)
+        return 200, {}, response
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, completion):
+                """Replay a finished completion as server-sent events."""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                choice = completion["choices"][0]
+                text = choice["message"]["content"] or ""
+                pieces = [text[i:i + 16] for i in range(0, len(text), 16)] or [""]
+                for i, piece in enumerate(pieces):
+                    last = i == len(pieces) - 1
+                    event = {
+                        "id": completion["id"], "object": "chat.completion.chunk",
+                        "created": completion["created"], "model": completion["model"],
+                        "choices": [{"index": 0, "delta": {"content": piece},
+                                     "finish_reason": choice["finish_reason"] if last else None}],
+                    }
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/stats"):
+                    self._send_json(200, server.stats())
+                    return
+                name = self.path.rsplit("/", 1)[-1]
+                data = server.images.get(name) if "/images/" in self.path else None
+                if data is None:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+                path = self.path.rstrip("/")
+                if path.endswith("/chat/completions"):
+                    endpoint = "chat/completions"
+                elif path.endswith("/images/generations"):
+                    endpoint = "images/generations"
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+                    return
+
+                server._count(requests=1)
+                delay = server.sample_latency()
+                if delay:
+                    time.sleep(delay)
+                base_url = f"http://{self.headers.get('Host')}/v1"
+                status, headers, payload = server._respond(
+                    endpoint, body, self.headers.get("Authorization"), base_url
+                )
+                if status == 200:
+                    if endpoint == "chat/completions":
+                        usage = payload.get("usage") or {}
+                        server._count(chat_completions=1,
+                                      prompt_tokens=usage.get("prompt_tokens", 0),
+                                      completion_tokens=usage.get("completion_tokens", 0))
+                    else:
+                        server._count(images=1)
+                if status == 200 and endpoint == "chat/completions" and body.get("stream"):
+                    self._send_stream(payload)
+                else:
+                    self._send_json(status, payload, headers)
+
+        return Handler
+
+
+def main():
+    """Run the stand-in server in the foreground"""
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible stand-in server for aireadme")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="0", help='e.g. "0.2", "uniform:0.1,0.5", "lognormal:-1.5,0.5"')
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests failing with 429")
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--mode", choices=[MODE_SYNTHETIC, MODE_RECORD, MODE_REPLAY], default=MODE_SYNTHETIC)
+    parser.add_argument("--cassette", help="JSONL cassette for record/replay")
+    parser.add_argument("--upstream-url", help="real API base URL for record mode")
+    parser.add_argument("--upstream-api-key", help="defaults to the caller's Authorization header")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = StandInServer(
+        host=args.host, port=args.port, latency=args.latency, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        answer_tokens=args.answer_tokens, mode=args.mode, cassette=args.cassette,
+        upstream_url=args.upstream_url, upstream_api_key=args.upstream_api_key, seed=args.seed,
+    )
+    print(f"Stand-in API listening on {server.base_url} ({args.mode} mode)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
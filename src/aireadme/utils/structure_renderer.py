@@ -0,0 +1,128 @@
+import os
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, TextIO
+from aireadme.utils.file_index import FileIndex, KIND_DIR
+
+
+def write_structure(index: FileIndex, fp: TextIO) -> int:
+    """
+    Stream the full project tree to a file, one line at a time
+
+    Args:
+        index: Scanned project
+        fp: Text file opened for writing
+
+    Returns:
+        Number of lines written
+    """
+    count = 0
+    for line in index.iter_structure_lines():
+        if count:
+            fp.write("\n")
+        fp.write(line)
+        count += 1
+    return count
+
+
+def _extension(name: str) -> str:
+    ext = os.path.splitext(name)[1]
+    return ext if ext else "no ext"
+
+
+def count_extensions_by_directory(index: FileIndex) -> Dict[str, Counter]:
+    """
+    Count files per extension in every directory subtree
+
+    Returns:
+        Mapping of directory path ("" for the root) to a Counter of file extensions
+    """
+    totals: Dict[str, Counter] = defaultdict(Counter)
+    for r in index.files():
+        ext = _extension(r.name)
+        parent = os.path.dirname(r.path)
+        while True:
+            totals[parent][ext] += 1
+            if not parent:
+                break
+            parent = os.path.dirname(parent)
+    return totals
+
+
+def format_summary(counts: Counter, top: int = 3) -> str:
+    """Format a Counter of extensions as '1,284 files: 1,200 .py, 84 .json'."""
+    total = sum(counts.values())
+    if not total:
+        return "empty"
+    parts = [f"{n:,} {ext}" for ext, n in counts.most_common(top)]
+    rest = total - sum(n for _, n in counts.most_common(top))
+    if rest:
+        parts.append(f"{rest:,} other")
+    return f"{total:,} file{'s' if total != 1 else ''}: {', '.join(parts)}"
+
+
+def iter_prompt_view(index: FileIndex, max_depth: int = 4, max_entries: int = 25,
+                     max_lines: int = 300) -> Iterator[str]:
+    """
+    Yield a bounded view of the tree for use in LLM prompts
+
+    Directories deeper than max_depth are collapsed into one summary line such as
+    "tests/ (1,284 files: 1,200 .py, 84 .json)". Each directory shows at most
+    max_entries direct children, and the whole view stops after max_lines lines.
+
+    Args:
+        index: Scanned project
+        max_depth: Number of directory levels to expand
+        max_entries: Maximum direct children shown per directory
+        max_lines: Maximum total lines, including the root line
+    """
+    totals = count_extensions_by_directory(index)
+    children = Counter(os.path.dirname(r.path) for r in index)
+    shown = Counter()
+    skip_prefix = None
+    emitted = 1
+    omitted = 0
+
+    yield f"{os.path.basename(index.root)}/"
+    for r in index:
+        if skip_prefix is not None and r.path.startswith(skip_prefix):
+            continue
+        skip_prefix = None
+
+        parent = os.path.dirname(r.path)
+        if shown[parent] >= max_entries:
+            if shown[parent] == max_entries:
+                remaining = children[parent] - max_entries
+                yield f"{'    ' * r.depth}└── ... {remaining:,} more entries"
+                emitted += 1
+                shown[parent] += 1
+            if r.kind == KIND_DIR:
+                skip_prefix = r.path + os.sep
+            continue
+
+        if emitted >= max_lines:
+            omitted += 1
+            if r.kind == KIND_DIR:
+                skip_prefix = r.path + os.sep
+                omitted += sum(totals[r.path].values())
+            continue
+
+        shown[parent] += 1
+        emitted += 1
+        indent = "    " * r.depth
+        if r.kind == KIND_DIR:
+            if r.depth + 1 >= max_depth:
+                yield f"{indent}├── {r.name}/ ({format_summary(totals[r.path])})"
+                skip_prefix = r.path + os.sep
+            else:
+                yield f"{indent}├── {r.name}/"
+        else:
+            yield f"{indent}├── {r.name}"
+
+    if omitted:
+        yield f"... (truncated, {omitted:,} more entries)"
+
+
+def render_prompt_view(index: FileIndex, max_depth: int = 4, max_entries: int = 25,
+                       max_lines: int = 300) -> str:
+    """Render iter_prompt_view as a single string."""
+    return "\n".join(iter_prompt_view(index, max_depth, max_entries, max_lines))
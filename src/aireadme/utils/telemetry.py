@@ -0,0 +1,266 @@
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+from aireadme.utils.rate_limiter import estimate_tokens
+
+# USD per 1M prompt/completion tokens, matched by longest model-name prefix
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+# USD per image; dall-e-3 at hd 1024x1024, the quality aireadme requests
+IMAGE_PRICES = {
+    "dall-e-3": 0.08,
+    "dall-e-2": 0.02,
+}
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current_stage = contextvars.ContextVar("aireadme_stage", default=None)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linearly interpolated percentile, q in [0, 1]; 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _count(value) -> Optional[int]:
+    # Usage fields may be missing (or mocks); only plain numbers are trusted
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _lookup(table: dict, model: str):
+    matches = [name for name in table if model.startswith(name)]
+    return table[max(matches, key=len)] if matches else None
+
+
+class CallStats:
+    """What happened while serving one model call, filled in by ModelClient."""
+
+    __slots__ = ("queue_wait", "retries", "prompt_tokens", "completion_tokens", "sent", "cache", "endpoint")
+
+    def __init__(self, cache: str = "off"):
+        self.queue_wait = 0.0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.sent = False
+        self.cache = cache
+        self.endpoint = None
+
+    def add_usage(self, usage, prompt: str = "", answer: str = ""):
+        """Add token usage from a response, estimating whatever the provider did not report."""
+        prompt_tokens = _count(getattr(usage, "prompt_tokens", None))
+        completion_tokens = _count(getattr(usage, "completion_tokens", None))
+        self.prompt_tokens += prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt)
+        self.completion_tokens += completion_tokens if completion_tokens is not None else (
+            estimate_tokens(answer) if answer else 0
+        )
+
+
+class Telemetry:
+    """
+    Per-call metrics for model requests, aggregated per pipeline stage
+
+    ModelClient records every answer, stream and image call with its latency,
+    time spent waiting for admission, token usage, retries and cache status.
+    The stage is taken from the innermost stage() block: a context variable,
+    so it follows asyncio tasks, with the most recently entered stage that is
+    still running as the fallback for worker threads.
+    """
+
+    def __init__(self, input_price: Optional[float] = None, output_price: Optional[float] = None,
+                 image_price: Optional[float] = None):
+        """
+        Initialize telemetry
+
+        Args:
+            input_price: USD per 1M prompt tokens for every model, overriding MODEL_PRICES
+            output_price: USD per 1M completion tokens for every model, overriding MODEL_PRICES
+            image_price: USD per generated image, overriding IMAGE_PRICES
+        """
+        self.input_price = input_price
+        self.output_price = output_price
+        self.image_price = image_price
+        self.calls: List[dict] = []
+        self.stage_seconds: Dict[str, float] = {}
+        self._active: List[str] = []  # Stages currently running, in the order they were entered
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Attribute calls made inside the block to a pipeline stage and time the stage
+
+        ModelClient also takes the model, max_tokens and temperature of its
+        calls from the stage (see ModelClient.stage_settings).
+        """
+        token = _current_stage.set(name)
+        start = time.perf_counter()
+        with self._lock:
+            self._active.append(name)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + time.perf_counter() - start
+                # Stages may run concurrently (see StageGraph), so they need not end in reverse order
+                self._active.remove(name)
+            _current_stage.reset(token)
+
+    def current_stage(self) -> str:
+        stage = _current_stage.get()
+        if stage:
+            return stage
+        with self._lock:
+            return self._active[-1] if self._active else "other"
+
+    def cost(self, kind: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> float:
+        """Estimated USD cost of one call; 0 for unknown models without a configured price."""
+        if kind == "image":
+            price = self.image_price if self.image_price is not None else _lookup(IMAGE_PRICES, model)
+            return price or 0.0
+        input_price, output_price = _lookup(MODEL_PRICES, model) or (0.0, 0.0)
+        if self.input_price is not None:
+            input_price = self.input_price
+        if self.output_price is not None:
+            output_price = self.output_price
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+    def record(self, kind: str, model: str, started: float, call: Optional[CallStats] = None,
+               ok: bool = True, cache: Optional[str] = None):
+        """
+        Record a finished call
+
+        Args:
+            kind: "chat", "stream" or "image"
+            model: Model name
+            started: time.perf_counter() when the call began
+            call: Queue wait, retries and tokens of the call, if it reached the API
+            ok: Whether the call succeeded
+            cache: Cache status, overriding the one on call ("hit", "miss", "off", "coalesced")
+        """
+        call = call or CallStats()
+        entry = {
+            "stage": self.current_stage(),
+            "kind": kind,
+            "model": model,
+            "latency": round(time.perf_counter() - started, 6),
+            "queue_wait": round(call.queue_wait, 6),
+            "prompt_tokens": call.prompt_tokens,
+            "completion_tokens": call.completion_tokens,
+            "retries": call.retries,
+            "cache": cache or call.cache,
+            "endpoint": call.endpoint,
+            "ok": ok,
+        }
+        # Cache hits and coalesced callers did not send anything themselves
+        entry["cost_usd"] = round(
+            self.cost(kind, model, call.prompt_tokens, call.completion_tokens), 8
+        ) if call.sent else 0.0
+        with self._lock:
+            self.calls.append(entry)
+
+    @staticmethod
+    def _aggregate(calls: List[dict], seconds: Optional[float] = None) -> dict:
+        latencies = [c["latency"] for c in calls]
+        waits = [c["queue_wait"] for c in calls]
+        result = {
+            "calls": len(calls),
+            "errors": sum(1 for c in calls if not c["ok"]),
+            "retries": sum(c["retries"] for c in calls),
+            "cache_hits": sum(1 for c in calls if c["cache"] == "hit"),
+            "coalesced": sum(1 for c in calls if c["cache"] == "coalesced"),
+            "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+            "completion_tokens": sum(c["completion_tokens"] for c in calls),
+            "cost_usd": round(sum(c["cost_usd"] for c in calls), 6),
+            "latency": {f"p{int(q * 100)}": round(percentile(latencies, q), 4) for q in QUANTILES},
+            "queue_wait": {f"p{int(q * 100)}": round(percentile(waits, q), 4) for q in QUANTILES},
+        }
+        result["latency"]["max"] = round(max(latencies), 4) if latencies else 0.0
+        if seconds is not None:
+            result["stage_seconds"] = round(seconds, 3)
+        return result
+
+    def summary(self) -> dict:
+        """Aggregates per stage (in the order stages were first seen) and for the whole run."""
+        with self._lock:
+            calls = list(self.calls)
+            stage_seconds = dict(self.stage_seconds)
+        stages = list(stage_seconds)
+        stages += [c["stage"] for c in calls if c["stage"] not in stages]
+        stages = list(dict.fromkeys(stages))
+        return {
+            "stages": {
+                name: self._aggregate([c for c in calls if c["stage"] == name], stage_seconds.get(name))
+                for name in stages
+            },
+            "total": self._aggregate(calls),
+        }
+
+    def write_json(self, path: str, extra: Optional[dict] = None):
+        """Write the summary, any extra sections and every call record to a JSON file."""
+        payload = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), **self.summary(), **(extra or {})}
+        with self._lock:
+            payload["calls"] = list(self.calls)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+
+    def prometheus_text(self) -> str:
+        """The summary in Prometheus text exposition format."""
+        summary = self.summary()["stages"]
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP aireadme_{name} {help_text}")
+            lines.append(f"# TYPE aireadme_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"aireadme_{name}{{{label_text}}} {value}")
+
+        metric("model_calls_total", "counter", "Model API calls", [
+            ({"stage": s}, v["calls"]) for s, v in summary.items()])
+        metric("model_errors_total", "counter", "Model API calls that failed", [
+            ({"stage": s}, v["errors"]) for s, v in summary.items()])
+        metric("model_retries_total", "counter", "Retried model API attempts", [
+            ({"stage": s}, v["retries"]) for s, v in summary.items()])
+        metric("model_cache_hits_total", "counter", "Answers served from the response cache", [
+            ({"stage": s}, v["cache_hits"]) for s, v in summary.items()])
+        metric("model_tokens_total", "counter", "Tokens used", [
+            ({"stage": s, "type": t}, v[f"{t}_tokens"]) for s, v in summary.items() for t in ("prompt", "completion")])
+        metric("model_cost_usd_total", "counter", "Estimated cost in USD", [
+            ({"stage": s}, v["cost_usd"]) for s, v in summary.items()])
+        metric("model_latency_seconds", "summary", "Model call latency", [
+            ({"stage": s, "quantile": str(q)}, v["latency"][f"p{int(q * 100)}"])
+            for s, v in summary.items() for q in QUANTILES])
+        metric("stage_duration_seconds", "gauge", "Wall-clock time per pipeline stage", [
+            ({"stage": s}, v["stage_seconds"]) for s, v in summary.items() if "stage_seconds" in v])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write the textfile-collector export atomically, so a scrape never sees half a file."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".metrics.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
@@ -0,0 +1,64 @@
+# tests/test_async_pipeline.py
+# 测试基于 asyncio 的描述生成流水线与异步 ModelClient
+
+import pytest
+import os
+import json
+import asyncio
+import tempfile
+from unittest.mock import AsyncMock, MagicMock
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.model_client import ModelClient
+
+
+class TestAsyncPipeline:
+    """测试异步描述生成"""
+
+    def test_async_descriptions_respect_concurrency(self, monkeypatch):
+        """异步流水线应处理全部文件，且并发数不超过上限"""
+        monkeypatch.setenv("LLM_BATCH", "0")  # 逐文件请求，不打包小文件
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(60):
+                with open(os.path.join(temp_dir, f"mod_{i}.py"), "w") as f:
+                    f.write(f"VALUE = {i}\n")
+
+            craft = aireadme(project_dir=temp_dir)
+            state = {"in_flight": 0, "peak": 0}
+
+            async def mock_get_answer_async(prompt):
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+                await asyncio.sleep(0.05)
+                state["in_flight"] -= 1
+                return "async description"
+
+            craft.model_client.get_answer_async = mock_get_answer_async
+
+            result = json.loads(craft._generate_script_descriptions(use_async=True, max_concurrency=20))
+
+            assert len(result) == 60
+            assert set(result.values()) == {"async description"}
+            assert 1 < state["peak"] <= 20
+
+    def test_get_answer_async(self):
+        client = ModelClient()
+        response = MagicMock()
+        response.choices[0].message.content = "hello"
+        client.async_llm_client = MagicMock()
+        client.async_llm_client.chat.completions.create = AsyncMock(return_value=response)
+
+        assert asyncio.run(client.get_answer_async("hi")) == "hello"
+
+        client.async_llm_client.chat.completions.create = AsyncMock(side_effect=RuntimeError("down"))
+        with pytest.raises(Exception) as exc_info:
+            asyncio.run(client.get_answer_async("hi"))
+        assert type(exc_info.value).__name__ == "PermanentModelError"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
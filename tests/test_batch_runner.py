@@ -0,0 +1,133 @@
+# tests/test_batch_runner.py
+# 测试无交互批量模式：清单解析、全局并发预算拆分、无提示生成，以及多进程并行处理多个仓库
+
+import pytest
+import os
+import json
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils import cli
+from src.aireadme.utils.batch_runner import load_manifest, worker_budget, run_batch, print_summary
+from src.aireadme.utils.stand_in_server import StandInServer
+from rich.console import Console
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """替身服务器，批量运行的所有工作进程共用"""
+    with StandInServer() as stand_in:
+        monkeypatch.setenv("LLM_BASE_URL", stand_in.base_url)
+        monkeypatch.setenv("LLM_API_KEY", "stand-in")
+        monkeypatch.setenv("LLM_CACHE", "0")
+        monkeypatch.setenv("README_STREAM_ECHO", "0")
+        monkeypatch.setenv("GENERATE_LOGO", "0")
+        yield stand_in
+
+
+def _make_repo(parent, name, files=2):
+    """创建一个包含几个脚本的小项目"""
+    repo = os.path.join(parent, name)
+    os.makedirs(repo)
+    for i in range(files):
+        with open(os.path.join(repo, f"mod_{i}.py"), "w", encoding="utf-8") as f:
+            f.write(f"import os\n\ndef f{i}():\n    return {i}\n")
+    return repo
+
+
+class TestManifest:
+    """测试清单解析与预算拆分"""
+
+    def test_json_lines_and_list(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "repos.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"project_dir": "a", "output_dir": "out/a", "repo_name": "alpha",
+                                    "metadata": {"email": "a@example.com"}}) + "\n\n")
+                f.write(json.dumps({"project_dir": "/abs/b", "logo": False}) + "\n")
+            entries = load_manifest(path)
+            assert entries[0] == {
+                "project_dir": os.path.join(temp_dir, "a"), "output_dir": os.path.join(temp_dir, "out/a"),
+                "logo": None, "since": None, "resume": False, "metadata": {"email": "a@example.com", "repo_name": "alpha"},
+            }
+            assert entries[1]["project_dir"] == "/abs/b" and entries[1]["logo"] is False
+
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(["a", {"output_dir": "x"}], f)
+            with pytest.raises(ValueError):
+                load_manifest(path)
+
+    def test_worker_budget(self, monkeypatch):
+        monkeypatch.setenv("LLM_MAX_CONCURRENCY", "64")
+        monkeypatch.setenv("LLM_RPM", "600")
+        monkeypatch.delenv("LLM_TPM", raising=False)
+        assert worker_budget(4) == {"LLM_MAX_CONCURRENCY": "16", "LLM_RPM": "150.0"}
+        assert worker_budget(100)["LLM_MAX_CONCURRENCY"] == "1"
+
+
+class TestHeadless:
+    """测试无提示生成与批量运行"""
+
+    def test_headless_generate(self, server):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = _make_repo(temp_dir, "demo")
+            os.makedirs(os.path.join(repo, ".git"))
+            with open(os.path.join(repo, ".git", "config"), "w", encoding="utf-8") as f:
+                f.write('[remote "origin"]\n\turl = git@github.com:octo/demo.git\n')
+            output_dir = os.path.join(temp_dir, "out")
+
+            craft = aireadme(project_dir=repo, output_dir=output_dir, interactive=False,
+                             metadata={"project_description": "A demo"})
+            craft.generate()
+            assert os.path.exists(os.path.join(output_dir, "README.md"))
+            assert craft.config["github_username"] == "octo" and craft.config["repo_name"] == "demo"
+            assert craft.config["project_description"] == "A demo"
+            assert craft.config["email"] == "your.email@example.com"
+
+            with pytest.raises(ValueError):
+                aireadme(project_dir=repo, interactive=False, metadata={"unknown": "x"})
+
+    def test_batch_in_worker_processes(self, server):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            entries = [
+                {"project_dir": _make_repo(temp_dir, f"repo_{i}"), "output_dir": os.path.join(temp_dir, f"out_{i}"),
+                 "logo": None, "metadata": {"repo_name": f"repo_{i}"}}
+                for i in range(3)
+            ]
+            entries.append({"project_dir": os.path.join(temp_dir, "missing"), "output_dir": None,
+                            "logo": None, "metadata": {}})
+
+            console = Console(file=open(os.devnull, "w"))
+            results = run_batch(entries, workers=2, console=console)
+            print_summary(results, console)
+
+            assert [r["status"] for r in results] == ["ok", "ok", "ok", "failed"]
+            assert "FileNotFoundError" in results[3]["error"]
+            for i, result in enumerate(results[:3]):
+                assert os.path.exists(os.path.join(temp_dir, f"out_{i}", "README.md"))
+                assert os.path.exists(os.path.join(temp_dir, f"out_{i}", "aireadme.log"))
+                assert result["calls"] >= 2 and result["prompt_tokens"] > 0
+            assert sum(r["calls"] for r in results) == server.stats()["chat_completions"]
+
+    def test_cli_manifest(self, server, monkeypatch):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _make_repo(temp_dir, "only", files=1)
+            manifest = os.path.join(temp_dir, "repos.json")
+            with open(manifest, "w", encoding="utf-8") as f:
+                json.dump([{"project_dir": "only", "output_dir": "out"}], f)
+            summary_path = os.path.join(temp_dir, "summary.json")
+            monkeypatch.setattr(sys, "argv", ["aireadme", "--manifest", manifest, "--workers", "1",
+                                              "--summary-file", summary_path])
+            with pytest.raises(SystemExit) as exit_info:
+                cli.main()
+            assert exit_info.value.code == 0
+            with open(summary_path, "r", encoding="utf-8") as f:
+                assert json.load(f)[0]["status"] == "ok"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
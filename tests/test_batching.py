@@ -0,0 +1,124 @@
+# tests/test_batching.py
+# 测试小文件打包为单次 LLM 请求，以及解析失败时回退到逐文件请求
+
+import pytest
+import os
+import json
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.file_index import FileRecord, KIND_FILE
+from src.aireadme.utils.batching import pack_small_files, parse_batch_response
+
+
+def _answer_for(prompt):
+    """为批量提示词中的每个文件返回 JSON 描述"""
+    paths = [line[len("=== FILE: "):-len(" ===")] for line in prompt.splitlines() if line.startswith("=== FILE: ")]
+    return json.dumps({path: f"batched {path}" for path in paths})
+
+
+class TestBatching:
+    """测试 batching 模块"""
+
+    def test_pack_small_files(self):
+        records = [FileRecord(f"s{i}.py", 400, 0.0, KIND_FILE) for i in range(10)]
+        records.append(FileRecord("big.py", 100000, 0.0, KIND_FILE))
+        jobs = pack_small_files(records, max_tokens=500, max_files=4, small_file_bytes=4096)
+
+        assert jobs[0][0].path == "big.py"
+        assert sorted(r.path for job in jobs for r in job) == sorted(r.path for r in records)
+        assert all(len(job) <= 4 for job in jobs)
+        assert len(jobs) == 1 + 3  # 每个文件约 120 tokens，500 上限下每批 4 个
+        assert pack_small_files(records, 500, 1, 4096) == [[r] for r in records]
+
+    def test_pack_scales_to_large_projects(self):
+        records = [FileRecord(f"m{i}.py", 100 + (i * 7919) % 4000, 0.0, KIND_FILE) for i in range(100000)]
+        start = time.perf_counter()
+        jobs = pack_small_files(records, max_tokens=6000, max_files=16, small_file_bytes=4096)
+        assert time.perf_counter() - start < 5
+        assert sum(len(job) for job in jobs) == len(records)
+        assert all(len(job) <= 16 and sum(r.size // 4 + 20 for r in job) <= 6000 for job in jobs)
+
+    def test_parse_batch_response(self):
+        text = '```json\n{"a.py": "desc a", "b.py": "", "x.py": "unexpected"}\n```'
+        assert parse_batch_response(text, ["a.py", "b.py"]) == {"a.py": "desc a"}
+        assert parse_batch_response("Sure! {\"a.py\": \"ok\"} Done.", ["a.py"]) == {"a.py": "ok"}
+        assert parse_batch_response("not json", ["a.py"]) == {}
+        assert parse_batch_response("[1, 2]", ["a.py"]) == {}
+        assert parse_batch_response(None, ["a.py"]) == {}
+
+
+class TestBatchedPipeline:
+    """测试描述生成流水线中的批量请求"""
+
+    def _project(self, temp_dir, count=20):
+        for i in range(count):
+            with open(os.path.join(temp_dir, f"mod_{i}.py"), "w") as f:
+                f.write(f"VALUE = {i}\n")
+
+    def test_small_files_share_requests(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._project(temp_dir)
+            craft = aireadme(project_dir=temp_dir)
+            calls = []
+
+            def mock_get_answer(prompt, max_tokens=None):
+                calls.append(max_tokens)
+                return _answer_for(prompt)
+
+            craft.model_client.get_answer = mock_get_answer
+            result = json.loads(craft._generate_script_descriptions(max_workers=4, use_async=False))
+
+            assert result == {f"mod_{i}.py": f"batched mod_{i}.py" for i in range(20)}
+            assert len(calls) == 2  # 每批最多 16 个文件
+            assert all(tokens >= 200 for tokens in calls)
+
+    def test_fallback_to_single_requests(self):
+        """批量回答缺失或无法解析时，缺失的文件逐个请求"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._project(temp_dir, count=5)
+            craft = aireadme(project_dir=temp_dir)
+            prompts = []
+
+            def mock_get_answer(prompt, max_tokens=None):
+                prompts.append(prompt)
+                if "=== FILE:" in prompt:
+                    answer = json.loads(_answer_for(prompt))
+                    answer.pop("mod_3.py")
+                    return json.dumps(answer)
+                return "single description"
+
+            craft.model_client.get_answer = mock_get_answer
+            result = json.loads(craft._generate_script_descriptions(max_workers=2, use_async=False))
+
+            assert result["mod_3.py"] == "single description"
+            assert result["mod_0.py"] == "batched mod_0.py"
+            assert len(prompts) == 2
+
+    def test_async_unparseable_answer(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._project(temp_dir, count=6)
+            craft = aireadme(project_dir=temp_dir)
+            prompts = []
+
+            async def mock_get_answer_async(prompt, max_tokens=None):
+                prompts.append(prompt)
+                await asyncio.sleep(0)
+                return "I cannot produce JSON" if "=== FILE:" in prompt else "single description"
+
+            craft.model_client.get_answer_async = mock_get_answer_async
+            result = json.loads(craft._generate_script_descriptions(use_async=True, max_concurrency=4))
+
+            assert set(result.values()) == {"single description"}
+            assert len(result) == 6
+            assert len(prompts) == 7
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,146 @@
+# tests/test_checkpoint.py
+# 测试描述检查点：逐行追加、容忍崩溃时写坏的最后一行、--resume 只处理缺失的文件，以及中断时停止调度并保留已完成的描述
+
+import pytest
+import os
+import json
+import tempfile
+import threading
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.checkpoint import Checkpoint, CHECKPOINT_FILENAME
+from src.aireadme.utils.description_store import DESCRIPTION_STORE_FILENAME
+from src.aireadme.utils.file_index import FileRecord
+from src.aireadme.utils import stage_graph
+from src.aireadme.utils.stage_graph import StageGraph
+from src.aireadme.utils.stand_in_server import StandInServer
+
+
+class TestCheckpoint:
+    """测试 Checkpoint 文件本身"""
+
+    def test_append_and_resume(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, CHECKPOINT_FILENAME)
+            checkpoint = Checkpoint(path)
+            checkpoint.append(FileRecord("a.py", 10, 1.5, "file"), "Module a.")
+            checkpoint.append(FileRecord("b.py", 20, 2.5, "file"), "Module b.")
+            # 每行写入后立即落盘，不必等到关闭
+            assert set(Checkpoint.load(path)) == {"a.py", "b.py"}
+            checkpoint.close()
+            # 模拟崩溃时写了一半的最后一行
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('{"path": "c.py", "desc')
+
+            checkpoint = Checkpoint(path, resume=True)
+            assert checkpoint.get(FileRecord("a.py", 10, 1.5, "file")) == "Module a."
+            # 文件大小或修改时间变化后不再信任旧描述
+            assert checkpoint.get(FileRecord("b.py", 21, 2.5, "file")) is None
+            assert checkpoint.get(FileRecord("c.py", 1, 1.0, "file")) is None
+            checkpoint.close()
+            with open(path, "r", encoding="utf-8") as f:
+                assert [json.loads(line)["path"] for line in f] == ["a.py", "b.py"]
+
+            # 不带 --resume 的新运行不会覆盖上次中断留下的检查点，而是将其移到一旁
+            checkpoint = Checkpoint(path)
+            assert Checkpoint.load(path) == {}
+            assert set(Checkpoint.load(checkpoint.previous_path)) == {"a.py", "b.py"}
+            checkpoint.remove()
+            assert not os.path.exists(path)
+
+    def test_interrupted_compaction_keeps_checkpoint(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, CHECKPOINT_FILENAME)
+            checkpoint = Checkpoint(path)
+            checkpoint.append(FileRecord("a.py", 10, 1.5, "file"), "Module a.")
+            checkpoint.close()
+
+            def interrupted_replace(*args):
+                raise KeyboardInterrupt
+            monkeypatch.setattr(os, "replace", interrupted_replace)
+            with pytest.raises(KeyboardInterrupt):
+                Checkpoint(path, resume=True)
+            monkeypatch.undo()
+            # 原检查点完好，临时文件已清理
+            assert set(Checkpoint.load(path)) == {"a.py"}
+            assert os.listdir(temp_dir) == [CHECKPOINT_FILENAME]
+
+    def test_stage_graph_sets_cancelled(self, monkeypatch):
+        graph = StageGraph()
+        started = threading.Event()
+        stopped = []
+
+        def long_stage():
+            started.set()
+            assert graph.cancelled.wait(5)
+            stopped.append(True)
+
+        def interrupted_wait(*args, **kwargs):
+            # 主线程在等待阶段完成时收到 Ctrl-C
+            started.wait(5)
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(stage_graph, "wait", interrupted_wait)
+        graph.add("long", long_stage)
+        with pytest.raises(KeyboardInterrupt):
+            graph.run()
+        # 运行中的阶段收到通知并在 run() 返回前结束
+        assert graph.cancelled.is_set() and stopped == [True]
+
+
+class TestResume:
+    """通过替身服务器测试中断与恢复"""
+
+    @pytest.mark.parametrize("use_async", [False, True])
+    def test_cancel_then_resume(self, monkeypatch, use_async):
+        with StandInServer() as server, tempfile.TemporaryDirectory() as project_dir, \
+                tempfile.TemporaryDirectory() as output_dir:
+            monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+            monkeypatch.setenv("LLM_API_KEY", "stand-in")
+            monkeypatch.setenv("LLM_CACHE", "0")
+            monkeypatch.setenv("LLM_BATCH", "0")
+            for i in range(5):
+                with open(os.path.join(project_dir, f"m{i}.py"), "w", encoding="utf-8") as f:
+                    f.write(f"# module {i}\nimport os\n")
+
+            craft = aireadme(project_dir=project_dir, output_dir=output_dir, interactive=False, logo=False)
+            # 第一个文件完成时模拟 Ctrl-C
+            describe = craft._describe_file_async if use_async else craft._describe_file
+            if use_async:
+                async def describe_then_cancel(*args, **kwargs):
+                    result = await describe(*args, **kwargs)
+                    craft.cancelled.set()
+                    return result
+            else:
+                def describe_then_cancel(*args, **kwargs):
+                    result = describe(*args, **kwargs)
+                    craft.cancelled.set()
+                    return result
+            setattr(craft, "_describe_file_async" if use_async else "_describe_file", describe_then_cancel)
+            with pytest.raises(Exception) as exc_info:
+                craft._generate_script_descriptions(max_workers=1, use_async=use_async, max_concurrency=1)
+            assert type(exc_info.value).__name__ == "StageCancelled"
+
+            # 排队的文件没有开始，已完成的描述留在检查点中
+            checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILENAME)
+            assert len(Checkpoint.load(checkpoint_path)) == 1
+            assert server.stats()["chat_completions"] == 1
+
+            # 去掉描述索引，确保复用来自检查点
+            os.remove(os.path.join(output_dir, DESCRIPTION_STORE_FILENAME))
+            craft = aireadme(project_dir=project_dir, output_dir=output_dir, interactive=False, logo=False,
+                             resume=True)
+            descriptions = json.loads(craft._generate_script_descriptions(use_async=use_async))
+            assert sorted(descriptions) == [f"m{i}.py" for i in range(5)]
+            assert server.stats()["chat_completions"] == 5
+            assert len(craft.described_files) == 4
+            # 成功完成后检查点被删除
+            assert not os.path.exists(checkpoint_path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,112 @@
+# tests/test_chunking.py
+# 测试按函数/类边界切分大文件，以及 map-reduce 摘要流程
+
+import pytest
+import os
+import json
+import asyncio
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.chunking import split_into_chunks, group_by_budget
+
+
+def _module_source(functions=20, body_lines=30):
+    parts = ["import os\n\n"]
+    for i in range(functions):
+        parts.append(f"@decorator\ndef func_{i}(x):\n" + "    x = x + 1\n" * body_lines + "    return x\n\n")
+    return "".join(parts)
+
+
+class TestChunking:
+    """测试 chunking 模块"""
+
+    def test_splits_on_definitions(self):
+        source = _module_source()
+        chunks = split_into_chunks(source, 300)
+
+        assert len(chunks) > 1
+        assert "".join(c.text for c in chunks) == source
+        for chunk in chunks[1:]:
+            # 装饰器与函数保持在同一块中
+            assert chunk.text.startswith("@decorator\ndef func_")
+        assert all(c.tokens <= 300 for c in chunks)
+        assert chunks[0].start_line == 1
+        assert chunks[-1].end_line == source.count("\n")
+
+    def test_class_methods_and_flat_code(self):
+        source = "class Big:\n" + "".join(
+            f"    def method_{i}(self):\n" + "        pass\n" * 60 for i in range(6)
+        )
+        chunks = split_into_chunks(source, 300)
+        assert chunks[0].text.startswith("class Big:\n    def method_0")
+        assert all(c.text.lstrip().startswith("def method_") for c in chunks[1:])
+
+        flat = "x = 1\n" * 1000
+        assert "".join(c.text for c in split_into_chunks(flat, 100)) == flat
+        assert len(split_into_chunks("y" * 10000, 100)) > 1
+        assert split_into_chunks("", 100) == []
+
+    def test_group_by_budget(self):
+        groups = group_by_budget(["a" * 40, "b" * 40, "c" * 40], 25)
+        assert [len(g) for g in groups] == [2, 1]
+
+
+class TestMapReduce:
+    """测试大文件的 map-reduce 描述生成"""
+
+    def _project(self, temp_dir):
+        with open(os.path.join(temp_dir, "big.py"), "w") as f:
+            f.write(_module_source(functions=40))
+        with open(os.path.join(temp_dir, "small.py"), "w") as f:
+            f.write("print('hi')\n")
+
+    def test_sync_pipeline(self, monkeypatch):
+        monkeypatch.setenv("FILE_MAX_BYTES", "2000")
+        monkeypatch.setenv("CHUNK_MAX_TOKENS", "400")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._project(temp_dir)
+            craft = aireadme(project_dir=temp_dir)
+            prompts = []
+
+            def mock_get_answer(prompt):
+                prompts.append(prompt)
+                if prompt.startswith("The following are summaries"):
+                    return "merged summary"
+                if prompt.startswith("The following is part"):
+                    return "part summary " + "z" * 200
+                return "whole file summary"
+
+            craft.model_client.get_answer = mock_get_answer
+            result = json.loads(craft._generate_script_descriptions(max_workers=2, use_async=False))
+
+            assert result == {"big.py": "merged summary", "small.py": "whole file summary"}
+            map_prompts = [p for p in prompts if p.startswith("The following is part")]
+            assert len(map_prompts) > 5
+            assert all("of the file big.py" in p for p in map_prompts)
+
+    def test_async_pipeline(self, monkeypatch):
+        monkeypatch.setenv("FILE_MAX_BYTES", "2000")
+        monkeypatch.setenv("CHUNK_MAX_TOKENS", "400")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._project(temp_dir)
+            craft = aireadme(project_dir=temp_dir)
+
+            async def mock_get_answer_async(prompt):
+                await asyncio.sleep(0)
+                if prompt.startswith("The following are summaries"):
+                    return "merged summary"
+                return "summary"
+
+            craft.model_client.get_answer_async = mock_get_answer_async
+            result = json.loads(craft._generate_script_descriptions(use_async=True, max_concurrency=8))
+
+            assert result == {"big.py": "merged summary", "small.py": "summary"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
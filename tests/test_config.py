@@ -0,0 +1,37 @@
+# tests/test_config.py
+# 测试配置读取：每个配置函数都会先加载 source.env，不依赖其他配置函数的调用顺序
+
+import pytest
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme import config
+
+
+class TestConfig:
+    """测试 get_*_config 对 source.env 的加载"""
+
+    @pytest.mark.parametrize("getter, name, value, key, expected", [
+        (config.get_scan_config, "SCAN_WALKER", "parallel", "walker", "parallel"),
+        (config.get_structure_config, "STRUCTURE_MAX_DEPTH", "7", "max_depth", 7),
+        (config.get_batching_config, "BATCH_MAX_FILES", "3", "max_files", 3),
+        (config.get_retry_config, "LLM_FAILED_FILE_ROUNDS", "4", "failed_file_rounds", 4),
+    ])
+    def test_getter_loads_env_file(self, monkeypatch, getter, name, value, key, expected):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, config.ENV_FILE), "w", encoding="utf-8") as f:
+                f.write(f"{name}={value}\n")
+            # 测试结束后恢复为未设置，避免泄漏到其他测试
+            monkeypatch.setenv(name, "")
+            monkeypatch.delenv(name)
+            monkeypatch.setattr(config, "_env_loaded", False)
+            monkeypatch.chdir(temp_dir)
+            assert getter()[key] == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -19,8 +19,9 @@ from src.aireadme.core import aireadme
 class TestCoreThreading:
     """测试 aireadme 的多线程功能"""
 
-    def test_multithreaded_script_descriptions(self):
+    def test_multithreaded_script_descriptions(self, monkeypatch):
         """测试多线程脚本描述生成"""
+        monkeypatch.setenv("LLM_BATCH", "0")  # 逐文件请求，不打包小文件
         print("\n" + "=" * 60)
         print("🧵 测试: 多线程脚本描述生成")
         print("=" * 60)
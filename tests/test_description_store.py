@@ -0,0 +1,78 @@
+# tests/test_description_store.py
+# 测试持久化文件索引与增量重跑
+
+import pytest
+import os
+import json
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.description_store import DescriptionStore, hash_content
+
+
+class TestDescriptionStore:
+    """测试 DescriptionStore 与增量描述生成"""
+
+    def test_lookup_and_get(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = DescriptionStore(os.path.join(temp_dir, "index.sqlite3"))
+            store.put("a.py", 10, 1.5, hash_content(b"x"), "desc a")
+
+            assert store.lookup("a.py", 10, 1.5) == "desc a"
+            assert store.lookup("a.py", 11, 1.5) is None
+            assert store.get("a.py", hash_content(b"x")) == "desc a"
+            assert store.get("a.py", hash_content(b"y")) is None
+
+            assert store.prune(["b.py"]) == 1
+            assert store.count() == 0
+            store.close()
+
+    def test_rerun_only_describes_changed_files(self, monkeypatch):
+        """第二次运行只应为新增或修改过的文件调用模型"""
+        monkeypatch.setenv("LLM_BATCH", "0")  # 逐文件请求，不打包小文件
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_dir = os.path.join(temp_dir, "project")
+            output_dir = os.path.join(temp_dir, "out")
+            os.makedirs(project_dir)
+            os.makedirs(output_dir)
+            for name in ("a.py", "b.py", "c.py"):
+                with open(os.path.join(project_dir, name), "w") as f:
+                    f.write(f"# {name}\n")
+
+            prompts = []
+
+            def mock_get_answer(prompt):
+                prompts.append(prompt)
+                return f"description #{len(prompts)}"
+
+            craft = aireadme(project_dir=project_dir)
+            craft.output_dir = output_dir
+            craft.model_client.get_answer = mock_get_answer
+
+            first = json.loads(craft._generate_script_descriptions(max_workers=2))
+            assert len(prompts) == 3
+
+            # 修改一个文件，新增一个文件，再次运行
+            with open(os.path.join(project_dir, "b.py"), "w") as f:
+                f.write("# b.py changed\n")
+            with open(os.path.join(project_dir, "d.py"), "w") as f:
+                f.write("# d.py\n")
+
+            rerun = aireadme(project_dir=project_dir)
+            rerun.output_dir = output_dir
+            rerun.model_client.get_answer = mock_get_answer
+            second = json.loads(rerun._generate_script_descriptions(max_workers=2))
+
+            assert len(prompts) == 5
+            assert second["a.py"] == first["a.py"]
+            assert second["c.py"] == first["c.py"]
+            assert second["b.py"] != first["b.py"]
+            assert "d.py" in second
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,123 @@
+# tests/test_directory_summary.py
+# 测试目录级分层汇总：自底向上逐级并行汇总、单条目直通、超大目录分段合并，以及有界的项目概览
+
+import pytest
+import os
+import json
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.directory_summary import directory_levels, summarize_directories, render_overview
+from src.aireadme.utils.rate_limiter import estimate_tokens
+from src.aireadme.utils.stand_in_server import StandInServer
+
+DESCRIPTIONS = {
+    "main.py": "Entry point.",
+    "README.md": "Project readme.",
+    "pkg/core.py": "Core logic.",
+    "pkg/io.py": "Input and output helpers.",
+    "pkg/sub/deep.py": "A deeply nested helper.",
+    "docs/guide.md": "User guide.",
+}
+
+
+class FakeModel:
+    """按批记录提示词的假模型，返回可辨认的摘要"""
+
+    def __init__(self, fail=()):
+        self.batches = []
+        self.fail = fail
+
+    def answer_all(self, prompts):
+        self.batches.append(prompts)
+        return [None if any(f in p for f in self.fail) else f"summary {len(self.batches)}.{i}"
+                for i, p in enumerate(prompts)]
+
+
+class TestDirectorySummary:
+    """测试 summarize_directories 与 render_overview"""
+
+    def test_levels_are_bottom_up(self):
+        assert directory_levels(list(DESCRIPTIONS)) == [["pkg/sub"], ["docs", "pkg"], [""]]
+
+    def test_rollup(self):
+        model = FakeModel()
+        summaries = summarize_directories(DESCRIPTIONS, model.answer_all, group_tokens=1000)
+        # 只有一个条目的目录直接复用该条目，不发送请求
+        assert summaries["pkg/sub"] == "A deeply nested helper."
+        assert summaries["docs"] == "User guide."
+        # 每一层一批请求：pkg 一次，然后根目录一次
+        assert [len(batch) for batch in model.batches] == [1, 1]
+        assert "- sub/: A deeply nested helper." in model.batches[0][0]
+        assert "- pkg/: summary 1.0" in model.batches[1][0]
+        assert "- docs/: User guide." in model.batches[1][0]
+        assert summaries[""] == "summary 2.0"
+
+    def test_large_directory_in_parts(self):
+        descriptions = {f"lib/m{i}.py": "word " * 40 for i in range(6)}
+        descriptions["lib/other/x.py"] = "x"
+        model = FakeModel()
+        summaries = summarize_directories(descriptions, model.answer_all, group_tokens=120)
+        parts = model.batches[0]
+        assert len(parts) > 1 and all("(part " in p for p in parts)
+        assert len(model.batches[1]) == 1 and "consecutive parts of the directory lib/" in model.batches[1][0]
+        assert summaries["lib"] == "summary 2.0"
+
+    def test_failed_request_falls_back(self):
+        model = FakeModel(fail=["pkg/"])
+        summaries = summarize_directories(DESCRIPTIONS, model.answer_all, group_tokens=1000)
+        assert summaries["pkg"].startswith("core.py: Core logic.")
+
+    def test_overview_is_bounded(self):
+        summaries = {"": "Root."}
+        summaries.update({f"pkg{i}": "text " * 50 for i in range(40)})
+        overview = render_overview(summaries, 400, max_tokens=500)
+        assert estimate_tokens(overview) <= 520
+        assert overview.startswith("Project overview rolled up from the descriptions of 400 files")
+        assert "more directories omitted" in overview
+
+
+class TestGenerateOverview:
+    """通过替身服务器测试 generate() 中的概览阶段"""
+
+    def test_large_project_uses_overview(self, monkeypatch):
+        with StandInServer() as server, tempfile.TemporaryDirectory() as project_dir, \
+                tempfile.TemporaryDirectory() as output_dir:
+            monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+            monkeypatch.setenv("LLM_API_KEY", "stand-in")
+            monkeypatch.setenv("LLM_CACHE", "0")
+            monkeypatch.setenv("README_STREAM_ECHO", "0")
+            monkeypatch.setenv("OVERVIEW_THRESHOLD_TOKENS", "10")
+            for package in ("alpha", "beta"):
+                os.makedirs(os.path.join(project_dir, package))
+                for name in ("a.py", "b.py"):
+                    with open(os.path.join(project_dir, package, name), "w", encoding="utf-8") as f:
+                        f.write(f"# {package}/{name}\nimport os\n")
+
+            craft = aireadme(project_dir=project_dir, logo=False)
+            craft.output_dir = output_dir
+            craft._get_basic_info = lambda: None
+            craft._get_git_info = lambda: None
+            craft._get_user_info = lambda: None
+            craft.generate()
+
+            with open(os.path.join(output_dir, "directory_summaries.json"), "r", encoding="utf-8") as f:
+                summaries = json.load(f)
+            assert set(summaries) == {"", "alpha", "beta"}
+            stages = [c["stage"] for c in craft.model_client.telemetry.calls]
+            assert stages.count("overview") == 3  # alpha 与 beta 并行，然后根目录
+            assert stages.count("readme") == 1
+
+    def test_small_project_keeps_descriptions(self, monkeypatch):
+        monkeypatch.setenv("LLM_API_KEY", "stand-in")
+        craft = aireadme(project_dir=".", logo=False)
+        descriptions = json.dumps({"main.py": "Entry point."})
+        assert craft._generate_overview(descriptions) == descriptions
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
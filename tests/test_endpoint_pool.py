@@ -0,0 +1,123 @@
+# tests/test_endpoint_pool.py
+# 测试多端点负载均衡：路由策略、健康跟踪、出错或限流时的故障转移，以及吞吐随密钥数扩展
+
+import pytest
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.config import get_endpoint_config
+from src.aireadme.utils.endpoint_pool import Endpoint, EndpointPool
+from src.aireadme.utils.model_client import ModelClient
+from src.aireadme.utils.stand_in_server import StandInServer
+
+
+def _use_endpoints(monkeypatch, *servers):
+    """把替身服务器配置为端点池"""
+    monkeypatch.setenv("LLM_ENDPOINTS", ",".join(f"{s.base_url}|key-{i}" for i, s in enumerate(servers)))
+    monkeypatch.setenv("LLM_API_KEY", "stand-in")
+    monkeypatch.setenv("LLM_CACHE", "0")
+
+
+class TestEndpointPool:
+    """测试 EndpointPool 的路由与健康状态"""
+
+    def test_config_parsing(self, monkeypatch):
+        monkeypatch.setenv("LLM_API_KEY", "default-key")
+        monkeypatch.setenv("LLM_ENDPOINTS", "https://a.example/v1|key-a|2, https://b.example/v1\nhttps://c.example/v1||0")
+        endpoints = get_endpoint_config()["endpoints"]
+        assert endpoints == [
+            {"base_url": "https://a.example/v1", "api_key": "key-a", "weight": 2.0},
+            {"base_url": "https://b.example/v1", "api_key": "default-key", "weight": 1.0},
+            {"base_url": "https://c.example/v1", "api_key": "default-key", "weight": 0.0},
+        ]
+        monkeypatch.delenv("LLM_ENDPOINTS")
+        assert len(get_endpoint_config()["endpoints"]) == 1  # 未配置时退回单一 LLM_BASE_URL
+
+    def test_least_outstanding(self):
+        a, b = Endpoint("https://a/v1", "k"), Endpoint("https://b/v1", "k")
+        pool = EndpointPool([a, b])
+        with a.track():
+            assert pool.candidates()[0] is b
+        with b.track(), b.track():
+            assert pool.candidates()[0] is a
+        # 空闲时轮流选择
+        assert {pool.candidates()[0].name for _ in range(2)} == {"a", "b"}
+
+    def test_weighted(self):
+        a, b = Endpoint("https://a/v1", "k", weight=3), Endpoint("https://b/v1", "k", weight=1)
+        pool = EndpointPool([a, b], routing="weighted")
+        picks = [pool.candidates()[0].name for _ in range(8)]
+        assert picks.count("a") == 6 and picks.count("b") == 2
+
+    def test_unhealthy_and_standby(self):
+        a, b = Endpoint("https://a/v1", "k"), Endpoint("https://b/v1", "k")
+        standby = Endpoint("https://standby/v1", "k", weight=0)
+        pool = EndpointPool([a, b, standby])
+        a.record_failure(throttled=True, retry_after=60)
+        assert pool.candidates()[0] is b
+        assert not a.stats()["healthy"]
+        for _ in range(b.circuit_breaker.failure_threshold):
+            b.circuit_breaker.record_failure()
+        # 所有常规端点都不可用时才使用备用端点
+        assert pool.candidates()[0] is standby
+        # 全部不可用时按恢复时间排序，作为最后手段
+        assert [e.name for e in pool.candidates(avoid=[standby])] == ["standby", "b", "a"]
+
+
+class TestModelClientPool:
+    """通过多个替身服务器测试 ModelClient 的分流与故障转移"""
+
+    def test_requests_are_spread(self, monkeypatch):
+        with StandInServer() as first, StandInServer() as second:
+            _use_endpoints(monkeypatch, first, second)
+            client = ModelClient()
+            for i in range(6):
+                client.get_answer(f"question {i}")
+            assert first.stats()["chat_completions"] == second.stats()["chat_completions"] == 3
+            assert {c["endpoint"] for c in client.telemetry.calls} == {s.base_url.split("/")[2] for s in (first, second)}
+
+    def test_failover_on_errors(self, monkeypatch):
+        with StandInServer(error_rate=1.0) as broken, StandInServer() as healthy:
+            _use_endpoints(monkeypatch, broken, healthy)
+            client = ModelClient()
+            for i in range(8):
+                assert client.get_answer(f"question {i}").startswith("Stand-in answer")
+            assert healthy.stats()["chat_completions"] == 8
+            # 连续失败后断路器打开，之后不再向故障端点发送请求
+            assert broken.stats()["errors"] == client.endpoints.primary.circuit_breaker.failure_threshold
+            assert not client.endpoints.stats()[0]["healthy"]
+
+    def test_failover_on_throttling_without_waiting(self, monkeypatch):
+        with StandInServer(rate_limit_rate=1.0, retry_after=30) as throttled, StandInServer() as healthy:
+            _use_endpoints(monkeypatch, throttled, healthy)
+            client = ModelClient()
+            start = time.monotonic()
+            for i in range(4):
+                client.get_answer(f"question {i}")
+            assert time.monotonic() - start < 5  # 不等待 Retry-After，直接转到另一个端点
+            assert throttled.stats()["throttled"] == 1  # 冷却期内不再选择被限流的端点
+            assert healthy.stats()["chat_completions"] == 4
+
+    def test_throughput_scales_with_keys(self, monkeypatch):
+        monkeypatch.setenv("LLM_MAX_CONCURRENCY", "1")  # 每个密钥一次只允许一个请求
+
+        def run(servers):
+            _use_endpoints(monkeypatch, *servers)
+            client = ModelClient()
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(client.get_answer, [f"question {i}" for i in range(8)]))
+            return time.monotonic() - start
+
+        with StandInServer(latency="0.1") as first, StandInServer(latency="0.1") as second:
+            single = run([first])
+            double = run([first, second])
+        assert double < single * 0.75
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,123 @@
+# tests/test_file_index.py
+# 测试单次扫描构建的项目文件索引
+
+import pytest
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.file_index import build_file_index, FileRecord, KIND_DIR, KIND_FILE, WALKER_PARALLEL
+from src.aireadme.utils import file_index
+from src.aireadme.utils.file_handler import find_files, get_project_structure
+
+
+def _make_tree(base, files):
+    for rel_path, content in files.items():
+        path = os.path.join(base, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+class TestFileIndex:
+    """测试 FileIndex 的扫描与查询"""
+
+    def test_index_matches_find_files(self):
+        """索引查询结果应与 find_files 一致"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _make_tree(temp_dir, {
+                "app.py": "print('app')",
+                "run.sh": "echo run",
+                "docs/guide.md": "# Guide",
+                "pkg/core.py": "x = 1",
+                "pkg/__init__.py": "",
+                "build/out.py": "ignored",
+            })
+            ignore = ["build", "__init__.py", "*/__init__.py"]
+
+            index = build_file_index(temp_dir, ignore)
+            expected = sorted(find_files(temp_dir, ["*.py", "*.sh"], ignore))
+
+            assert sorted(index.find(["*.py", "*.sh"])) == expected
+            assert all(isinstance(r, FileRecord) for r in index)
+            assert {r.path for r in index.dirs()} == {"docs", "pkg"}
+
+    def test_records_carry_stat_data(self):
+        """文件记录应包含大小、修改时间和类型"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _make_tree(temp_dir, {"data.txt": "12345"})
+
+            index = build_file_index(temp_dir, [])
+            record = next(index.files())
+
+            assert record.kind == KIND_FILE
+            assert record.size == 5
+            assert record.mtime == pytest.approx(os.path.getmtime(os.path.join(temp_dir, "data.txt")))
+            assert not hasattr(record, "__dict__")
+
+    def test_render_structure(self):
+        """索引渲染的目录结构应与 get_project_structure 相同"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _make_tree(temp_dir, {
+                "main.py": "",
+                "src/a.py": "",
+                "src/b.py": "",
+            })
+
+            index = build_file_index(temp_dir, [])
+            name = os.path.basename(temp_dir)
+
+            assert index.render_structure() == (
+                f"{name}/\n├── main.py\n├── src/\n    ├── a.py\n    ├── b.py"
+            )
+            assert index.render_structure() == get_project_structure(temp_dir, [])
+            assert [r.kind for r in index] == [KIND_FILE, KIND_DIR, KIND_FILE, KIND_FILE]
+
+    def test_parallel_walker_is_deterministic(self):
+        """并行扫描的结果顺序应与串行扫描完全一致"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files = {}
+            for i in range(6):
+                for j in range(5):
+                    files[f"d{i}/sub{j}/f{j}.py"] = ""
+                files[f"d{i}/top.txt"] = ""
+            _make_tree(temp_dir, files)
+
+            serial = build_file_index(temp_dir, [])
+            parallel = build_file_index(temp_dir, [], walker=WALKER_PARALLEL, max_workers=4)
+
+            assert [r.path for r in parallel] == [r.path for r in serial]
+            assert parallel.render_structure() == serial.render_structure()
+
+    def test_parallel_walker_frontier_is_bounded(self, monkeypatch):
+        """宽目录树上，待扫描的目录按深度优先逐个展开，不会一次性排满整层"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _make_tree(temp_dir, {f"d{i}/s{j}/f.py": "" for i in range(20) for j in range(20)})
+            scanned = []
+            scan_dir = file_index._scan_dir
+
+            def recording_scan_dir(directory, rel_dir, matcher):
+                scanned.append(rel_dir)
+                return scan_dir(directory, rel_dir, matcher)
+
+            monkeypatch.setattr(file_index, "_scan_dir", recording_scan_dir)
+            parallel = build_file_index(temp_dir, [], walker=WALKER_PARALLEL, max_workers=2)
+            monkeypatch.undo()
+
+            assert [r.path for r in parallel] == [r.path for r in build_file_index(temp_dir, [])]
+            assert len(scanned) == 1 + 20 + 400
+            # 广度优先会在任何 s* 目录之前扫描完全部 20 个 d* 目录
+            first_leaf = next(i for i, rel_dir in enumerate(scanned) if os.sep in rel_dir)
+            assert first_leaf < 1 + 2 * 8
+
+    def test_unknown_walker(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(ValueError):
+                build_file_index(temp_dir, [], walker="bogus")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,76 @@
+# tests/test_file_reader.py
+# 测试文件预读：二进制探测、编码识别与大文件采样
+
+import pytest
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.file_reader import read_for_prompt, is_binary, detect_encoding, byte_budget
+
+
+class TestFileReader:
+    """测试 read_for_prompt 及其辅助函数"""
+
+    def test_binary_detection(self):
+        assert is_binary(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+        assert not is_binary(b"print('hello')\n")
+        assert not is_binary("中文内容".encode("utf-16"))
+        assert not is_binary(b"")
+
+    def test_encoding_detection(self):
+        assert detect_encoding("héllo".encode("utf-8")) == "utf-8"
+        assert detect_encoding("héllo".encode("utf-8-sig")) == "utf-8-sig"
+        # 截断在多字节字符中间的 UTF-8 样本仍应识别为 UTF-8
+        assert detect_encoding("中文".encode("utf-8")[:-1]) == "utf-8"
+
+    def test_small_file_read_whole(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "latin.txt")
+            with open(path, "wb") as f:
+                f.write("café\n".encode("latin-1"))
+
+            sample = read_for_prompt(path, max_bytes=1024)
+
+            assert not sample.truncated
+            assert sample.text.startswith("caf")
+            assert sample.size == 5
+
+    def test_large_file_is_sampled(self):
+        """超过上限的文件只读取开头、结尾和中间采样"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "big.log")
+            with open(path, "w", encoding="utf-8") as f:
+                for i in range(20000):
+                    f.write(f"line {i:05d}\n")
+
+            sample = read_for_prompt(path, max_bytes=2000, samples=2)
+
+            assert sample.truncated
+            assert sample.size == 20000 * 11
+            assert sample.text.startswith("line 00000\n")
+            assert sample.text.rstrip().endswith("line 19999")
+            assert "bytes omitted" in sample.text
+            assert len(sample.text.encode("utf-8")) < 2000 + 200
+
+    def test_binary_file_is_skipped(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "data.txt")
+            with open(path, "wb") as f:
+                f.write(bytes(range(256)) * 10)
+
+            sample = read_for_prompt(path)
+
+            assert sample.binary
+            assert sample.text == ""
+
+    def test_byte_budget(self):
+        assert byte_budget(65536) == 65536
+        assert byte_budget(65536, max_tokens=1000) == 4000
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
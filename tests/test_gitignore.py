@@ -0,0 +1,88 @@
+# tests/test_gitignore.py
+# 测试预编译的 gitignore 匹配引擎
+
+import pytest
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.gitignore import IgnoreMatcher, RuleSet, parse_gitignore_lines
+from src.aireadme.utils.file_index import build_file_index
+
+
+def _write(path, content=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class TestGitignoreRules:
+    """测试单条规则的语义"""
+
+    def test_parse_lines(self):
+        lines = ["# comment\n", "\n", "*.log   \n", "keep\\ \n", "\\#hash\n"]
+        assert parse_gitignore_lines(lines) == ["*.log", "keep\\ ", "\\#hash"]
+
+    def test_anchoring_and_depth(self):
+        rules = RuleSet("", ["/root_only.txt", "anywhere.txt", "docs/*.md"])
+        assert rules.match("root_only.txt", False) is True
+        assert rules.match("sub/root_only.txt", False) is None
+        assert rules.match("a/b/anywhere.txt", False) is True
+        assert rules.match("docs/readme.md", False) is True
+        assert rules.match("docs/api/readme.md", False) is None
+
+    def test_double_star(self):
+        rules = RuleSet("", ["**/logs", "out/**", "a/**/z"])
+        assert rules.match("x/y/logs", True) is True
+        assert rules.match("out/file", False) is True
+        assert rules.match("out", True) is None
+        assert rules.match("a/z", False) is True
+        assert rules.match("a/b/c/z", False) is True
+
+    def test_directory_only_and_negation(self):
+        rules = RuleSet("", ["build/", "*.txt", "!keep.txt"])
+        assert rules.match("build", True) is True
+        assert rules.match("build", False) is None
+        assert rules.match("notes.txt", False) is True
+        assert rules.match("keep.txt", False) is False
+
+
+class TestIgnoreMatcher:
+    """测试嵌套 .gitignore 与 info/exclude 的组合"""
+
+    def test_nested_gitignore_precedence(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _write(os.path.join(temp_dir, ".gitignore"), "*.log\nsecret/\n")
+            _write(os.path.join(temp_dir, ".git", "info", "exclude"), "local.cfg\n")
+            _write(os.path.join(temp_dir, "pkg", ".gitignore"), "!important.log\n/generated.py\n")
+
+            matcher = IgnoreMatcher(temp_dir, ["*.pyc"])
+
+            assert matcher.is_ignored("debug.log")
+            assert matcher.is_ignored("local.cfg")
+            assert matcher.is_ignored("mod.pyc")
+            assert matcher.is_ignored("secret", is_dir=True)
+            assert not matcher.is_ignored("pkg/important.log")
+            assert matcher.is_ignored(os.path.join("pkg", "other.log"))
+            assert matcher.is_ignored("pkg/generated.py")
+            assert not matcher.is_ignored("pkg/sub/generated.py")
+            assert matcher.is_path_ignored("secret/deep/file.py")
+
+    def test_ignored_directory_is_pruned(self):
+        """被忽略的目录应整体剪枝，不会进入索引"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _write(os.path.join(temp_dir, ".gitignore"), "node_modules/\n")
+            for i in range(20):
+                _write(os.path.join(temp_dir, "node_modules", f"lib{i}", "index.js"))
+            _write(os.path.join(temp_dir, "app.py"))
+
+            index = build_file_index(temp_dir, IgnoreMatcher(temp_dir, [".git"]))
+
+            assert [r.path for r in index] == [".gitignore", "app.py"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,89 @@
+# tests/test_http_transport.py
+# 测试共享连接池：连接复用统计与图片流式写入文件
+
+import pytest
+import os
+import asyncio
+import tempfile
+import threading
+import http.server
+import socketserver
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.http_transport import HttpTransport
+from src.aireadme.utils.model_client import ModelClient
+
+IMAGE_BYTES = bytes(range(256)) * 1024
+
+
+class _ImageHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 保持长连接
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(IMAGE_BYTES)))
+        self.end_headers()
+        self.wfile.write(IMAGE_BYTES)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _ImageHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/logo.png"
+    server.shutdown()
+    server.server_close()
+
+
+class TestHttpTransport:
+    """测试 HttpTransport"""
+
+    def test_api_connections_are_reused(self, image_server):
+        transport = HttpTransport(max_connections=4)
+        for _ in range(3):
+            transport.client.get(image_server)
+
+        async def fetch():
+            for _ in range(2):
+                await transport.async_client.get(image_server)
+
+        asyncio.run(fetch())
+        stats = transport.stats()["api"]
+        assert stats == {"requests": 5, "connections": 2, "reused": 3}
+        transport.close()
+
+    def test_download_streams_to_file(self, image_server):
+        transport = HttpTransport(max_connections=4, download_chunk_bytes=4096)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dest = os.path.join(temp_dir, "images", "logo.png")
+            assert transport.download(image_server, dest) == len(IMAGE_BYTES)
+            assert transport.download(image_server) == IMAGE_BYTES
+            with open(dest, "rb") as f:
+                assert f.read() == IMAGE_BYTES
+            assert os.listdir(os.path.dirname(dest)) == ["logo.png"]  # 不残留临时文件
+
+        assert transport.stats()["download"] == {"requests": 2, "connections": 1, "reused": 1}
+        transport.close()
+
+    def test_model_client_shares_transport(self, image_server):
+        transport = HttpTransport(max_connections=8)
+        client = ModelClient(transport=transport)
+        assert client.llm_client._client is transport.client
+        assert client.t2i_client._client is transport.client
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dest = os.path.join(temp_dir, "logo.png")
+            assert client._download_image_with_retry(image_server, dest_path=dest) == len(IMAGE_BYTES)
+            assert os.path.getsize(dest) == len(IMAGE_BYTES)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -7,22 +7,34 @@ import sys
 root_dir = Path(__file__).parent.parent
 sys.path.append(str(root_dir))
 from src.aireadme.utils.model_client import ModelClient
+from src.aireadme.utils.stand_in_server import StandInServer
+
+
+@pytest.fixture(autouse=True)
+def stand_in(monkeypatch):
+    """LLM 与文生图接口都指向离线替身服务器，不访问真实接口"""
+    with StandInServer() as server:
+        for prefix in ("LLM", "T2I"):
+            monkeypatch.setenv(f"{prefix}_BASE_URL", server.base_url)
+            monkeypatch.setenv(f"{prefix}_API_KEY", "stand-in")
+        monkeypatch.setenv("LLM_CACHE", "0")
+        yield server
 
 # 测试 get_answer 方法
-def test_get_answer():
+def test_get_answer(stand_in):
     # 实例化 ModelClient
     client = ModelClient()
     # 构造问题
     question = "你好，介绍一下你自己"
     # 调用 get_answer 获取回复
     answer = client.get_answer(question)
+    assert stand_in.stats()["chat_completions"] == 1
     print("get_answer 返回：", answer)
     # 断言返回内容不为空
     assert answer is not None and len(answer) > 0
 
 # 测试 get_image 方法
-# @pytest.mark.skip(reason="生成图片会消耗额度，调试时可去掉本行")
-def test_get_image():
+def test_get_image(stand_in):
     # 实例化 ModelClient
     client = ModelClient()
     # 设置图片生成的 prompt
@@ -33,6 +45,7 @@ def test_get_image():
     # 断言返回结果包含url或content
     assert img_result is not None
     assert "url" in img_result or "content" in img_result
+    assert stand_in.stats()["images"] == 1
 
 # 测试配置信息获取
 def test_get_current_settings():
@@ -13,6 +13,18 @@ root_dir = Path(__file__).parent.parent
 sys.path.append(str(root_dir))
 from src.aireadme.utils.logo_generator import generate_logo
 from src.aireadme.utils.model_client import ModelClient
+from src.aireadme.utils.stand_in_server import StandInServer
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    """LLM 与文生图接口都指向离线替身服务器，不访问真实接口"""
+    with StandInServer() as server:
+        for prefix in ("LLM", "T2I"):
+            monkeypatch.setenv(f"{prefix}_BASE_URL", server.base_url)
+            monkeypatch.setenv(f"{prefix}_API_KEY", "stand-in")
+        monkeypatch.setenv("LLM_CACHE", "0")
+        yield server
 
 
 class TestLogoGenerator:
@@ -124,10 +136,10 @@ class TestLogoGenerator:
             # 验证返回None
             assert logo_path is None
 
-    def test_generate_logo_real_api(self):
-        """使用真实API测试logo生成"""
+    def test_generate_logo_real_api(self, stand_in):
+        """通过替身服务器走完整的 API logo 生成流程"""
         print("\n" + "=" * 60)
-        print("🌐 测试 4: 真实 API Logo 生成测试")
+        print("🌐 测试 4: API Logo 生成测试（替身服务器）")
         print("=" * 60)
 
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -139,27 +151,23 @@ class TestLogoGenerator:
             }
             """
 
-            # 使用真实的 ModelClient
+            # 真实的 ModelClient，请求发往替身服务器
             try:
                 model_client = ModelClient()
                 console = Console()
 
                 print(f"测试目录: {temp_dir}")
-                print("开始测试真实API logo生成...")
+                print("开始测试API logo生成...")
 
                 logo_path = generate_logo(temp_dir, descriptions, model_client, console)
 
-                # 如果遇到网络问题（SSL错误等），允许测试跳过
-                if logo_path is None:
-                    pytest.skip("Logo生成失败，可能由于网络连接问题（SSL错误等）")
-
                 # 验证生成结果
+                assert logo_path is not None, "Logo生成失败"
                 assert os.path.exists(logo_path), f"Logo文件不存在: {logo_path}"
 
                 # 检查文件大小
                 file_size = os.path.getsize(logo_path)
                 assert file_size > 0, "Logo文件为空"
-                assert file_size > 1000, f"Logo文件太小，可能生成失败: {file_size} 字节"
 
                 print(f"✅ Logo 生成成功!")
                 print(f"   文件路径: {logo_path}")
@@ -180,22 +188,20 @@ class TestLogoGenerator:
                         # 打印文件头以便调试
                         print(f"   文件头: {header}")
                         image_format = "Unknown"
-                        # 不直接断言失败，而是警告
-                        print(f"   ⚠️  未知图片格式，但文件大小正常: {file_size:,} 字节")
 
-                if image_format != "Unknown":
-                    print(f"   文件格式: {image_format} ✅")
-                else:
-                    print(f"   文件格式: 未知但可接受 ⚠️")
+                # 替身服务器返回的是一张很小但有效的 PNG
+                assert image_format == "PNG", f"Logo不是有效的图片: {header}"
+                print(f"   文件格式: {image_format} ✅")
 
                 # 验证images目录结构
                 images_dir = os.path.dirname(logo_path)
                 assert (
                     os.path.basename(images_dir) == "images"
                 ), "Logo应该保存在images目录中"
+                assert stand_in.stats()["images"] == 1
 
                 print(f"   目录结构: 正确 ✅")
-                print("🎉 真实API logo生成测试通过!")
+                print("🎉 API logo生成测试通过!")
 
             except Exception as e:
                 # 如果是网络相关错误，跳过测试而不是失败
@@ -206,9 +212,9 @@ class TestLogoGenerator:
                 ):
                     pytest.skip(f"网络连接问题，跳过测试: {e}")
                 else:
-                    pytest.fail(f"真实API测试失败: {e}")
+                    pytest.fail(f"API测试失败: {e}")
 
-    def test_logo_description_generation(self):
+    def test_logo_description_generation(self, stand_in):
         """测试Logo描述生成功能（仅测试LLM部分）"""
         print("\n" + "=" * 60)
         print("💬 测试 5: LLM Logo 描述生成测试")
@@ -253,26 +259,8 @@ class TestLogoGenerator:
             print(f"   描述长度: {len(logo_description)} 字符")
             print(f"   描述内容: {logo_description}")
 
-            # 检查描述是否包含一些常见的设计元素词汇
-            design_keywords = [
-                "logo",
-                "color",
-                "design",
-                "professional",
-                "modern",
-                "symbol",
-                "icon",
-            ]
-            found_keywords = [
-                word
-                for word in design_keywords
-                if word.lower() in logo_description.lower()
-            ]
-
-            print(f"   包含设计关键词: {', '.join(found_keywords)}")
-            assert (
-                len(found_keywords) >= 2
-            ), f"Logo描述应该包含更多设计相关词汇，当前只有: {found_keywords}"
+            # 替身服务器的回答是合成文本，这里只检查请求确实发出且只发了一次
+            assert stand_in.stats()["chat_completions"] == 1
 
             print("🎉 Logo描述生成测试通过!")
 
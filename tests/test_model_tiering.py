@@ -0,0 +1,108 @@
+# tests/test_model_tiering.py
+# 测试按阶段选择模型：高频阶段使用快速廉价模型，README 与 Logo 使用高级模型
+
+import pytest
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.config import get_stage_model_config
+from src.aireadme.core import aireadme
+from src.aireadme.utils.model_client import ModelClient
+from src.aireadme.utils.stand_in_server import StandInServer
+
+
+@pytest.fixture
+def tiers(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_NAME", "default-model")
+    monkeypatch.setenv("LLM_FAST_MODEL_NAME", "fast-model")
+    monkeypatch.setenv("LLM_PREMIUM_MODEL_NAME", "premium-model")
+    monkeypatch.setenv("LLM_CACHE", "0")
+
+
+def _mock_client():
+    client = ModelClient()
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+    client.llm_client = MagicMock()
+    client.llm_client.chat.completions.create.return_value = response
+    return client
+
+
+class TestStageModelConfig:
+    """测试 get_stage_model_config"""
+
+    def test_tiers_and_overrides(self, tiers, monkeypatch):
+        monkeypatch.setenv("LLM_MODEL_NAME_DEPENDENCIES", "deps-model")
+        monkeypatch.setenv("MAX_TOKENS_DESCRIPTIONS", "300")
+        monkeypatch.setenv("TEMPERATURE_README", "0.2")
+        monkeypatch.setenv("README_MAX_TOKENS", "5000")
+        stages = get_stage_model_config()
+        assert stages["descriptions"] == {"model": "fast-model", "max_tokens": 300, "temperature": None}
+        assert stages["dependencies"]["model"] == "deps-model"
+        assert stages["readme"] == {"model": "premium-model", "max_tokens": 5000, "temperature": 0.2}
+        assert stages["logo"]["model"] == "premium-model"
+
+    def test_tiers_default_to_llm_model(self, monkeypatch):
+        monkeypatch.setenv("LLM_MODEL_NAME", "only-model")
+        monkeypatch.delenv("LLM_FAST_MODEL_NAME", raising=False)
+        monkeypatch.delenv("LLM_PREMIUM_MODEL_NAME", raising=False)
+        assert {s["model"] for s in get_stage_model_config().values()} == {"only-model"}
+
+
+class TestStageRouting:
+    """测试 ModelClient 按当前阶段选择模型与参数"""
+
+    def test_current_stage_selects_model(self, tiers, monkeypatch):
+        monkeypatch.setenv("MAX_TOKENS_DESCRIPTIONS", "300")
+        monkeypatch.setenv("TEMPERATURE_DESCRIPTIONS", "0.1")
+        client = _mock_client()
+        create = client.llm_client.chat.completions.create
+
+        with client.telemetry.stage("descriptions"):
+            client.get_answer("describe a.py")
+        params = create.call_args.kwargs
+        assert (params["model"], params["max_tokens"], params["temperature"]) == ("fast-model", 300, 0.1)
+
+        with client.telemetry.stage("readme"):
+            client.get_answer("write the readme")
+        params = create.call_args.kwargs
+        assert (params["model"], params["max_tokens"]) == ("premium-model", 4000)
+        assert params["temperature"] == client.temperature
+
+        # 阶段之外使用默认模型；显式参数优先于阶段配置
+        client.get_answer("other question")
+        assert create.call_args.kwargs["model"] == "default-model"
+        with client.telemetry.stage("descriptions"):
+            client.get_answer("explicit", model="chosen-model", temperature=0.9)
+        assert (create.call_args.kwargs["model"], create.call_args.kwargs["temperature"]) == ("chosen-model", 0.9)
+
+    def test_generate_uses_tiers(self, tiers, monkeypatch):
+        with StandInServer() as server, tempfile.TemporaryDirectory() as project_dir, \
+                tempfile.TemporaryDirectory() as output_dir:
+            monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+            monkeypatch.setenv("LLM_API_KEY", "stand-in")
+            monkeypatch.setenv("README_STREAM_ECHO", "0")
+            for name in ("main.py", "util.py"):
+                with open(os.path.join(project_dir, name), "w", encoding="utf-8") as f:
+                    f.write(f"# {name}\nimport os\n")
+
+            craft = aireadme(project_dir=project_dir, logo=False)
+            craft.output_dir = output_dir
+            craft._get_basic_info = lambda: None
+            craft._get_git_info = lambda: None
+            craft._get_user_info = lambda: None
+            craft.generate()
+
+            models = {(c["stage"], c["model"]) for c in craft.model_client.telemetry.calls}
+            assert ("descriptions", "fast-model") in models
+            assert ("readme", "premium-model") in models
+            assert not any(model == "premium-model" for stage, model in models if stage != "readme")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
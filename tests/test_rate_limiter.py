@@ -0,0 +1,102 @@
+# tests/test_rate_limiter.py
+# 测试令牌桶、AIMD 自适应并发与 429 退避
+
+import pytest
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.rate_limiter import (
+    TokenBucket,
+    AdaptiveConcurrency,
+    RateController,
+)
+from src.aireadme.utils.errors import is_rate_limit_error, retry_after_seconds
+from src.aireadme.utils.model_client import ModelClient
+
+
+class FakeRateLimitError(Exception):
+    """模拟 openai 的 429 异常"""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("Too Many Requests")
+        self.response = MagicMock()
+        self.response.headers = {"retry-after": retry_after} if retry_after else {}
+
+
+class TestRateLimiter:
+    """测试 rate_limiter 模块"""
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 每秒 10 个
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+        assert TokenBucket(0).reserve(10 ** 9) == 0.0
+
+    def test_aimd(self):
+        limiter = AdaptiveConcurrency(max_limit=8, initial=4, default_backoff=0.05)
+        limiter.acquire()
+        limiter.release(throttled=True)
+        assert limiter.limit == 2
+        assert limiter.blocked_until > time.monotonic()
+
+        time.sleep(0.06)
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release()
+        assert 2 < limiter.limit <= 8
+
+    def test_concurrency_is_bounded(self):
+        controller = RateController(max_concurrency=3)
+        state = {"in_flight": 0, "peak": 0}
+
+        def work(_):
+            with controller.slot(10):
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+                time.sleep(0.02)
+                state["in_flight"] -= 1
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            list(executor.map(work, range(20)))
+
+        assert state["peak"] <= 3
+        assert controller.report()["requests"] == 20
+
+    def test_error_classification(self):
+        assert is_rate_limit_error(FakeRateLimitError())
+        assert not is_rate_limit_error(ValueError("bad"))
+        assert retry_after_seconds(FakeRateLimitError("2")) == 2.0
+        assert retry_after_seconds(FakeRateLimitError()) is None
+
+    def test_model_client_retries_throttled_requests(self):
+        """429 响应应触发退避重试，而不是直接返回错误字符串"""
+        client = ModelClient(rate_controller=RateController(max_concurrency=4))
+        client.rate_controller.concurrency.default_backoff = 0.01
+        client.retry_policy.base_delay = 0.01
+        response = MagicMock()
+        response.choices[0].message.content = "ok"
+        response.usage.total_tokens = 42
+        client.llm_client = MagicMock()
+        client.llm_client.chat.completions.create.side_effect = [
+            FakeRateLimitError("0.01"), FakeRateLimitError(), response
+        ]
+
+        assert client.get_answer("hello") == "ok"
+
+        report = client.rate_controller.report()
+        assert report["throttled"] == 2
+        assert report["requests"] == 1
+        assert report["tokens"] == 42
+        assert report["concurrency_limit"] < 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,209 @@
+# tests/test_readme_sections.py
+# 测试基于 git 差异的增量 README 刷新：章节拆分、章节与源文件映射、变更检测，以及只重写受影响的章节
+
+import pytest
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.readme_sections import (
+    STRUCTURE_SOURCE, DEPENDENCIES_SOURCE, git_changed_files, split_sections, load_section_map, map_sections, stale_sections,
+)
+from src.aireadme.utils.stand_in_server import StandInServer
+# 与 core 使用同一份错误类型模块，保证 except 能捕获
+from aireadme.utils.errors import TransientModelError
+
+README = """# Demo
+
+Intro text.
+
+## About
+
+The CLI lives in `cli.py` and talks to `lib/client.py`.
+
+## Installation
+
+```sh
+## not a heading
+pip install -r requirements.txt
+```
+
+## License
+
+MIT
+"""
+
+needs_git = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", repo, *args], check=True, capture_output=True)
+
+
+def _make_git_repo(parent):
+    """创建一个已提交的小仓库"""
+    repo = os.path.join(parent, "repo")
+    os.makedirs(os.path.join(repo, "lib"))
+    files = {"cli.py": "import lib.client\n", "lib/client.py": "import json\n", "notes.py": "x = 1\n"}
+    for path, content in files.items():
+        with open(os.path.join(repo, path), "w", encoding="utf-8") as f:
+            f.write(content)
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "-m", "init")
+    return repo
+
+
+class TestSections:
+    """测试章节拆分与映射"""
+
+    def test_split_round_trip(self):
+        sections = split_sections(README)
+        assert [heading for heading, _ in sections] == ["", "About", "Installation", "License"]
+        assert "".join(text for _, text in sections) == README
+
+    def test_map_and_stale(self):
+        paths = ["cli.py", "lib/client.py", "notes.py", "tests/cli.py"]
+        section_map = map_sections(split_sections(README), paths)
+        # cli.py 不唯一，只有完整路径才算提及
+        assert section_map["About"] == ["cli.py", "lib/client.py"]
+        assert section_map["Installation"] == [DEPENDENCIES_SOURCE]
+        assert section_map["License"] == []
+        assert stale_sections(section_map, ["lib/client.py"]) == ["About"]
+        assert stale_sections(section_map, [DEPENDENCIES_SOURCE, STRUCTURE_SOURCE]) == ["Installation"]
+        assert stale_sections(section_map, ["notes.py"]) == []
+
+    def test_map_scales_to_large_projects(self):
+        paths = [f"pkg{i // 100}/mod_{i}.py" for i in range(20000)] + ["docs/my guide.md"]
+        sections = [("", "# Demo\n")]
+        for s in range(15):
+            mentions = ", ".join(f"`pkg{s}/mod_{s * 100 + j}.py`" for j in range(50))
+            sections.append((f"Part {s}", f"## Part {s}\n\nSee {mentions} and mod_{19999 - s}.py.\n" * 20))
+        sections.append(("Docs", "## Docs\n\nRead docs/my guide.md, not ./pkg0/mod_1.pyc.\n"))
+        start = time.perf_counter()
+        section_map = map_sections(sections, paths)
+        assert time.perf_counter() - start < 5
+        assert section_map["Part 3"] == sorted([f"pkg3/mod_{300 + j}.py" for j in range(50)] + ["pkg199/mod_19996.py"])
+        # 含空格的路径仍按子串匹配；mod_1.pyc 不是 mod_1.py
+        assert section_map["Docs"] == ["docs/my guide.md"]
+
+    @needs_git
+    def test_git_changed_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = _make_git_repo(temp_dir)
+            with open(os.path.join(repo, "lib", "client.py"), "a", encoding="utf-8") as f:
+                f.write("import os\n")
+            with open(os.path.join(repo, "new.py"), "w", encoding="utf-8") as f:
+                f.write("y = 2\n")
+            os.remove(os.path.join(repo, "notes.py"))
+            assert git_changed_files(repo, "HEAD") == ["lib/client.py", "new.py", "notes.py"]
+            # 子目录中的路径相对于项目目录
+            assert git_changed_files(os.path.join(repo, "lib"), "HEAD") == ["client.py"]
+            assert git_changed_files(repo, "no-such-ref") is None
+            assert git_changed_files(temp_dir, "HEAD") is None
+
+
+class TestIncrementalRefresh:
+    """通过替身服务器测试增量刷新"""
+
+    @needs_git
+    def test_only_affected_sections_are_rewritten(self, monkeypatch):
+        with StandInServer() as server, tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+            monkeypatch.setenv("LLM_API_KEY", "stand-in")
+            monkeypatch.setenv("LLM_CACHE", "0")
+            monkeypatch.setenv("README_STREAM_ECHO", "0")
+            repo = _make_git_repo(temp_dir)
+            output_dir = os.path.join(temp_dir, "out")
+
+            aireadme(project_dir=repo, output_dir=output_dir, interactive=False, logo=False).generate()
+            # 用已知内容替换生成的 README，并重新记录章节映射
+            readme_path = os.path.join(output_dir, "README.md")
+            with open(readme_path, "w", encoding="utf-8") as f:
+                f.write(README)
+            craft = aireadme(project_dir=repo, output_dir=output_dir, interactive=False, logo=False)
+            craft._dependencies_hash = load_section_map(output_dir)["dependencies_hash"]
+            craft._save_sections(readme_path)
+
+            with open(os.path.join(repo, "lib", "client.py"), "w", encoding="utf-8") as f:
+                f.write("import json\n\ndef fetch():\n    return json.dumps({})\n")
+            before = server.stats()["chat_completions"]
+            craft = aireadme(project_dir=repo, output_dir=output_dir, interactive=False, logo=False, since="HEAD")
+            craft.generate()
+
+            assert craft.changed_files == ["lib/client.py"]
+            assert craft.described_files == {"lib/client.py"}
+            # 一次文件描述 + 一个章节；导入未变，依赖分析复用上次结果
+            assert server.stats()["chat_completions"] - before == 2
+            with open(readme_path, "r", encoding="utf-8") as f:
+                sections = dict(split_sections(f.read()))
+            original = dict(split_sections(README))
+            assert sections["About"].startswith("## About\n") and sections["About"] != original["About"]
+            for heading in ("", "Installation", "License"):
+                assert sections[heading] == original[heading]
+
+            # 没有变化时不发送任何请求
+            _git(repo, "add", ".")
+            _git(repo, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "-m", "change")
+            before = server.stats()["chat_completions"]
+            aireadme(project_dir=repo, output_dir=output_dir, interactive=False, logo=False, since="HEAD").generate()
+            assert server.stats()["chat_completions"] == before
+
+    def _refresh_setup(self, monkeypatch, server, temp_dir):
+        """生成一次 README，替换为已知内容并记录章节映射，然后修改 lib/client.py"""
+        monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+        monkeypatch.setenv("LLM_API_KEY", "stand-in")
+        monkeypatch.setenv("LLM_CACHE", "0")
+        monkeypatch.setenv("README_STREAM_ECHO", "0")
+        repo = _make_git_repo(temp_dir)
+        output_dir = os.path.join(temp_dir, "out")
+        aireadme(project_dir=repo, output_dir=output_dir, interactive=False, logo=False).generate()
+        readme_path = os.path.join(output_dir, "README.md")
+        with open(readme_path, "w", encoding="utf-8") as f:
+            f.write(README)
+        craft = aireadme(project_dir=repo, output_dir=output_dir, interactive=False, logo=False)
+        craft._dependencies_hash = load_section_map(output_dir)["dependencies_hash"]
+        craft._save_sections(readme_path)
+        with open(os.path.join(repo, "lib", "client.py"), "w", encoding="utf-8") as f:
+            f.write("import json\n\ndef fetch():\n    return json.dumps({})\n")
+        return repo, output_dir, readme_path
+
+    @needs_git
+    def test_renamed_section_falls_back_to_full_generation(self, monkeypatch):
+        with StandInServer() as server, tempfile.TemporaryDirectory() as temp_dir:
+            repo, output_dir, readme_path = self._refresh_setup(monkeypatch, server, temp_dir)
+            # 章节映射中受影响的 About 被手工改名
+            with open(readme_path, "w", encoding="utf-8") as f:
+                f.write(README.replace("## About", "## Overview"))
+            craft = aireadme(project_dir=repo, output_dir=output_dir, interactive=False, logo=False, since="HEAD")
+            craft.generate()
+            with open(readme_path, "r", encoding="utf-8") as f:
+                assert "## Overview" not in f.read()
+
+    @needs_git
+    def test_failed_section_keeps_old_text(self, monkeypatch):
+        with StandInServer() as server, tempfile.TemporaryDirectory() as temp_dir:
+            repo, output_dir, readme_path = self._refresh_setup(monkeypatch, server, temp_dir)
+            craft = aireadme(project_dir=repo, output_dir=output_dir, interactive=False, logo=False, since="HEAD")
+            get_answer = craft.model_client.get_answer
+
+            def failing_sections(prompt, **kwargs):
+                if prompt.startswith("You are updating one section"):
+                    raise TransientModelError("timeout")
+                return get_answer(prompt, **kwargs)
+
+            craft.model_client.get_answer = failing_sections
+            craft.generate()
+            with open(readme_path, "r", encoding="utf-8") as f:
+                assert f.read() == README
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,114 @@
+# tests/test_response_cache.py
+# 测试磁盘持久化的 LLM 响应缓存
+
+import pytest
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.response_cache import ResponseCache
+from src.aireadme.utils.model_client import ModelClient
+
+
+def _completion(text):
+    response = MagicMock()
+    response.choices[0].message.content = text
+    return response
+
+
+class TestResponseCache:
+    """测试 ResponseCache 的淘汰策略与 ModelClient 集成"""
+
+    def test_key_covers_parameters(self):
+        base = ResponseCache.make_key("https://a/v1", "gpt", 0.7, 1000, "hi")
+        assert base == ResponseCache.make_key("https://a/v1", "gpt", 0.7, 1000, "hi")
+        assert base != ResponseCache.make_key("https://b/v1", "gpt", 0.7, 1000, "hi")
+        assert base != ResponseCache.make_key("https://a/v1", "gpt", 0.2, 1000, "hi")
+        assert base != ResponseCache.make_key("https://a/v1", "gpt", 0.7, 500, "hi")
+        assert base != ResponseCache.make_key("https://a/v1", "gpt", 0.7, 1000, "hello")
+
+    def test_lru_eviction(self):
+        """超出容量时应淘汰最久未使用的条目"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(os.path.join(temp_dir, "cache.sqlite3"), max_bytes=30)
+            cache.put("a", "x" * 10)
+            time.sleep(0.01)
+            cache.put("b", "y" * 10)
+            time.sleep(0.01)
+            assert cache.get("a") == "x" * 10  # a 变为最近使用
+            time.sleep(0.01)
+            cache.put("c", "z" * 15)
+
+            assert cache.get("b") is None
+            assert cache.get("a") is not None
+            assert cache.get("c") is not None
+            assert cache.stats()["bytes"] <= 30
+            cache.close()
+
+    def test_shared_file_respects_capacity(self):
+        """多个进程共用同一缓存文件时，总大小仍不超过容量"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache.sqlite3")
+            # 两个实例模拟两个进程，各自只看到自己写入的条目
+            first = ResponseCache(path, max_bytes=100)
+            second = ResponseCache(path, max_bytes=100)
+            for i in range(10):
+                (first if i % 2 else second).put(f"k{i}", str(i) * 20)
+                time.sleep(0.01)
+
+            assert first.stats()["bytes"] <= 100
+            assert second.stats()["bytes"] == first.stats()["bytes"]
+            # 保留的是最近写入的条目
+            assert second.get("k9") == "9" * 20
+            assert first.get("k0") is None
+            first.close()
+            second.close()
+
+    def test_ttl_and_persistence(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache.sqlite3")
+            cache = ResponseCache(path)
+            cache.put("k", "v")
+            cache.close()
+
+            reopened = ResponseCache(path)
+            assert reopened.get("k") == "v"
+            reopened.ttl_seconds = 0.01
+            time.sleep(0.02)
+            assert reopened.get("k") is None
+            assert reopened.stats() == {"hits": 1, "misses": 1, "entries": 0, "bytes": 0}
+            reopened.close()
+
+    def test_model_client_uses_cache(self):
+        """相同提示词只调用一次 API，错误响应不缓存"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(os.path.join(temp_dir, "cache.sqlite3"))
+            client = ModelClient(cache=cache)
+            client.llm_client = MagicMock()
+            client.llm_client.chat.completions.create.return_value = _completion("cached answer")
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                answers = list(executor.map(lambda _: client.get_answer("same prompt"), range(8)))
+            calls_after_first = client.llm_client.chat.completions.create.call_count
+
+            assert set(answers) == {"cached answer"}
+            assert client.get_answer("same prompt") == "cached answer"
+            assert client.llm_client.chat.completions.create.call_count == calls_after_first
+
+            client.llm_client.chat.completions.create.side_effect = RuntimeError("boom")
+            with pytest.raises(Exception) as exc_info:
+                client.get_answer("failing prompt")
+            assert type(exc_info.value).__name__ == "PermanentModelError"
+            client.llm_client.chat.completions.create.side_effect = None
+            client.llm_client.chat.completions.create.return_value = _completion("recovered")
+            assert client.get_answer("failing prompt") == "recovered"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
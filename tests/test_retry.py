@@ -0,0 +1,274 @@
+# tests/test_retry.py
+# 测试错误分类、指数退避重试与熔断器
+
+import pytest
+import json
+import os
+import tempfile
+import time
+from unittest.mock import MagicMock
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+# 包内部以 aireadme.* 绝对导入错误类型，这里使用同一份模块以保证 isinstance 判断一致
+from aireadme.utils.errors import (
+    classify_error,
+    TransientModelError,
+    PermanentModelError,
+    CircuitOpenError,
+)
+from aireadme.utils.retry import RetryPolicy, CircuitBreaker
+from src.aireadme.utils.model_client import ModelClient
+from src.aireadme.utils.stand_in_server import StandInServer
+
+
+class FakeAPIError(Exception):
+    """模拟带 HTTP 状态码的 openai 异常"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = None
+
+
+def _completion(text):
+    response = MagicMock()
+    response.choices[0].message.content = text
+    return response
+
+
+class TestRetry:
+    """测试 errors 与 retry 模块"""
+
+    def test_classify_error(self):
+        assert isinstance(classify_error(FakeAPIError(503)), TransientModelError)
+        assert isinstance(classify_error(FakeAPIError(429)), TransientModelError)
+        assert isinstance(classify_error(TimeoutError("slow")), TransientModelError)
+        assert isinstance(classify_error(FakeAPIError(401)), PermanentModelError)
+        assert isinstance(classify_error(ValueError("bad")), PermanentModelError)
+        assert classify_error(FakeAPIError(500)).status_code == 500
+
+    def test_retry_policy(self):
+        policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=1.5)
+        transient = TransientModelError("x")
+        assert 0 <= policy.next_delay(0, transient) <= 1.0
+        assert 0 <= policy.next_delay(1, transient) <= 1.5
+        assert policy.next_delay(2, transient) is None
+        assert policy.next_delay(0, PermanentModelError("x")) is None
+        assert policy.next_delay(0, CircuitOpenError("x")) is None
+        # Retry-After 是下限
+        assert policy.next_delay(0, TransientModelError("x", retry_after=3.0)) == 3.0
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.remaining() == 0
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert 0 < breaker.remaining() <= 0.05
+
+        time.sleep(0.06)
+        breaker.before_call()  # 半开状态放行一次试探请求
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+
+    def test_model_client_retries_transient_errors(self):
+        client = ModelClient()
+        client.retry_policy = RetryPolicy(max_retries=3, base_delay=0.01)
+        client.llm_client = MagicMock()
+        client.llm_client.chat.completions.create.side_effect = [
+            FakeAPIError(502), TimeoutError("slow"), _completion("ok")
+        ]
+
+        assert client.get_answer("hello") == "ok"
+        assert client.llm_client.chat.completions.create.call_count == 3
+
+    def test_model_client_fails_fast(self):
+        """永久错误不重试；连续失败后熔断器直接拒绝请求"""
+        client = ModelClient()
+        client.retry_policy = RetryPolicy(max_retries=0)
+        client.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client.llm_client = MagicMock()
+        client.llm_client.chat.completions.create.side_effect = FakeAPIError(400)
+
+        with pytest.raises(PermanentModelError):
+            client.get_answer("bad request")
+        assert client.llm_client.chat.completions.create.call_count == 1
+
+        client.llm_client.chat.completions.create.side_effect = FakeAPIError(503)
+        for _ in range(2):
+            with pytest.raises(TransientModelError):
+                client.get_answer("down")
+        with pytest.raises(CircuitOpenError):
+            client.get_answer("down")
+        assert client.llm_client.chat.completions.create.call_count == 3
+
+    def test_permanent_errors_do_not_open_circuit(self):
+        """单个请求的 4xx 错误（如超出上下文长度）不计入熔断器"""
+        client = ModelClient()
+        client.retry_policy = RetryPolicy(max_retries=0)
+        client.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client.llm_client = MagicMock()
+        client.llm_client.chat.completions.create.side_effect = FakeAPIError(400)
+        for _ in range(5):
+            with pytest.raises(PermanentModelError):
+                client.get_answer("too long")
+        assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+        # 4xx 也说明端点可用，会清零此前的连续瞬时失败
+        client.llm_client.chat.completions.create.side_effect = [FakeAPIError(503), FakeAPIError(400),
+                                                                 FakeAPIError(503), _completion("ok")]
+        with pytest.raises(TransientModelError):
+            client.get_answer("down")
+        with pytest.raises(PermanentModelError):
+            client.get_answer("too long")
+        with pytest.raises(TransientModelError):
+            client.get_answer("down")
+        assert client.get_answer("healthy") == "ok"
+
+    def test_pipeline_retries_only_failed_files(self, monkeypatch):
+        """流水线只重试瞬时失败的文件，永久失败的文件被记录下来"""
+        monkeypatch.setenv("LLM_BATCH", "0")  # 逐文件请求，不打包小文件
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ["ok.py", "flaky.py", "broken.py"]:
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write(f"# {name}\n")
+
+            craft = aireadme(project_dir=temp_dir)
+            craft.output_dir = temp_dir
+            calls = {}
+
+            def mock_get_answer(prompt):
+                name = next(n for n in ["ok.py", "flaky.py", "broken.py"] if n in prompt)
+                calls[name] = calls.get(name, 0) + 1
+                if name == "flaky.py" and calls[name] == 1:
+                    raise TransientModelError("timeout")
+                if name == "broken.py":
+                    raise PermanentModelError("invalid request")
+                return f"description of {name}"
+
+            craft.model_client.get_answer = mock_get_answer
+
+            result = json.loads(craft._generate_script_descriptions(max_workers=2, use_async=False))
+
+            assert set(result) == {"ok.py", "flaky.py"}
+            assert calls == {"ok.py": 1, "flaky.py": 2, "broken.py": 1}
+            assert list(craft.failed_files) == ["broken.py"]
+            assert os.path.exists(os.path.join(temp_dir, "failed_files.json"))
+
+    def test_empty_answers_are_failures(self, monkeypatch):
+        """模型返回空描述的文件记录为失败并参与重试，二进制文件单独跳过"""
+        monkeypatch.setenv("LLM_BATCH", "0")
+        monkeypatch.setenv("LLM_FAILED_FILE_ROUNDS", "1")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ["ok.py", "empty.py"]:
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write(f"# {name}\n")
+            with open(os.path.join(temp_dir, "blob.py"), "wb") as f:
+                f.write(b"\x00\x01\x02" * 100)
+
+            craft = aireadme(project_dir=temp_dir)
+            craft.output_dir = temp_dir
+            calls = []
+
+            def mock_get_answer(prompt):
+                name = next(n for n in ["ok.py", "empty.py"] if n in prompt)
+                calls.append(name)
+                return "  " if name == "empty.py" else f"description of {name}"
+
+            craft.model_client.get_answer = mock_get_answer
+
+            result = json.loads(craft._generate_script_descriptions(max_workers=2, use_async=False))
+
+            assert set(result) == {"ok.py"}
+            # 二进制文件不发请求；空描述的文件在重试轮中再请求一次
+            assert sorted(calls) == ["empty.py", "empty.py", "ok.py"]
+            assert list(craft.failed_files) == ["empty.py"]
+            assert "empty description" in craft.failed_files["empty.py"]
+
+    def test_half_open_trial_is_always_resolved(self):
+        """半开状态的试探请求遇到 429 或被中断后，熔断器仍能恢复"""
+        client = ModelClient()
+        client.retry_policy = RetryPolicy(max_retries=0)
+        client.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+        client.llm_client = MagicMock()
+        create = client.llm_client.chat.completions.create
+        create.side_effect = [FakeAPIError(503), FakeAPIError(503), FakeAPIError(429), _completion("ok")]
+        for _ in range(2):
+            with pytest.raises(TransientModelError):
+                client.get_answer("down")
+        with pytest.raises(CircuitOpenError):
+            client.get_answer("down")
+        time.sleep(0.15)
+        # 429 说明端点存活，试探请求结束，熔断器关闭
+        with pytest.raises(TransientModelError):
+            client.get_answer("throttled")
+        assert client.get_answer("healthy") == "ok"
+        assert create.call_count == 4
+
+        create.side_effect = [FakeAPIError(503), FakeAPIError(503), KeyboardInterrupt(), _completion("again")]
+        for _ in range(2):
+            with pytest.raises(TransientModelError):
+                client.get_answer("down again")
+        time.sleep(0.15)
+        with pytest.raises(KeyboardInterrupt):
+            client.get_answer("interrupted")
+        # 被中断的试探请求释放名额，下一次请求成为新的试探
+        assert client.get_answer("recovered") == "again"
+
+    def test_retry_round_waits_for_circuit(self, monkeypatch):
+        """熔断期间失败的文件要等熔断器允许请求后才重试"""
+        monkeypatch.setenv("LLM_BATCH", "0")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ["a.py", "b.py"]:
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write(f"# {name}\n")
+
+            craft = aireadme(project_dir=temp_dir)
+            craft.output_dir = temp_dir
+            calls = []
+
+            def mock_get_answer(prompt):
+                calls.append(time.monotonic())
+                if len(calls) <= 2:
+                    raise CircuitOpenError("circuit open", retry_after=0.3)
+                return "description"
+
+            craft.model_client.get_answer = mock_get_answer
+            result = json.loads(craft._generate_script_descriptions(max_workers=2, use_async=False))
+
+            assert len(result) == 2
+            assert min(calls[2:]) - max(calls[:2]) >= 0.3
+
+    def test_async_pipeline_retry_rounds(self, monkeypatch):
+        """异步流水线的重试轮次与首轮共用同一事件循环，失败的文件能在重试中恢复"""
+        with StandInServer(error_rate=0.3, seed=7) as server, tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+            monkeypatch.setenv("LLM_API_KEY", "stand-in")
+            monkeypatch.setenv("LLM_CACHE", "0")
+            monkeypatch.setenv("LLM_BATCH", "0")
+            monkeypatch.setenv("LLM_MAX_RETRIES", "0")  # 失败只能靠文件级重试轮次恢复
+            monkeypatch.setenv("LLM_CIRCUIT_FAILURES", "1000")
+            monkeypatch.setenv("LLM_FAILED_FILE_ROUNDS", "8")
+            for i in range(20):
+                with open(os.path.join(temp_dir, f"mod_{i}.py"), "w") as f:
+                    f.write(f"VALUE = {i}\n")
+
+            craft = aireadme(project_dir=temp_dir, output_dir=temp_dir, interactive=False, logo=False)
+            result = json.loads(craft._generate_script_descriptions(use_async=True, max_concurrency=4))
+
+            assert server.stats()["errors"] > 0  # 确实经历了重试轮次
+            assert len(result) == 20
+            assert craft.failed_files == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,137 @@
+# tests/test_single_flight.py
+# 测试相同请求的合并：并发的相同提示词只发送一次，重复文件只调用一次 API
+
+import pytest
+import os
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.single_flight import SingleFlight
+from src.aireadme.utils.model_client import ModelClient
+
+
+def _completion(text):
+    response = MagicMock()
+    response.choices[0].message.content = text
+    return response
+
+
+class TestSingleFlight:
+    """测试 SingleFlight 与 ModelClient 的请求合并"""
+
+    def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: flight.do("k", slow), range(8)))
+
+        assert results == ["value"] * 8
+        assert len(calls) == 1
+        assert flight.stats() == {"calls": 1, "coalesced": 7}
+        # 调用结束后不保留结果
+        assert flight.do("k", lambda: "again") == "again"
+
+    def test_errors_are_shared(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, "k", failing)
+            started.wait()
+            follower = executor.submit(flight.do, "k", lambda: "unused")
+            with pytest.raises(ValueError):
+                leader.result()
+            with pytest.raises(ValueError):
+                follower.result()
+
+    def test_async_calls_share_one_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        async def run():
+            return await asyncio.gather(*(flight.do_async("k", slow) for _ in range(5)))
+
+        assert asyncio.run(run()) == ["value"] * 5
+        assert len(calls) == 1
+
+    def test_model_client_coalesces_identical_prompts(self):
+        client = ModelClient()
+        client.llm_client = MagicMock()
+
+        def slow_create(**kwargs):
+            time.sleep(0.1)
+            return _completion("answer")
+
+        client.llm_client.chat.completions.create.side_effect = slow_create
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            answers = list(executor.map(lambda _: client.get_answer("same prompt"), range(6)))
+
+        assert answers == ["answer"] * 6
+        assert client.llm_client.chat.completions.create.call_count == 1
+
+        client.async_llm_client = MagicMock()
+
+        async def slow_create_async(**kwargs):
+            await asyncio.sleep(0.05)
+            return _completion("async answer")
+
+        client.async_llm_client.chat.completions.create = AsyncMock(side_effect=slow_create_async)
+
+        async def run():
+            return await asyncio.gather(*(client.get_answer_async("other prompt") for _ in range(4)))
+
+        assert asyncio.run(run()) == ["async answer"] * 4
+        assert client.async_llm_client.chat.completions.create.await_count == 1
+
+    def test_duplicate_files_cost_one_call(self, monkeypatch):
+        """内容相同的文件在一次运行中只请求一次"""
+        monkeypatch.setenv("LLM_BATCH", "0")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for sub in ("vendor_a", "vendor_b", "vendor_c"):
+                os.makedirs(os.path.join(temp_dir, sub))
+                with open(os.path.join(temp_dir, sub, "six.py"), "w") as f:
+                    f.write("# vendored copy\nPY3 = True\n")
+
+            craft = aireadme(project_dir=temp_dir)
+            prompts = []
+
+            def mock_get_answer(prompt, max_tokens=None):
+                prompts.append(prompt)
+                return "vendored helper"
+
+            craft.model_client.get_answer = mock_get_answer
+            result = json.loads(craft._generate_script_descriptions(max_workers=1, use_async=False))
+
+            assert set(result.values()) == {"vendored helper"}
+            assert len(result) == 3
+            assert len(prompts) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,148 @@
+# tests/test_stage_graph.py
+# 测试阶段依赖图调度：依赖顺序、独立阶段并行、关键路径，以及 generate() 中 Logo 与 README 的重叠执行
+
+import pytest
+import os
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.stage_graph import StageGraph, bind_context
+from src.aireadme.utils.stand_in_server import StandInServer
+from src.aireadme.utils.telemetry import Telemetry
+
+
+def _sleep(seconds, value=None):
+    def run(**inputs):
+        time.sleep(seconds)
+        return value if value is not None else inputs
+    return run
+
+
+class TestStageGraph:
+    """测试 StageGraph 的调度与计时"""
+
+    def test_results_follow_dependencies(self):
+        graph = StageGraph()
+        graph.add("a", lambda: 1)
+        graph.add("b", lambda: 2)
+        graph.add("c", lambda a, b: a + b, after=["a", "b"])
+        assert graph.run() == {"a": 1, "b": 2, "c": 3}
+        with pytest.raises(ValueError):
+            graph.add("d", lambda: None, after=["missing"])
+        with pytest.raises(ValueError):
+            graph.add("a", lambda: None)
+
+    def test_independent_stages_overlap(self):
+        graph = StageGraph()
+        graph.add("a", _sleep(0.3, "a"))
+        graph.add("b", _sleep(0.3, "b"))
+        start = time.perf_counter()
+        graph.run()
+        assert time.perf_counter() - start < 0.5
+
+        # max_workers=1 按声明顺序依次执行
+        sequential = StageGraph(max_workers=1)
+        sequential.add("a", _sleep(0.1, "a"))
+        sequential.add("b", _sleep(0.1, "b"))
+        sequential.run()
+        timings = {t["stage"]: t for t in sequential.timings()}
+        assert timings["b"]["start"] >= timings["a"]["start"] + timings["a"]["seconds"] - 0.01
+
+    def test_critical_path(self):
+        graph = StageGraph()
+        graph.add("structure", _sleep(0.05, "s"))
+        graph.add("descriptions", _sleep(0.3, "d"))
+        graph.add("logo", _sleep(0.3, "l"), after=["descriptions"])
+        graph.add("readme", _sleep(0.1, "r"), after=["structure", "descriptions"])
+        graph.run()
+        path, seconds = graph.critical_path()
+        assert path == ["descriptions", "logo"]
+        assert seconds == pytest.approx(0.6, abs=0.1)
+        report = graph.report()
+        assert report["wall_seconds"] < 0.9  # Logo 与 README 并行
+        assert [t["stage"] for t in report["stages"] if t["critical"]] == ["descriptions", "logo"]
+
+    def test_failure_stops_dependents(self):
+        ran = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        graph = StageGraph()
+        graph.add("a", fail)
+        graph.add("b", _sleep(0.1, "b"))
+        graph.add("c", lambda a: ran.append("c"), after=["a"])
+        with pytest.raises(RuntimeError):
+            graph.run()
+        assert ran == []
+        assert graph.stages["b"].finished is not None  # 已启动的阶段会执行完
+
+    def test_stages_and_workers_keep_their_stage(self):
+        telemetry = Telemetry()
+
+        def work(stage):
+            def run():
+                # 阶段内部再用线程池发起调用，绑定上下文后仍归属本阶段
+                record = bind_context(lambda i: telemetry.record("chat", "m", 0.0))
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    list(executor.map(record, range(4)))
+                time.sleep(0.05)
+            return run
+
+        graph = StageGraph(wrap=telemetry.stage)
+        graph.add("dependencies", work("dependencies"))
+        graph.add("descriptions", work("descriptions"))
+        graph.run()
+        stages = [c["stage"] for c in telemetry.calls]
+        assert stages.count("dependencies") == stages.count("descriptions") == 4
+        assert telemetry.current_stage() == "other"
+
+
+class TestGeneratePipeline:
+    """通过替身服务器测试 generate() 的阶段调度"""
+
+    def test_logo_overlaps_readme(self, monkeypatch):
+        with StandInServer(latency="0.2") as server, tempfile.TemporaryDirectory() as project_dir, \
+                tempfile.TemporaryDirectory() as output_dir:
+            for prefix in ("LLM", "T2I"):
+                monkeypatch.setenv(f"{prefix}_BASE_URL", server.base_url)
+                monkeypatch.setenv(f"{prefix}_API_KEY", "stand-in")
+            monkeypatch.setenv("LLM_CACHE", "0")
+            monkeypatch.setenv("README_STREAM_ECHO", "0")
+            with open(os.path.join(project_dir, "main.py"), "w", encoding="utf-8") as f:
+                f.write("import os\n")
+
+            craft = aireadme(project_dir=project_dir, logo=True)
+            craft.output_dir = output_dir
+            craft._get_basic_info = lambda: None
+            craft._get_git_info = lambda: None
+            craft._get_user_info = lambda: None
+            craft.generate()
+
+            timings = {t["stage"]: t for t in craft.pipeline["stages"]}
+            logo, readme = timings["logo"], timings["readme"]
+            assert logo["start"] < readme["start"] + readme["seconds"]
+            assert readme["start"] < logo["start"] + logo["seconds"]
+            assert os.path.exists(os.path.join(output_dir, "images", "logo.png"))
+            assert {c["stage"] for c in craft.model_client.telemetry.calls} >= {"logo", "readme", "descriptions"}
+
+    def test_failed_logo_reference_is_removed(self, monkeypatch):
+        monkeypatch.setenv("LLM_API_KEY", "stand-in")
+        with tempfile.TemporaryDirectory() as output_dir:
+            readme_path = os.path.join(output_dir, "README.md")
+            with open(readme_path, "w", encoding="utf-8") as f:
+                f.write('<div>\n  <img src="images/logo.png" alt="Logo" width="80">\n</div>\n# Title\n')
+            craft = aireadme(project_dir=output_dir, logo=False)
+            craft._drop_logo_reference(readme_path)
+            with open(readme_path, "r", encoding="utf-8") as f:
+                assert f.read() == "<div>\n</div>\n# Title\n"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
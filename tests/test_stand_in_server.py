@@ -0,0 +1,134 @@
+# tests/test_stand_in_server.py
+# 测试离线替身服务器：兼容 OpenAI 的接口、延迟与错误注入、录制/回放
+
+import pytest
+import os
+import json
+import random
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.model_client import ModelClient
+from src.aireadme.utils.retry import RetryPolicy
+from src.aireadme.utils.stand_in_server import StandInServer, parse_latency, request_key
+
+
+def _point_at(monkeypatch, server):
+    """让 ModelClient 的 LLM 与文生图接口都指向替身服务器"""
+    for prefix in ("LLM", "T2I"):
+        monkeypatch.setenv(f"{prefix}_BASE_URL", server.base_url)
+        monkeypatch.setenv(f"{prefix}_API_KEY", "stand-in")
+    monkeypatch.setenv("LLM_CACHE", "0")
+
+
+class TestLatency:
+    """测试延迟分布解析"""
+
+    def test_distributions(self):
+        rng = random.Random(1)
+        assert parse_latency("0.25")() == 0.25
+        assert parse_latency("fixed:0.1")() == 0.1
+        assert all(0.1 <= parse_latency("uniform:0.1,0.2", rng)() <= 0.2 for _ in range(50))
+        assert all(parse_latency("normal:0,1", rng)() >= 0 for _ in range(50))  # 负值截断为 0
+        assert parse_latency("lognormal:-2,0.5", rng)() > 0
+        assert parse_latency("exp:0")() == 0
+
+    def test_invalid_spec(self):
+        for spec in ("gamma:1,2", "uniform:1", "fixed:abc"):
+            with pytest.raises(ValueError):
+                parse_latency(spec)
+
+
+class TestStandInServer:
+    """通过 ModelClient 端到端测试替身服务器"""
+
+    def test_chat_answer_and_token_accounting(self, monkeypatch):
+        with StandInServer(seed=1) as server:
+            _point_at(monkeypatch, server)
+            client = ModelClient()
+            first = client.get_answer("Describe main.py")
+            assert first.startswith("Stand-in answer:")
+            assert client.get_answer("Describe main.py") == first  # 相同提示得到相同回答
+            stats = server.stats()
+        assert stats["chat_completions"] == 2
+        assert stats["prompt_tokens"] > 0 and stats["completion_tokens"] > 0
+        assert stats["total_tokens"] == stats["prompt_tokens"] + stats["completion_tokens"]
+
+    def test_batch_prompt_gets_json_answer(self, monkeypatch):
+        with StandInServer() as server:
+            _point_at(monkeypatch, server)
+            prompt = "=== FILE: a.py ===\nx = 1\n=== END FILE: a.py ===\n\n=== FILE: b.py ===\ny = 2\n"
+            answer = json.loads(ModelClient().get_answer(prompt, max_tokens=500))
+        assert set(answer) == {"a.py", "b.py"}
+
+    def test_stream_continues_after_length(self, monkeypatch):
+        with StandInServer(answer_tokens=40) as server:
+            _point_at(monkeypatch, server)
+            pieces = list(ModelClient().stream_answer("Write a README", max_tokens=10, max_continuations=1))
+            assert len("".join(pieces)) == 2 * 10 * 4  # 两次请求都被 max_tokens 截断
+            assert server.stats()["chat_completions"] == 2
+
+    def test_image_generation_and_download(self, monkeypatch):
+        with StandInServer() as server, tempfile.TemporaryDirectory() as temp_dir:
+            _point_at(monkeypatch, server)
+            dest = os.path.join(temp_dir, "logo.png")
+            result = ModelClient().get_image("a logo", dest_path=dest)
+            assert result["path"] == dest
+            with open(dest, "rb") as f:
+                assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+            assert server.stats()["images"] == 1
+
+    def test_injected_rate_limits_are_retried(self, monkeypatch):
+        with StandInServer(rate_limit_rate=0.5, retry_after=0.01, seed=3) as server:
+            _point_at(monkeypatch, server)
+            client = ModelClient()
+            client.retry_policy = RetryPolicy(max_retries=10, base_delay=0.01, max_delay=0.05)
+            for i in range(5):
+                assert client.get_answer(f"question {i}")
+            stats = server.stats()
+        assert stats["throttled"] > 0
+        assert stats["chat_completions"] == 5
+        assert stats["requests"] == 5 + stats["throttled"]
+
+    def test_record_then_replay(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cassette = os.path.join(temp_dir, "cassette.jsonl")
+            # 另一个替身服务器充当真实的上游接口
+            with StandInServer() as upstream:
+                with StandInServer(mode="record", cassette=cassette, upstream_url=upstream.base_url) as recorder:
+                    _point_at(monkeypatch, recorder)
+                    client = ModelClient()
+                    recorded = client.get_answer("Describe utils.py")
+                    client.get_image("a logo")
+                assert upstream.stats()["requests"] == 2
+
+            with open(cassette, "r", encoding="utf-8") as f:
+                assert len(f.readlines()) == 2
+
+            with StandInServer(mode="replay", cassette=cassette) as player:
+                _point_at(monkeypatch, player)
+                client = ModelClient()
+                assert client.get_answer("Describe utils.py") == recorded
+                assert "".join(client.stream_answer("Describe utils.py")) == recorded  # 流式请求也能回放
+                assert client.get_image("a logo")["content"].startswith(b"\x89PNG")
+                assert player.stats()["replay_misses"] == 0
+
+    def test_replay_miss_is_an_error(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cassette = os.path.join(temp_dir, "empty.jsonl")
+            with StandInServer(mode="replay", cassette=cassette) as server:
+                status, _, body = server._respond("chat/completions", {"messages": []}, None, server.base_url)
+        assert status == 404
+        assert "not in cassette" in body["error"]["message"]
+
+    def test_request_key_ignores_stream_flag(self):
+        body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+        assert request_key("chat/completions", body) == request_key("chat/completions", dict(body, stream=True))
+        assert request_key("chat/completions", body) != request_key("images/generations", body)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
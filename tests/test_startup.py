@@ -0,0 +1,74 @@
+# tests/test_startup.py
+# 测试启动速度：导入时不加载重量级依赖，客户端按需创建
+
+import pytest
+import os
+import re
+import subprocess
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.model_client import ModelClient
+
+# 导入 aireadme.core 的时间预算（毫秒），CI 机器较慢时可通过环境变量放宽
+IMPORT_BUDGET_MS = float(os.getenv("AIREADME_IMPORT_BUDGET_MS", "500"))
+HEAVY_MODULES = ("openai", "requests", "dotenv")
+
+
+def _run_python(code, *flags):
+    env = dict(os.environ, PYTHONPATH=str(root_dir / "src"))
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True, text=True, env=env, cwd=str(root_dir), timeout=60,
+    )
+
+
+def _loaded(result):
+    """脚本最后一行输出的已加载模块列表"""
+    last_line = result.stdout.strip().splitlines()[-1]
+    assert last_line.startswith("loaded:"), result.stdout + result.stderr
+    return [name for name in last_line[len("loaded:"):].split(",") if name]
+
+
+class TestStartup:
+    """测试延迟导入与按需创建客户端"""
+
+    def test_version_imports_nothing_heavy(self):
+        result = _run_python(
+            "import sys\n"
+            "sys.argv = ['aireadme', '--version']\n"
+            "from aireadme.utils.cli import main\n"
+            "try:\n"
+            "    main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print('loaded:' + ','.join(m for m in ('rich', 'aireadme.core') + %r if m in sys.modules))" % (HEAVY_MODULES,)
+        )
+        assert "aireadme 0.1.8" in result.stdout
+        assert _loaded(result) == []
+
+    def test_core_import_is_lazy_and_within_budget(self):
+        code = "import sys, aireadme.core\nprint('loaded:' + ','.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,)
+        result = _run_python(code, "-X", "importtime")
+        assert _loaded(result) == []
+
+        times = re.findall(r"import time:\s+\d+ \|\s+(\d+) \| aireadme\.core$", result.stderr, re.M)
+        assert times, result.stderr[-2000:]
+        assert int(times[0]) / 1000 < IMPORT_BUDGET_MS
+
+    def test_clients_are_created_on_demand(self, monkeypatch):
+        monkeypatch.setenv("T2I_API_KEY", "")
+        client = ModelClient()
+        assert client.endpoints.primary.client is None
+        assert client._t2i_client is None
+        assert not client.t2i_configured
+
+        result = client.get_image("a logo")
+        assert "T2I_API_KEY" in result["error"]
+        assert client.llm_client is client.llm_client  # 首次访问时创建，之后复用
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,85 @@
+# tests/test_streaming.py
+# 测试流式生成 README：增量写入临时文件、原子替换，以及因长度截断时自动续写
+
+import pytest
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.model_client import ModelClient
+from src.aireadme.utils.retry import RetryPolicy
+
+
+def _stream(texts, finish_reason="stop"):
+    """模拟 openai 流式响应的 chunk 序列"""
+    chunks = []
+    for i, text in enumerate(texts):
+        last = i == len(texts) - 1
+        choice = SimpleNamespace(delta=SimpleNamespace(content=text),
+                                 finish_reason=finish_reason if last else None)
+        chunks.append(SimpleNamespace(choices=[choice]))
+    return iter(chunks)
+
+
+class TestStreaming:
+    """测试 ModelClient.stream_answer 与 README 流式写入"""
+
+    def test_stream_answer_continues_on_length(self):
+        client = ModelClient()
+        client.llm_client = MagicMock()
+        client.llm_client.chat.completions.create.side_effect = [
+            _stream(["# Title\n", "Part one "], finish_reason="length"),
+            _stream(["part two."]),
+        ]
+
+        pieces = list(client.stream_answer("write", max_tokens=10, max_continuations=2))
+
+        assert "".join(pieces) == "# Title\nPart one part two."
+        second_call = client.llm_client.chat.completions.create.call_args_list[1].kwargs
+        assert second_call["stream"] is True
+        assert second_call["messages"][1] == {"role": "assistant", "content": "# Title\nPart one "}
+        assert second_call["messages"][2]["role"] == "user"
+
+    def test_stream_answer_retries_before_output(self):
+        client = ModelClient()
+        client.retry_policy = RetryPolicy(max_retries=2, base_delay=0.01)
+        client.llm_client = MagicMock()
+        client.llm_client.chat.completions.create.side_effect = [TimeoutError("slow"), _stream(["ok"])]
+
+        assert list(client.stream_answer("hi")) == ["ok"]
+
+    def test_stream_readme_writes_atomically(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            craft = aireadme(project_dir=temp_dir)
+            craft.output_dir = temp_dir
+            readme_path = os.path.join(temp_dir, "README.md")
+            with open(readme_path, "w") as f:
+                f.write("old readme")
+
+            def failing_stream(prompt, **kwargs):
+                yield "# New"
+                raise RuntimeError("connection dropped")
+
+            craft.model_client.stream_answer = failing_stream
+            with pytest.raises(RuntimeError):
+                craft._stream_readme("tree", "deps", "{}", None, readme_path)
+            # 失败时保留旧文件，不留下临时文件
+            with open(readme_path) as f:
+                assert f.read() == "old readme"
+            assert os.listdir(temp_dir) == ["README.md"]
+
+            craft.model_client.stream_answer = lambda prompt, **kwargs: iter(["```markdown\n# New", " README\n```"])
+            craft._stream_readme("tree", "deps", "{}", None, readme_path)
+            with open(readme_path) as f:
+                assert f.read() == "\n# New README\n"
+            assert os.listdir(temp_dir) == ["README.md"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
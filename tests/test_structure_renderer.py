@@ -0,0 +1,85 @@
+# tests/test_structure_renderer.py
+# 测试流式目录结构输出与有界提示词视图
+
+import pytest
+import io
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.utils.file_index import build_file_index
+from src.aireadme.utils.structure_renderer import (
+    write_structure,
+    render_prompt_view,
+    format_summary,
+    count_extensions_by_directory,
+)
+
+
+def _touch(base, rel_path):
+    path = os.path.join(base, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+class TestStructureRenderer:
+    """测试 structure_renderer 模块"""
+
+    def test_write_structure_matches_render(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for rel in ("a.py", "pkg/b.py", "pkg/sub/c.py"):
+                _touch(temp_dir, rel)
+            index = build_file_index(temp_dir, [])
+
+            buffer = io.StringIO()
+            lines = write_structure(index, buffer)
+
+            assert buffer.getvalue() == index.render_structure()
+            assert lines == 6
+
+    def test_deep_directories_are_collapsed(self):
+        """超过深度限制的目录应折叠为一行统计"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _touch(temp_dir, "main.py")
+            for i in range(12):
+                _touch(temp_dir, f"tests/unit/test_{i}.py")
+            for i in range(3):
+                _touch(temp_dir, f"tests/data/d{i}.json")
+            index = build_file_index(temp_dir, [])
+
+            view = render_prompt_view(index, max_depth=1)
+
+            assert "├── main.py" in view
+            assert "├── tests/ (15 files: 12 .py, 3 .json)" in view
+            assert "test_0.py" not in view
+
+    def test_entry_cap_and_line_cap(self):
+        """每个目录的条目数和总行数都应受限"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(50):
+                _touch(temp_dir, f"many/f{i:02d}.txt")
+            index = build_file_index(temp_dir, [])
+
+            capped = render_prompt_view(index, max_entries=5).splitlines()
+            assert capped[-1].strip() == "└── ... 45 more entries"
+            assert len(capped) == 8
+
+            truncated = render_prompt_view(index, max_entries=100, max_lines=10).splitlines()
+            assert len(truncated) == 11
+            assert truncated[-1] == "... (truncated, 42 more entries)"
+
+    def test_format_summary(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ("a.py", "b.py", "c.py", "d.md", "e.md", "f.txt", "Makefile"):
+                _touch(temp_dir, f"x/{name}")
+            totals = count_extensions_by_directory(build_file_index(temp_dir, []))
+
+            assert totals[""] == totals["x"]
+            assert format_summary(totals["x"], top=2) == "7 files: 3 .py, 2 .md, 2 other"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
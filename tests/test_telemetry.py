@@ -0,0 +1,158 @@
+# tests/test_telemetry.py
+# 测试逐次调用遥测：延迟分位数、token 用量、重试与缓存状态、按阶段汇总与导出
+
+import pytest
+import os
+import json
+import asyncio
+import tempfile
+from pathlib import Path
+import sys
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+from src.aireadme.core import aireadme
+from src.aireadme.utils.model_client import ModelClient
+from src.aireadme.utils.response_cache import ResponseCache
+from src.aireadme.utils.retry import RetryPolicy
+from src.aireadme.utils.stand_in_server import StandInServer
+from src.aireadme.utils.telemetry import Telemetry, percentile
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """替身服务器，ModelClient 的两个接口都指向它"""
+    with StandInServer(seed=7) as stand_in:
+        for prefix in ("LLM", "T2I"):
+            monkeypatch.setenv(f"{prefix}_BASE_URL", stand_in.base_url)
+            monkeypatch.setenv(f"{prefix}_API_KEY", "stand-in")
+        monkeypatch.setenv("LLM_CACHE", "0")
+        monkeypatch.setenv("LLM_MODEL_NAME", "gpt-4o-mini")
+        yield stand_in
+
+
+class TestTelemetry:
+    """测试 Telemetry 的汇总逻辑"""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile([], 0.5) == 0.0
+        assert percentile([3.0], 0.99) == 3.0
+        assert percentile(values, 0.5) == pytest.approx(50.5)
+        assert percentile(values, 0.99) == pytest.approx(99.01)
+
+    def test_cost(self):
+        telemetry = Telemetry()
+        assert telemetry.cost("chat", "gpt-4o-mini-2024-07-18", 1_000_000, 0) == pytest.approx(0.15)
+        assert telemetry.cost("chat", "gpt-4o", 0, 1_000_000) == pytest.approx(10.0)
+        assert telemetry.cost("chat", "unknown-model", 1000, 1000) == 0.0
+        assert telemetry.cost("image", "dall-e-3") == pytest.approx(0.08)
+        # 环境变量配置的价格覆盖内置价格表
+        custom = Telemetry(input_price=1.0, output_price=2.0, image_price=0.5)
+        assert custom.cost("chat", "unknown-model", 1_000_000, 1_000_000) == pytest.approx(3.0)
+        assert custom.cost("image", "dall-e-3") == 0.5
+
+    def test_stages_and_prometheus(self):
+        telemetry = Telemetry()
+        with telemetry.stage("descriptions"):
+            for i in range(4):
+                telemetry.record("chat", "m", 0.0)
+        telemetry.record("chat", "m", 0.0, ok=False)
+
+        summary = telemetry.summary()
+        assert summary["stages"]["descriptions"]["calls"] == 4
+        assert summary["stages"]["other"]["errors"] == 1
+        assert summary["total"]["calls"] == 5
+        assert "stage_seconds" in summary["stages"]["descriptions"]
+
+        text = telemetry.prometheus_text()
+        assert 'aireadme_model_calls_total{stage="descriptions"} 4' in text
+        assert 'aireadme_model_latency_seconds{stage="descriptions",quantile="0.99"}' in text
+        assert "# TYPE aireadme_model_latency_seconds summary" in text
+
+    def test_async_tasks_keep_their_stage(self):
+        telemetry = Telemetry()
+
+        async def call(stage):
+            with telemetry.stage(stage):
+                await asyncio.sleep(0.01)
+                telemetry.record("chat", "m", 0.0)
+
+        async def main():
+            await asyncio.gather(call("a"), call("b"))
+
+        asyncio.run(main())
+        assert sorted(c["stage"] for c in telemetry.calls) == ["a", "b"]
+
+
+class TestModelClientTelemetry:
+    """通过替身服务器测试 ModelClient 记录的每次调用"""
+
+    def test_answer_records_tokens_and_cost(self, server):
+        client = ModelClient()
+        with client.telemetry.stage("dependencies"):
+            client.get_answer("List the dependencies")
+        call = client.telemetry.calls[0]
+        assert call["stage"] == "dependencies"
+        assert call["kind"] == "chat" and call["ok"] and call["cache"] == "off"
+        stats = server.stats()
+        assert call["prompt_tokens"] == stats["prompt_tokens"]
+        assert call["completion_tokens"] == stats["completion_tokens"]
+        assert call["cost_usd"] > 0
+        assert call["latency"] >= call["queue_wait"] >= 0
+
+    def test_retries_and_cache_hits(self, monkeypatch):
+        with StandInServer(rate_limit_rate=0.5, retry_after=0.01, seed=3) as stand_in, \
+                tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.setenv("LLM_BASE_URL", stand_in.base_url)
+            monkeypatch.setenv("LLM_API_KEY", "stand-in")
+            client = ModelClient(cache=ResponseCache(os.path.join(temp_dir, "cache.sqlite3")))
+            client.retry_policy = RetryPolicy(max_retries=10, base_delay=0.01, max_delay=0.05)
+            for i in range(4):
+                client.get_answer(f"question {i}")
+            client.get_answer("question 0")
+            client.cache.close()
+
+            calls = client.telemetry.calls
+            assert sum(c["retries"] for c in calls) == stand_in.stats()["throttled"] > 0
+            assert [c["cache"] for c in calls] == ["miss"] * 4 + ["hit"]
+            assert calls[-1]["cost_usd"] == 0.0
+
+    def test_stream_and_image(self, server):
+        client = ModelClient()
+        "".join(client.stream_answer("Write a README"))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            client.get_image("a logo", dest_path=os.path.join(temp_dir, "logo.png"))
+        kinds = [c["kind"] for c in client.telemetry.calls]
+        assert kinds == ["stream", "image"]
+        assert client.telemetry.calls[0]["completion_tokens"] > 0
+        assert all(c["ok"] for c in client.telemetry.calls)
+
+    def test_generate_writes_metrics(self, server, monkeypatch):
+        with tempfile.TemporaryDirectory() as project_dir, tempfile.TemporaryDirectory() as output_dir:
+            with open(os.path.join(project_dir, "main.py"), "w", encoding="utf-8") as f:
+                f.write("import os\n\nprint(os.getcwd())\n")
+            prometheus_path = os.path.join(output_dir, "textfile", "aireadme.prom")
+            monkeypatch.setenv("METRICS_PROMETHEUS_FILE", prometheus_path)
+            monkeypatch.setenv("README_STREAM_ECHO", "0")
+
+            craft = aireadme(project_dir=project_dir, logo=False)
+            craft.output_dir = output_dir
+            craft.config["project_description"] = "demo"
+            craft._get_basic_info = lambda: None
+            craft._get_git_info = lambda: None
+            craft._get_user_info = lambda: None
+            craft.generate()
+
+            with open(os.path.join(output_dir, "metrics.json"), "r", encoding="utf-8") as f:
+                metrics = json.load(f)
+            assert {"structure", "dependencies", "descriptions", "readme"} <= set(metrics["stages"])
+            assert metrics["stages"]["descriptions"]["calls"] >= 1
+            assert metrics["stages"]["readme"]["calls"] == 1
+            assert metrics["total"]["calls"] == len(metrics["calls"]) == server.stats()["chat_completions"]
+            assert set(metrics["total"]["latency"]) == {"p50", "p95", "p99", "max"}
+            assert os.path.exists(prometheus_path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])